@@ -0,0 +1 @@
+"""Offline performance benchmarks for fungidb_orthologs (see benchmarks/run.py)."""
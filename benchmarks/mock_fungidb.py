@@ -0,0 +1,149 @@
+"""
+Local stand-in for FungiDB used by the benchmarks.
+
+Generates synthetic OrthologsLite tables, a downloads listing and FASTA files at
+realistic scale, and serves them through an httpx.MockTransport so the real client
+code paths (request building, response parsing, streaming) run without network access.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from unittest import mock
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from fungidb_orthologs import client, genomes
+from fungidb_orthologs.config import FUNGIDB_ORGANISMS
+
+TARGET = "AfumigatusA1163"
+TARGET_PREFIX = "AFUB"
+REFERENCES = ["CalbicansSC5314", "ScerevisiaeS288C", "Spombe972h"]
+REFERENCE_NAMES = [FUNGIDB_ORGANISMS[key] for key in REFERENCES]
+
+
+def organism_names(n: int) -> list[tuple[str, str]]:
+    """n (key, display name) pairs; the first ones are the built-in reference organisms."""
+    pairs = list(zip(REFERENCES, REFERENCE_NAMES))
+    for i in range(len(pairs), n):
+        pairs.append((f"Fungus{i:04d}Strain{i % 97}", f"Fungus{i:04d} species strain {i % 97}"))
+    return pairs[:n]
+
+
+@dataclass
+class SyntheticFungiDB:
+    """
+    Synthetic FungiDB data set.
+
+    rows: ortholog table rows for the target organism.
+    organisms: genomes in the downloads listing (ortholog partners are drawn from these).
+    genes: target genes (FASTA records and distinct GIDs in the table).
+    """
+
+    rows: int = 2_000_000
+    organisms: int = 750
+    genes: int = 12_000
+    seed: int = 0
+    _table: pd.DataFrame | None = field(default=None, repr=False)
+    _payload: bytes | None = field(default=None, repr=False)
+
+    @property
+    def table(self) -> pd.DataFrame:
+        """The target organism's ortholog table (GID, Ortholog, Organism, Product)."""
+        if self._table is None:
+            rng = np.random.default_rng(self.seed)
+            names = organism_names(self.organisms)
+            gene_idx = np.sort(rng.integers(0, self.genes, self.rows))
+            org_idx = rng.integers(0, len(names), self.rows)
+            partner = rng.integers(0, 20_000, self.rows)
+            gids = pd.Series([f"{TARGET_PREFIX}_{i:06d}" for i in range(self.genes)])
+            prefixes = pd.Series([key[:6].upper() for key, _ in names])
+            display = pd.Series([name for _, name in names])
+            self._table = pd.DataFrame(
+                {
+                    "Gene ID": gids.to_numpy()[gene_idx],
+                    "Ortholog": prefixes.to_numpy()[org_idx] + "_" + pd.Series(partner).astype(str).str.zfill(5),
+                    "Organism": display.to_numpy()[org_idx],
+                    "Product": np.where(partner % 3 == 0, "hypothetical protein", "kinase, putative"),
+                }
+            )
+        return self._table
+
+    @property
+    def payload(self) -> bytes:
+        """tableTabular CSV response body (all fields quoted, as FungiDB sends it)."""
+        if self._payload is None:
+            self._payload = self.table.to_csv(index=False, quoting=csv.QUOTE_ALL).encode()
+        return self._payload
+
+    def listing(self) -> str:
+        """Apache-style Current_Release directory listing with one entry per organism."""
+        rows = ['<a href="Build_number/">Build_number</a> 2024-06-01 10:00 -']
+        for i, (key, _) in enumerate(organism_names(self.organisms)):
+            rows.append(f'<a href="{key}/">{key}/</a> 2024-{1 + i % 12:02d}-01 10:00 -')
+        return "<html><body><pre>\n" + "\n".join(rows) + "\n</pre></body></html>\n"
+
+    def organism_report(self) -> dict:
+        return {
+            "records": [
+                {"attributes": {"name_for_filenames": key, "organism_name": name}}
+                for key, name in organism_names(self.organisms)
+            ]
+        }
+
+    def write_fasta(self, path: Path, residues_per_gene: int = 1500) -> Path:
+        """CDS FASTA for the target's genes, NCBI-style headers with [locus_tag=...]."""
+        seq = ("ATG" + "GCT" * (residues_per_gene // 3))[:residues_per_gene]
+        body = "\n".join(seq[i : i + 80] for i in range(0, len(seq), 80))
+        with open(path, "w") as f:
+            for i in range(self.genes):
+                f.write(
+                    f">lcl|NC_000001.1_cds_XP_{i:09d}.1_{i + 1} [locus_tag={TARGET_PREFIX}_{i:06d}] "
+                    f"[protein=hypothetical protein] [protein_id=XP_{i:09d}.1] [gbkey=CDS]\n{body}\n"
+                )
+        return path
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/Build_number"):
+            return httpx.Response(200, text="68\n")
+        if path.endswith("/Current_Release/"):
+            return httpx.Response(200, text=self.listing(), headers={"ETag": '"bench"'})
+        if path.endswith("/GenomeDataTypes/reports/standard"):
+            return httpx.Response(200, json=self.organism_report())
+        if path.endswith("/GenesByTaxonGene/reports/tableTabular"):
+            organism = json.loads(request.content)["searchConfig"]["parameters"]["organism"]
+            if "Unknown" in organism:
+                return httpx.Response(422)
+            # Chunked body so streaming readers see many small reads, as from a real socket
+            return httpx.Response(200, content=_chunks(self.payload))
+        return httpx.Response(404)
+
+
+def _chunks(data: bytes, size: int = 64 * 1024) -> Iterator[bytes]:
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+@contextmanager
+def serve(data: SyntheticFungiDB) -> Iterator[SyntheticFungiDB]:
+    """
+    Route the package's synchronous FungiDB HTTP clients to data for the duration of the block.
+
+    One client is shared across calls, as with the real pooled session. Table responses are
+    served in 64 KiB chunks from a sync iterator, like a socket read loop; the async client
+    is not routed.
+    """
+    with httpx.Client(transport=httpx.MockTransport(data.handler)) as shared:
+        with (
+            mock.patch.object(client, "_http_client", lambda: shared),
+            mock.patch.object(genomes, "_http_client", lambda: shared),
+        ):
+            yield data
@@ -0,0 +1,295 @@
+"""
+Run the offline benchmark suite and write machine-readable results.
+
+    python -m benchmarks.run -o results.json
+    python -m benchmarks.run --quick -o new.json --compare results.json
+
+Every benchmark runs against a synthetic FungiDB (benchmarks.mock_fungidb). Wall time
+is the best of --repeat runs; peak memory is measured in one extra run under
+tracemalloc (Python and NumPy/pandas allocations). Results are JSON:
+
+    {"schema": 1, "meta": {...}, "benchmarks": {name: {"seconds", "items", "unit",
+     "throughput", "bytes", "peak_mb", ...}}}
+
+--compare prints per-benchmark time ratios against a previous results file and exits
+with status 1 if any benchmark is slower by more than --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.mock_fungidb import REFERENCES, TARGET, SyntheticFungiDB, serve
+from fungidb_orthologs import client, genomes
+from fungidb_orthologs.gene_index import GeneIndex, write_gene_index
+from fungidb_orthologs.genome_parser import scan_fasta
+from fungidb_orthologs.matrix import OrthologMatrix
+
+SCHEMA = 1
+DEFAULT_THRESHOLD = 0.25
+
+
+@dataclass
+class Benchmark:
+    """One measured operation; run() returns the number of items it processed."""
+
+    name: str
+    run: Callable[[], int]
+    unit: str
+    bytes: int | None = None
+
+
+def _measure(bench: Benchmark, repeat: int) -> dict:
+    times = []
+    items = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        items = bench.run()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        bench.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    best = min(times)
+    result = {
+        "seconds": best,
+        "median_seconds": statistics.median(times),
+        "items": items,
+        "unit": bench.unit,
+        "throughput": items / best if best else None,
+        "peak_mb": peak / 1024**2,
+    }
+    if bench.bytes is not None:
+        result["bytes"] = bench.bytes
+        result["mb_per_s"] = bench.bytes / 1024**2 / best if best else None
+    return result
+
+
+def build_benchmarks(data: SyntheticFungiDB, workdir: Path) -> list[Benchmark]:
+    """Benchmarks over data; FASTA input is written to workdir."""
+    payload = data.payload
+    fasta = data.write_fasta(workdir / "target.fna")
+    gene_ids, _ = scan_fasta(fasta)
+    table = client.compact_ortholog_table(
+        client._normalize_columns(client._read_ortholog_csv(io.BytesIO(payload)))
+    )
+    if client.select_orthologs(table, gene_ids=gene_ids, reference_organisms=REFERENCES).empty:
+        raise RuntimeError("synthetic data produced no reference orthologs")
+    # API responses for a large result: a quarter of the target's genes, orthologs in every organism
+    api_rows = client.select_orthologs(table, gene_ids=gene_ids[: len(gene_ids) // 4]).reset_index(drop=True)
+    listing = data.listing()
+
+    def catalog() -> int:
+        catalog = genomes.GenomeCatalog(workdir / "genomes.json")
+        keys = [g["key"] for g in catalog.refresh(force=True)["genomes"]]
+        resolver = catalog.resolver()
+        for key in keys:
+            resolver.resolve(key.lower())
+        return len(keys)
+
+    def fetch() -> int:
+        return len(client.download_ortholog_table(TARGET))
+
+    def parse() -> int:
+        df = client._normalize_columns(client._read_ortholog_csv(io.BytesIO(payload)))
+        return len(client.compact_ortholog_table(df))
+
+    def stream_filter() -> int:
+        client.stream_ortholog_table(TARGET, gene_ids=gene_ids, reference_organisms=REFERENCES)
+        return len(table)
+
+    def filter_table() -> int:
+        client.select_orthologs(table, gene_ids=gene_ids, reference_organisms=REFERENCES)
+        return len(table)
+
+    def fasta_scan() -> int:
+        return len(scan_fasta(fasta)[0])
+
+    forward = client.select_orthologs(table, gene_ids=gene_ids, reference_organisms=REFERENCES)
+    # Every reference lists the pairs back, so the reverse side is the forward table mirrored
+    reverse = [forward.rename(columns={"GID": "ORTHOLOGS_GID", "ORTHOLOGS_GID": "GID"})]
+
+    def reciprocal() -> int:
+        client.reciprocal_mask(forward, reverse)
+        return len(forward)
+
+    lookup_genes = gene_ids[:1000]
+    index = GeneIndex(write_gene_index(table, workdir / "target.gidx"))
+
+    def gene_lookup() -> int:
+        for gid in lookup_genes:
+            index.lookup(gid)
+        return len(lookup_genes)
+
+    def matrix_build() -> int:
+        OrthologMatrix.from_tables({TARGET: table})
+        return len(table)
+
+    benches = [
+        Benchmark("catalog_refresh_resolve", catalog, "organisms", bytes=len(listing)),
+        Benchmark("fetch_table", fetch, "rows", bytes=len(payload)),
+        Benchmark("parse_table", parse, "rows", bytes=len(payload)),
+        Benchmark("stream_filter_table", stream_filter, "rows", bytes=len(payload)),
+        Benchmark("filter_table", filter_table, "rows"),
+        Benchmark("fasta_scan", fasta_scan, "records", bytes=fasta.stat().st_size),
+        Benchmark("reciprocal_mask", reciprocal, "rows"),
+        Benchmark("gene_lookup", gene_lookup, "queries"),
+        Benchmark("matrix_build", matrix_build, "rows"),
+    ]
+    try:
+        from fungidb_orthologs import api
+    except ImportError:  # REST API extra not installed
+        return benches
+
+    def api_page() -> int:
+        body = api._page_response(api_rows, TARGET, fasta, limit=len(api_rows))
+        json.dumps(body)
+        return len(api_rows)
+
+    def api_ndjson() -> int:
+        for _ in api._iter_ndjson(api_rows):
+            pass
+        return len(api_rows)
+
+    def api_tsv() -> int:
+        for _ in api._iter_tsv(api_rows):
+            pass
+        return len(api_rows)
+
+    benches += [
+        Benchmark("api_json_page", api_page, "rows"),
+        Benchmark("api_ndjson_stream", api_ndjson, "rows"),
+        Benchmark("api_tsv_stream", api_tsv, "rows"),
+    ]
+    return benches
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run(
+    rows: int,
+    organisms: int,
+    genes: int,
+    repeat: int = 3,
+    only: list[str] | None = None,
+) -> dict:
+    """Run the suite and return the results document."""
+    data = SyntheticFungiDB(rows=rows, organisms=organisms, genes=genes)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, serve(data):
+        for bench in build_benchmarks(data, Path(tmp)):
+            if only and bench.name not in only:
+                continue
+            print(f"{bench.name} ...", file=sys.stderr, end=" ", flush=True)
+            results[bench.name] = _measure(bench, repeat)
+            print(f"{results[bench.name]['seconds']:.3f}s", file=sys.stderr)
+    return {
+        "schema": SCHEMA,
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "rows": rows,
+            "organisms": organisms,
+            "genes": genes,
+            "repeat": repeat,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """
+    Print a time/memory comparison table (to stderr) and return the names of regressed benchmarks.
+
+    A benchmark regresses when it is more than threshold (fractional) slower than baseline.
+    """
+    if baseline.get("meta", {}).get("rows") != current.get("meta", {}).get("rows"):
+        print("Warning: baseline was run at a different scale; ratios are not comparable", file=sys.stderr)
+    regressed = []
+    out = sys.stderr
+    print(f"{'benchmark':<24}{'base s':>10}{'new s':>10}{'ratio':>8}{'base MB':>10}{'new MB':>10}", file=out)
+    for name, new in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            print(f"{name:<24}{'-':>10}{new['seconds']:>10.3f}{'new':>8}{'-':>10}{new['peak_mb']:>10.1f}", file=out)
+            continue
+        ratio = new["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        flag = " *" if ratio > 1 + threshold else ""
+        print(
+            f"{name:<24}{base['seconds']:>10.3f}{new['seconds']:>10.3f}{ratio:>8.2f}"
+            f"{base['peak_mb']:>10.1f}{new['peak_mb']:>10.1f}{flag}",
+            file=out,
+        )
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline fungidb-orthologs benchmarks.")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Ortholog table rows (default: 2,000,000)")
+    parser.add_argument("--organisms", type=int, default=750, help="Genomes in the catalog (default: 750)")
+    parser.add_argument("--genes", type=int, default=12_000, help="Target genes / FASTA records (default: 12,000)")
+    parser.add_argument("--quick", action="store_true", help="Small scale (200,000 rows) for quick checks")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks")
+    parser.add_argument("-o", "--output", help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed fractional slowdown before --compare fails (default: {DEFAULT_THRESHOLD})",
+    )
+    args = parser.parse_args(argv)
+    rows = 200_000 if args.quick else args.rows
+    results = run(rows, args.organisms, args.genes, repeat=max(1, args.repeat), only=args.only)
+    text = json.dumps(results, indent=1)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        regressed = compare(json.loads(Path(args.compare).read_text()), results, args.threshold)
+        if regressed:
+            print(f"\nRegressed: {', '.join(regressed)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
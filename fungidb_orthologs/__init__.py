@@ -7,12 +7,33 @@ specifying target and reference organisms, and extracting orthologs via CLI or A
 
 __version__ = "0.1.0"
 
-from fungidb_orthologs.client import get_orthologs_for_genes
-from fungidb_orthologs.genomes import list_genomes
-from fungidb_orthologs.service import get_orthologs_for_genome
+# Public functions are imported on first use, so importing the package (e.g. by the CLI
+# front-end) does not load pandas and httpx
+_EXPORTS = {
+    "get_gene_orthologs": "fungidb_orthologs.gene_index",
+    "get_orthologs_for_genes": "fungidb_orthologs.client",
+    "get_orthologs_for_genome": "fungidb_orthologs.service",
+    "list_genomes": "fungidb_orthologs.genomes",
+}
 
 __all__ = [
+    "get_gene_orthologs",
     "get_orthologs_for_genes",
     "get_orthologs_for_genome",
     "list_genomes",
 ]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_EXPORTS])
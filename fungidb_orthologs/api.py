@@ -2,23 +2,90 @@
 REST API for ortholog lookup from FungiDB.
 
 Run: uvicorn fungidb_orthologs.api:app --reload --port 8000
+
+Ortholog endpoints are async: FASTA scanning, downloads and filtering run in worker
+threads, concurrent requests for the same organism share one upstream download
+(single-flight), and recently used ortholog tables are kept in memory. With
+FUNGIDB_ORTHOLOGS_SHARED_TABLES set, worker processes instead share memory-mapped
+Arrow copies of the tables (see fungidb_orthologs.shared_tables).
+
+GET /metrics exposes request counts and latencies, per-stage timings, bytes downloaded,
+row counts and cache hits in the Prometheus text format.
 """
 
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
+import re
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import PlainTextResponse
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-from fungidb_orthologs.service import get_orthologs_for_genome
+from fungidb_orthologs import config, metrics, session
+from fungidb_orthologs.client import compact_ortholog_table, fetch_ortholog_table, select_orthologs
+from fungidb_orthologs.coalesce import SingleFlight, TTLCache
+from fungidb_orthologs.genome_parser import FastaHeaderParser, infer_organism_from_name, scan_fasta
+from fungidb_orthologs.jobs import DONE, JobManager
+from fungidb_orthologs.service import resolve_target_organism
+from fungidb_orthologs.shared_tables import default_shared_tables
+from fungidb_orthologs.shared_tables import select as shared_select
+from fungidb_orthologs.store import default_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    yield
+    # Cancel queued and running jobs so their worker threads do not keep the process alive
+    _jobs.shutdown()
+    # Upstream requests share one pooled connection session; release it on shutdown
+    session.close()
+
 
 app = FastAPI(
     title="FungiDB ortholog API",
     description="Fetch orthologs from FungiDB for fungal genomes.",
+    lifespan=lifespan,
 )
 
+STREAM_CHUNK_ROWS = 5000  # rows serialized per chunk in streaming responses
+
+_tables = TTLCache(max_items=config.MEMORY_CACHE_ITEMS, ttl=config.MEMORY_CACHE_TTL)
+_table_fetches = SingleFlight()
+_jobs = JobManager()
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route template (/jobs/{job_id}) rather than the raw path keeps label cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        registry = metrics.default_metrics()
+        registry.inc("http_requests_total", method=request.method, route=route, status=status)
+        registry.observe("http_request_seconds", time.perf_counter() - start, method=request.method, route=route)
+
+
+class JobRequest(BaseModel):
+    fasta_path: str = Field(..., description="Path to CDS or protein FASTA")
+    organism: str | None = Field(None, description="FungiDB organism key (e.g. AfumigatusA1163)")
+    references: list[str] | None = Field(
+        None,
+        description="Reference genomes (default: CalbicansSC5314, ScerevisiaeS288C, Spombe972h)",
+    )
+
 
 class OrthologRequest(BaseModel):
     fasta_path: str = Field(..., description="Path to CDS or protein FASTA")
@@ -27,27 +94,45 @@ class OrthologRequest(BaseModel):
         None,
         description="Reference genomes (default: CalbicansSC5314, ScerevisiaeS288C, Spombe972h)",
     )
+    columns: list[str] | None = Field(None, description="Only return these columns")
+    limit: int | None = Field(None, ge=1, description="Maximum rows per page (default: FUNGIDB_ORTHOLOGS_PAGE_ROWS)")
+    cursor: str | None = Field(None, description="next_cursor from a previous page")
 
 
 @app.get("/")
-def root():
+async def root():
     return {
         "message": "FungiDB ortholog API",
         "docs": "/docs",
         "orthologs": "POST /orthologs or GET /orthologs",
+        "jobs": "POST /jobs, then GET /jobs/{job_id}",
+        "gene": "GET /genes/{gid}/orthologs",
+        "upload": "POST /orthologs/upload (FASTA in the request body)",
+        "metrics": "GET /metrics",
     }
 
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(
+        metrics.default_metrics().to_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
 @app.get("/genomes")
-def genomes():
-    """List available FungiDB genomes."""
-    from fungidb_orthologs.genomes import list_genomes
-    return {"genomes": list_genomes()}
+async def genomes():
+    """List available FungiDB genomes (from the local catalog, revalidated periodically)."""
+    from fungidb_orthologs.genomes import default_catalog
+
+    data = await asyncio.to_thread(default_catalog().get)
+    return {"genomes": [g["key"] for g in data["genomes"]], "release": data.get("release")}
 
 
 def _resolve_fasta_path(path: str) -> Path:
@@ -59,54 +144,398 @@ def _resolve_fasta_path(path: str) -> Path:
     return p
 
 
-@app.post("/orthologs")
-def post_orthologs(req: OrthologRequest):
-    """Get orthologs for genes in the given genome FASTA."""
+async def _ortholog_table(organism: str) -> pd.DataFrame:
+    """
+    Ortholog table from memory, or one shared fetch per organism: from the offline store
+    when FUNGIDB_ORTHOLOGS_STORE is set, otherwise disk cache then FungiDB.
+    """
+    df = _tables.get(organism)
+    if df is not None:
+        metrics.inc("cache_requests_total", cache="memory", result="hit")
+        return df
+    metrics.inc("cache_requests_total", cache="memory", result="miss")
+
+    async def load() -> pd.DataFrame:
+        df = await asyncio.to_thread(_load_table, organism)
+        _tables.put(organism, df)
+        return df
+
+    return await _table_fetches.do(organism, load)
+
+
+def _load_table(organism: str) -> pd.DataFrame:
+    store = default_store()
+    if store is not None:
+        return compact_ortholog_table(store.get_orthologs(organism))
+    return fetch_ortholog_table(organism)
+
+
+async def _select_orthologs(organism: str, gene_ids: list[str] | None, references: list[str]) -> pd.DataFrame:
+    """
+    Filtered ortholog rows for organism. With shared tables, every worker process reads one
+    memory-mapped copy of the table (fetched by whichever process needs it first); otherwise
+    each process keeps its own tables in memory.
+    """
+    shared = default_shared_tables()
+    if shared is None:
+        table = await _ortholog_table(organism)
+        return await asyncio.to_thread(select_orthologs, table, gene_ids, references)
+
+    async def load():
+        return await asyncio.to_thread(shared.get, organism, lambda: _load_table(organism))
+
+    table = await _table_fetches.do(organism, load)
+    return await asyncio.to_thread(shared_select, table, gene_ids, references)
+
+
+async def _orthologs_for_fasta(
+    fasta_path: Path,
+    organism: str | None = None,
+    references: list[str] | None = None,
+) -> tuple[pd.DataFrame, str]:
+    """Async equivalent of service.get_orthologs_for_genome backed by the shared table cache."""
+    gene_ids, inferred = await asyncio.to_thread(scan_fasta, fasta_path)
+    return await _orthologs_for_genes(gene_ids, inferred, organism, references)
+
+
+async def _orthologs_for_genes(
+    gene_ids: list[str],
+    inferred: str | None,
+    organism: str | None = None,
+    references: list[str] | None = None,
+) -> tuple[pd.DataFrame, str]:
+    org_key = await asyncio.to_thread(resolve_target_organism, organism, inferred, gene_ids)
+    df = await _select_orthologs(org_key, gene_ids or None, references or config.DEFAULT_REFERENCE_SPECIES)
+    return df.reset_index(drop=True), org_key
+
+
+def _select_columns(df: pd.DataFrame, columns: list[str] | None) -> pd.DataFrame:
+    if not columns:
+        return df
+    # Accept both repeated (?columns=A&columns=B) and comma-separated (?columns=A,B) forms
+    names = [c.strip() for col in columns for c in col.split(",") if c.strip()]
+    unknown = [c for c in names if c not in df.columns]
+    if unknown:
+        raise HTTPException(400, f"Unknown columns: {', '.join(unknown)}. Available: {', '.join(df.columns)}")
+    return df[names]
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"o:{offset}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
     try:
-        fasta_path = _resolve_fasta_path(req.fasta_path)
-        df, organism = get_orthologs_for_genome(
-            fasta_path,
-            organism=req.organism,
-            reference_species=req.references,
-        )
-    except FileNotFoundError as e:
-        raise HTTPException(404, str(e))
-    except ValueError as e:
-        raise HTTPException(400, str(e))
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        if not text.startswith("o:"):
+            raise ValueError(cursor)
+        offset = int(text[2:])
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(400, f"Invalid cursor: {cursor!r}")
+    if offset < 0:
+        raise HTTPException(400, f"Invalid cursor: {cursor!r}")
+    return offset
+
+
+def _page_response(
+    df: pd.DataFrame,
+    organism: str,
+    fasta_path: Path,
+    columns: list[str] | None = None,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> dict:
+    """
+    JSON body for one page of rows; next_cursor is None on the last page.
+    Serializing is CPU-bound: handlers call this through asyncio.to_thread.
+    limit: rows per page (default: config.API_PAGE_ROWS)
+    """
+    df = _select_columns(df, columns)
+    start = _decode_cursor(cursor) if cursor else 0
+    end = min(start + (limit or config.API_PAGE_ROWS), len(df))
+    page = df.iloc[start:end]
+    with metrics.timer("serialize_json"):
+        # NaN is not valid JSON
+        rows = page.astype(object).where(page.notna(), None).to_dict(orient="records")
     return {
         "organism": organism,
         "fasta_path": str(fasta_path),
-        "rows": df.to_dict(orient="records"),
+        "rows": rows,
         "count": len(df),
+        "next_cursor": _encode_cursor(end) if end < len(df) else None,
     }
 
 
-@app.get("/orthologs")
-def get_orthologs(
-    fasta_path: str | None = None,
+def _iter_tsv(df: pd.DataFrame) -> Iterator[str]:
+    yield df.iloc[:0].to_csv(sep="\t", index=False)
+    for start in range(0, len(df), STREAM_CHUNK_ROWS):
+        with metrics.timer("serialize_tsv"):
+            text = df.iloc[start : start + STREAM_CHUNK_ROWS].to_csv(sep="\t", index=False, header=False)
+        yield text
+
+
+def _iter_ndjson(df: pd.DataFrame) -> Iterator[str]:
+    for start in range(0, len(df), STREAM_CHUNK_ROWS):
+        with metrics.timer("serialize_ndjson"):
+            text = df.iloc[start : start + STREAM_CHUNK_ROWS].to_json(orient="records", lines=True)
+        yield text if text.endswith("\n") else text + "\n"
+
+
+async def _orthologs_or_http_error(
+    fasta_path: str | None,
     organism: str | None = None,
-):
-    """Get orthologs: pass fasta_path (and optionally organism)."""
+    references: list[str] | None = None,
+) -> tuple[pd.DataFrame, str, Path]:
     if not fasta_path:
         raise HTTPException(400, "Provide fasta_path")
     try:
         path = _resolve_fasta_path(fasta_path)
-        df, org = get_orthologs_for_genome(path, organism=organism)
+        df, org = await _orthologs_for_fasta(path, organism=organism, references=references)
     except FileNotFoundError as e:
         raise HTTPException(404, str(e))
     except ValueError as e:
         raise HTTPException(400, str(e))
-    return {"organism": org, "fasta_path": str(path), "rows": df.to_dict(orient="records"), "count": len(df)}
+    return df, org, path
+
+
+@app.post("/orthologs")
+async def post_orthologs(req: OrthologRequest):
+    """Get orthologs for genes in the given genome FASTA (paginate with limit/cursor)."""
+    df, organism, fasta_path = await _orthologs_or_http_error(req.fasta_path, req.organism, req.references)
+    return await asyncio.to_thread(
+        _page_response, df, organism, fasta_path, req.columns, req.limit, req.cursor
+    )
+
+
+@app.get("/orthologs")
+async def get_orthologs(
+    fasta_path: str | None = None,
+    organism: str | None = None,
+    references: list[str] | None = Query(None),
+    columns: list[str] | None = Query(None),
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+):
+    """Get orthologs: pass fasta_path (and optionally organism). Paginate with limit and cursor."""
+    df, org, path = await _orthologs_or_http_error(fasta_path, organism, references)
+    return await asyncio.to_thread(_page_response, df, org, path, columns, limit, cursor)
+
+
+@app.get("/orthologs/ndjson")
+async def get_orthologs_ndjson(
+    fasta_path: str | None = None,
+    organism: str | None = None,
+    references: list[str] | None = Query(None),
+    columns: list[str] | None = Query(None),
+):
+    """Same as GET /orthologs but streams one JSON object per line."""
+    df, _, _ = await _orthologs_or_http_error(fasta_path, organism, references)
+    return StreamingResponse(_iter_ndjson(_select_columns(df, columns)), media_type="application/x-ndjson")
 
 
 @app.get("/orthologs/tsv", response_class=PlainTextResponse)
-def get_orthologs_tsv(fasta_path: str | None = None, organism: str | None = None):
-    """Same as GET /orthologs but returns TSV."""
-    if not fasta_path:
-        raise HTTPException(400, "Provide fasta_path")
+async def get_orthologs_tsv(
+    fasta_path: str | None = None,
+    organism: str | None = None,
+    references: list[str] | None = Query(None),
+    columns: list[str] | None = Query(None),
+):
+    """Same as GET /orthologs but streams TSV."""
+    df, _, _ = await _orthologs_or_http_error(fasta_path, organism, references)
+    return StreamingResponse(
+        _iter_tsv(_select_columns(df, columns)), media_type="text/tab-separated-values"
+    )
+
+
+@app.get("/genes/{gid}/orthologs")
+async def get_gene_orthologs(
+    gid: str,
+    organism: str | None = None,
+    references: list[str] | None = Query(None),
+):
+    """
+    Orthologs of one gene from the organism's memory-mapped gene index (the whole table is
+    not loaded). organism defaults to the one inferred from the gene ID's locus-tag prefix.
+    """
+    from fungidb_orthologs.gene_index import get_gene_orthologs as lookup
+
     try:
-        path = _resolve_fasta_path(fasta_path)
-        df, _ = get_orthologs_for_genome(path, organism=organism)
-    except (FileNotFoundError, ValueError) as e:
-        raise HTTPException(404 if "not found" in str(e).lower() else 400, str(e))
-    return df.to_csv(sep="\t", index=False)
+        rows, org = await asyncio.to_thread(lookup, gid, organism, references, default_store())
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    if rows is None:
+        raise HTTPException(404, f"Gene {gid} not found in {org}")
+    return {"gene": gid, "organism": org, "count": len(rows), "orthologs": rows}
+
+
+class _MultipartFile:
+    """
+    Streaming splitter for multipart/form-data: feed() returns the pieces of the first file
+    part's body (the part with a filename, or named "file" or "fasta") as they arrive. Other
+    parts are skipped; at most one delimiter's length of data is held back between chunks.
+    """
+
+    MAX_PART_HEADERS = 16 * 1024
+
+    def __init__(self, boundary: str):
+        self._delimiter = b"\r\n--" + boundary.encode()
+        self._buffer = b"\r\n"  # lets the opening boundary match the delimiter
+        self._state = "skip"  # skip -> headers -> body -> done
+        self.filename: str | None = None
+
+    def feed(self, data: bytes) -> list[bytes]:
+        self._buffer += data
+        pieces = []
+        while True:
+            if self._state == "skip":
+                i = self._buffer.find(self._delimiter)
+                if i == -1:
+                    self._buffer = self._buffer[-len(self._delimiter) :]
+                    return pieces
+                self._buffer = self._buffer[i + len(self._delimiter) :]
+                self._state = "headers"
+            elif self._state == "headers":
+                if self._buffer.startswith(b"--"):
+                    self._state = "done"
+                    continue
+                end = self._buffer.find(b"\r\n\r\n")
+                if end == -1:
+                    if len(self._buffer) > self.MAX_PART_HEADERS:
+                        raise ValueError("Multipart part headers too long")
+                    return pieces
+                headers, self._buffer = self._buffer[:end].decode("latin-1"), self._buffer[end + 4 :]
+                disposition = next(
+                    (h for h in headers.split("\r\n") if h.lower().startswith("content-disposition:")), ""
+                )
+                name = re.search(r'\bname="([^"]*)"', disposition)
+                filename = re.search(r'\bfilename="([^"]*)"', disposition)
+                if filename or (name and name.group(1) in ("file", "fasta")):
+                    self.filename = filename.group(1) if filename else None
+                    self._state = "body"
+                else:
+                    self._state = "skip"
+            elif self._state == "body":
+                i = self._buffer.find(self._delimiter)
+                if i != -1:
+                    pieces.append(self._buffer[:i])
+                    self._buffer = b""
+                    self._state = "done"
+                    return pieces
+                keep = len(self._delimiter) - 1
+                if len(self._buffer) > keep:
+                    pieces.append(self._buffer[:-keep])
+                    self._buffer = self._buffer[-keep:]
+                return pieces
+            else:
+                self._buffer = b""
+                return pieces
+
+    def close(self) -> None:
+        if self._state != "done":
+            raise ValueError("Multipart body ended before the file part was complete")
+
+
+def _feed_upload(parser: FastaHeaderParser, multipart: _MultipartFile | None, chunk: bytes) -> None:
+    for piece in multipart.feed(chunk) if multipart is not None else (chunk,):
+        parser.feed(piece)
+
+
+def _close_upload(parser: FastaHeaderParser, multipart: _MultipartFile | None) -> list[str]:
+    if multipart is not None:
+        multipart.close()
+    return parser.close()
+
+
+async def _scan_upload(request: Request, filename: str | None = None) -> tuple[list[str], str]:
+    """Gene IDs from a streamed FASTA request body (raw or multipart, plain or gzip) and its file name."""
+    content_type = request.headers.get("content-type", "")
+    multipart = None
+    if content_type.lower().startswith("multipart/form-data"):
+        boundary = re.search(r'boundary="?([^";]+)"?', content_type)
+        if not boundary:
+            raise HTTPException(400, "multipart/form-data request without a boundary")
+        multipart = _MultipartFile(boundary.group(1))
+    parser = FastaHeaderParser()
+    try:
+        with metrics.timer("fasta_upload_scan"):
+            async for chunk in request.stream():
+                # Header parsing and gzip inflation are CPU-bound; keep them off the event loop
+                await asyncio.to_thread(_feed_upload, parser, multipart, chunk)
+            gene_ids = await asyncio.to_thread(_close_upload, parser, multipart)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    metrics.inc("upload_bytes_total", parser.bytes_in)
+    metrics.inc("fasta_records_total", len(gene_ids))
+    name = (multipart.filename if multipart is not None else None) or filename or ""
+    return gene_ids, name
+
+
+@app.post("/orthologs/upload")
+async def upload_orthologs(
+    request: Request,
+    organism: str | None = None,
+    references: list[str] | None = Query(None),
+    columns: list[str] | None = Query(None),
+    filename: str | None = None,
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+):
+    """
+    Orthologs for a FASTA sent in the request body (raw, or the file part of multipart/form-data;
+    plain or gzip). Gene IDs are extracted as the body streams in; the file is never stored.
+    filename: original file name for organism inference when the body is raw.
+    limit, cursor: page through the result as for GET /orthologs (send the body again for each page).
+    """
+    gene_ids, name = await _scan_upload(request, filename)
+    if not gene_ids:
+        raise HTTPException(400, "No FASTA records in the request body")
+    try:
+        guess = infer_organism_from_name(name, gene_ids[0])
+        df, org = await _orthologs_for_genes(gene_ids, guess, organism, references)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return await asyncio.to_thread(_page_response, df, org, Path(name or "upload"), columns, limit, cursor)
+
+
+@app.post("/jobs", status_code=202)
+async def post_job(req: JobRequest):
+    """Queue an extraction in the background; poll GET /jobs/{job_id} for status and results."""
+    fasta_path = _resolve_fasta_path(req.fasta_path)
+    job = _jobs.submit(fasta_path, organism=req.organism, references=req.references)
+    return job.to_dict()
+
+
+@app.get("/jobs")
+async def list_jobs():
+    """All queued, running and recently finished jobs."""
+    return {"jobs": [job.to_dict() for job in _jobs.list()]}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    columns: list[str] | None = Query(None),
+    limit: int | None = Query(None, ge=1),
+    cursor: str | None = None,
+):
+    """Job status and progress; once done, also a page of result rows (see GET /orthologs)."""
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown or expired job: {job_id}")
+    body = job.to_dict()
+    if job.status == DONE:
+        body.update(
+            await asyncio.to_thread(
+                _page_response, job.result, job.organism, job.fasta_path, columns, limit, cursor
+            )
+        )
+    return body
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = _jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown or expired job: {job_id}")
+    return job.to_dict()
@@ -0,0 +1,294 @@
+"""
+Concurrent multi-target ortholog extraction.
+
+Fetches ortholog tables for many target genomes through one shared httpx.AsyncClient,
+with a configurable concurrency limit, writing one TSV per target and collecting a
+per-target success/failure result instead of aborting on the first error.
+
+extract_fastas() does the same for a directory or glob of genome FASTAs: files are
+scanned on a process pool, grouped by resolved organism so each organism's orthologs
+are fetched once, and written back out per file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from fungidb_orthologs import metrics
+from fungidb_orthologs.client import (
+    TABLE_COLUMNS,
+    _async_http_client,
+    fetch_ortholog_table_async,
+    get_orthologs_for_genes,
+    select_orthologs,
+)
+from fungidb_orthologs.config import DEFAULT_REFERENCE_SPECIES
+from fungidb_orthologs.genome_parser import scan_fasta
+from fungidb_orthologs.writers import DEFAULT_EXTENSION, write_orthologs
+
+DEFAULT_CONCURRENCY = 4
+FASTA_SUFFIXES = (".fa", ".fasta", ".fna", ".faa", ".ffn", ".fas", ".cds", ".pep")
+
+
+@dataclass
+class BatchTarget:
+    """One extraction job: target organism key, reference organism keys, optional output path."""
+
+    target: str
+    references: list[str]
+    output: Path | None = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one BatchTarget."""
+
+    target: str
+    ok: bool
+    rows: int = 0
+    output: Path | None = None
+    error: str | None = None
+
+
+def read_manifest(path: str | Path, default_references: list[str] | None = None) -> list[BatchTarget]:
+    """
+    Read a tab-separated manifest of target/reference pairs.
+
+    Each line: target<TAB>ref1,ref2,...[<TAB>output]. The references column may be empty
+    (default_references, or DEFAULT_REFERENCE_SPECIES, is used). Blank lines, lines starting
+    with '#' and a header line starting with 'target' are ignored.
+    """
+    targets = []
+    for line in Path(path).read_text().splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        fields = [f.strip() for f in line.split("\t")]
+        if fields[0].lower() == "target":
+            continue
+        refs = [r.strip() for r in fields[1].split(",") if r.strip()] if len(fields) > 1 else []
+        output = Path(fields[2]) if len(fields) > 2 and fields[2] else None
+        targets.append(
+            BatchTarget(
+                target=fields[0],
+                references=refs or list(default_references or DEFAULT_REFERENCE_SPECIES),
+                output=output,
+            )
+        )
+    return targets
+
+
+async def extract_batch_async(
+    targets: list[BatchTarget],
+    output_dir: str | Path = ".",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    use_cache: bool = True,
+    fmt: str = "tsv",
+) -> list[BatchResult]:
+    """
+    Extract orthologs for many targets concurrently (at most `concurrency` downloads at once).
+
+    Targets without an explicit output are written to output_dir/<target>_orthologs.<ext> in
+    format fmt (see fungidb_orthologs.writers); explicit outputs use their file extension.
+    Each target's table is fetched once even if it appears several times.
+    Returns one BatchResult per target, in input order.
+    """
+    output_dir = Path(output_dir)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tables: dict[str, asyncio.Task] = {}
+
+    async with _async_http_client() as client:
+
+        async def fetch(organism: str) -> pd.DataFrame:
+            async with semaphore:
+                return await fetch_ortholog_table_async(organism, client, use_cache=use_cache)
+
+        async def run(t: BatchTarget) -> BatchResult:
+            output = t.output or output_dir / f"{t.target}_orthologs{DEFAULT_EXTENSION[fmt]}"
+            try:
+                if t.target not in tables:
+                    tables[t.target] = asyncio.ensure_future(fetch(t.target))
+                df = await tables[t.target]
+                df = select_orthologs(df, reference_organisms=t.references).reset_index(drop=True)
+                await asyncio.to_thread(write_orthologs, df, output, None if t.output else fmt)
+            except Exception as e:
+                return BatchResult(target=t.target, ok=False, output=output, error=str(e))
+            return BatchResult(target=t.target, ok=True, rows=len(df), output=output)
+
+        return list(await asyncio.gather(*(run(t) for t in targets)))
+
+
+def extract_batch(
+    targets: list[BatchTarget],
+    output_dir: str | Path = ".",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    use_cache: bool = True,
+    fmt: str = "tsv",
+) -> list[BatchResult]:
+    """Synchronous wrapper around extract_batch_async."""
+    return asyncio.run(
+        extract_batch_async(targets, output_dir=output_dir, concurrency=concurrency, use_cache=use_cache, fmt=fmt)
+    )
+
+
+@dataclass
+class FastaResult:
+    """Outcome of one FASTA file in extract_fastas."""
+
+    fasta: Path
+    ok: bool
+    organism: str | None = None
+    genes: int = 0
+    rows: int = 0
+    output: Path | None = None
+    error: str | None = None
+
+
+def _fasta_stem(path: Path) -> str | None:
+    """File name without its FASTA (and .gz) suffix, or None if it is not a FASTA file."""
+    name = path.name
+    if name.lower().endswith(".gz"):
+        name = name[:-3]
+    for suffix in FASTA_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return None
+
+
+def find_fastas(sources: str | Path | Iterable[str | Path]) -> list[Path]:
+    """
+    Expand directories (their FASTA files, not recursive), glob patterns (``**`` recurses)
+    and plain paths into a sorted, de-duplicated list of FASTA files.
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    found: dict[Path, None] = {}
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            candidates = sorted(p for p in path.iterdir() if p.is_file() and _fasta_stem(p) is not None)
+        elif glob.has_magic(str(source)):
+            candidates = sorted(Path(p) for p in glob.glob(str(source), recursive=True) if Path(p).is_file())
+        else:
+            candidates = [path]
+        for p in candidates:
+            found.setdefault(p.resolve(), None)
+    return list(found)
+
+
+def _scan_one(path: Path) -> tuple[list[str], str | None] | Exception:
+    try:
+        return scan_fasta(path)
+    except Exception as e:  # reported per file by extract_fastas
+        return e
+
+
+def _scan_all(paths: list[Path], workers: int) -> list[tuple[list[str], str | None] | Exception]:
+    """scan_fasta for each path, on a process pool when there is more than one file."""
+    workers = min(max(1, workers), len(paths))
+    if workers == 1:
+        return [_scan_one(p) for p in paths]
+    # Child processes record their own metrics, so the scan is timed and counted here
+    with metrics.timer("fasta_scan"), ProcessPoolExecutor(max_workers=workers) as pool:
+        scans = list(pool.map(_scan_one, paths))
+    metrics.inc("fasta_records_total", sum(len(s[0]) for s in scans if not isinstance(s, Exception)))
+    return scans
+
+
+def _output_paths(paths: list[Path], output_dir: Path, fmt: str) -> list[Path]:
+    """<stem>_orthologs.<ext> per file; stems seen more than once get a numeric suffix."""
+    outputs, seen = [], {}
+    for path in paths:
+        stem = _fasta_stem(path) or path.stem
+        seen[stem] = seen.get(stem, 0) + 1
+        if seen[stem] > 1:
+            stem = f"{stem}_{seen[stem]}"
+        outputs.append(output_dir / f"{stem}_orthologs{DEFAULT_EXTENSION[fmt]}")
+    return outputs
+
+
+def extract_fastas(
+    sources: str | Path | Iterable[str | Path],
+    output_dir: str | Path = ".",
+    reference_species: list[str] | None = None,
+    organism: str | None = None,
+    workers: int | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    use_cache: bool = True,
+    strategy: str = "auto",
+    store=None,
+    fmt: str = "tsv",
+) -> list[FastaResult]:
+    """
+    Extract orthologs for every FASTA in a directory or glob, one output file per FASTA.
+
+    sources: directories, glob patterns and/or FASTA paths (see find_fastas).
+    organism: organism for every file; default inferred per file as in get_orthologs_for_genome.
+    workers: processes scanning FASTA headers (default: CPU count).
+    concurrency: organisms fetched at once. Files resolving to the same organism share one
+        lookup for the union of their gene IDs; each file's output is then filtered to its genes.
+    Outputs go to output_dir/<fasta name>_orthologs.<ext> in format fmt.
+    Returns one FastaResult per file, in sorted path order; failures do not stop other files.
+    """
+    from fungidb_orthologs.service import resolve_target_organism
+
+    paths = find_fastas(sources)
+    output_dir = Path(output_dir)
+    refs = reference_species or DEFAULT_REFERENCE_SPECIES
+    results = [FastaResult(fasta=p, ok=False, output=o) for p, o in zip(paths, _output_paths(paths, output_dir, fmt))]
+    if not paths:
+        return results
+
+    groups: dict[str, list[tuple[FastaResult, list[str]]]] = {}
+    for result, scan in zip(results, _scan_all(paths, workers or os.cpu_count() or 1)):
+        if isinstance(scan, Exception):
+            result.error = str(scan)
+            continue
+        gene_ids, inferred = scan
+        try:
+            result.organism = resolve_target_organism(organism, inferred, gene_ids)
+        except ValueError as e:
+            result.error = str(e)
+            continue
+        result.genes = len(gene_ids)
+        groups.setdefault(result.organism, []).append((result, gene_ids))
+
+    def run(org_key: str, members: list[tuple[FastaResult, list[str]]]) -> None:
+        union = list(dict.fromkeys(gid for _, ids in members for gid in ids))
+        try:
+            if union:
+                df = get_orthologs_for_genes(
+                    organism=org_key,
+                    gene_ids=union,
+                    reference_organisms=refs,
+                    use_cache=use_cache,
+                    strategy=strategy,
+                    store=store,
+                )
+            else:
+                # Only FASTAs without records: an empty ID list selects nothing (it is not "all genes")
+                df = pd.DataFrame(columns=list(TABLE_COLUMNS))
+        except Exception as e:
+            for result, _ in members:
+                result.error = str(e)
+            return
+        for result, ids in members:
+            try:
+                part = df if len(members) == 1 else select_orthologs(df, gene_ids=ids).reset_index(drop=True)
+                write_orthologs(part, result.output, fmt)
+            except Exception as e:
+                result.error = str(e)
+                continue
+            result.ok, result.rows = True, len(part)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for future in [pool.submit(metrics.in_context(run), org_key, members) for org_key, members in groups.items()]:
+            future.result()
+    return results
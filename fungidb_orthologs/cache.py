@@ -0,0 +1,360 @@
+"""
+Persistent on-disk cache for FungiDB ortholog tables.
+
+Tables are stored one file per (organism, release) in a columnar format
+(Parquet when pyarrow is installed, pickle otherwise), tracked by a small
+JSON index with creation times for TTL expiry. A cache hit only touches the table
+file's modification time, which serves as its access time for LRU eviction, so reads
+never rewrite the index. Index updates hold a lock file (fcntl.flock), since API
+workers, the daemon and CLI runs may share one cache directory.
+Long-running processes can put an in-memory LRU (OrthologCache.memory) in front of
+the disk so repeated lookups skip re-reading the file.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from fungidb_orthologs import config, metrics
+from fungidb_orthologs.coalesce import TTLCache
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", value)
+
+
+def _default_release() -> str:
+    from fungidb_orthologs.genomes import current_release
+
+    return current_release()
+
+
+def _listing_stamp(organism: str) -> str | None:
+    from fungidb_orthologs.genomes import default_catalog
+
+    return default_catalog().modified().get(organism)
+
+
+class OrthologCache:
+    """
+    Size-bounded LRU cache of ortholog tables keyed by organism key and FungiDB release.
+
+    The release defaults to genomes.current_release() (FUNGIDB_RELEASE, else the catalog's
+    build number), so tables from an older FungiDB build are not served after a new release.
+    Tables cached as "current" before the catalog existed move to its build number on first use.
+
+    directory: cache location (default: config.CACHE_DIR).
+    max_bytes: evict least recently used tables once the cache exceeds this size.
+    ttl: seconds after which a cached table is considered stale (0 = never).
+    memory: optional in-memory LRU of recently read tables; entries are keyed by the index
+        entry's file and creation time, so a table replaced by another process is re-read.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path | None = None,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+        memory: TTLCache | None = None,
+    ):
+        self.directory = Path(directory if directory is not None else config.CACHE_DIR)
+        self.max_bytes = config.CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.ttl = config.CACHE_TTL if ttl is None else ttl
+        self.memory = memory
+        self._lock = threading.Lock()
+
+    # -- index ---------------------------------------------------------------
+
+    def _index_path(self) -> Path:
+        return self.directory / INDEX_FILE
+
+    def _read_index(self) -> dict[str, dict]:
+        try:
+            return json.loads(self._index_path().read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Exclusive lock for a read-modify-write of the index, across threads and processes."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.directory / LOCK_FILE, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _tmp_path(self, path: Path) -> Path:
+        """Unique temporary file next to path, to be moved over it once written."""
+        fd, name = tempfile.mkstemp(dir=self.directory, prefix=f".{path.name}.", suffix=".tmp")
+        os.close(fd)
+        return Path(name)
+
+    def _write_index(self, index: dict[str, dict]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self._tmp_path(self._index_path())
+        tmp.write_text(json.dumps(index, indent=1, sort_keys=True))
+        tmp.replace(self._index_path())
+
+    @staticmethod
+    def _key(organism: str, release: str) -> str:
+        return f"{organism}@{release}"
+
+    def _expired(self, entry: dict, now: float) -> bool:
+        return bool(self.ttl) and now - entry["created"] > self.ttl
+
+    def _accessed(self, entry: dict) -> float:
+        """Last access: the table file's modification time, touched on every hit."""
+        try:
+            return max(entry["accessed"], (self.directory / entry["file"]).stat().st_mtime)
+        except FileNotFoundError:
+            return entry["accessed"]
+
+    def _drop(self, index: dict[str, dict], key: str) -> None:
+        entry = index.pop(key, None)
+        if entry:
+            (self.directory / entry["file"]).unlink(missing_ok=True)
+
+    def _lookup(self, organism: str, release: str | None) -> tuple[str, dict | None]:
+        """
+        Index key and entry for organism at release (default: the current release).
+
+        Tables cached before the local catalog knew the FungiDB build number are labelled
+        config.FUNGIDB_RELEASE ("current"); the first default lookup afterwards moves such a
+        table to the build number instead of missing it. Its creation time is kept for the TTL.
+        """
+        explicit = release is not None
+        release = release or _default_release()
+        key = self._key(organism, release)
+        entry = self._read_index().get(key)
+        if entry is not None or explicit or release == config.FUNGIDB_RELEASE:
+            return key, entry
+        unversioned = self._key(organism, config.FUNGIDB_RELEASE)
+        with self._locked():
+            index = self._read_index()
+            old = index.get(unversioned)
+            if key in index or old is None or not (self.directory / old["file"]).exists():
+                return key, index.get(key)
+            old_path = self.directory / old["file"]
+            path = old_path.with_name(self._stem(organism, release) + old_path.suffix)
+            old_path.replace(path)
+            del index[unversioned]
+            index[key] = entry = {**old, "release": release, "file": path.name}
+            self._write_index(index)
+        return key, entry
+
+    # -- public API ----------------------------------------------------------
+
+    def get(self, organism: str, release: str | None = None) -> pd.DataFrame | None:
+        """Return the cached table for organism, or None on a miss or expired entry."""
+        key, entry = self._lookup(organism, release)
+        if entry is None:
+            metrics.inc("cache_requests_total", cache="disk", result="miss")
+            return None
+        path = self.directory / entry["file"]
+        if self._expired(entry, time.time()) or not path.exists():
+            with self._locked():
+                index = self._read_index()
+                # Another process may have replaced the entry in the meantime
+                if index.get(key) == entry:
+                    self._drop(index, key)
+                    self._write_index(index)
+            metrics.inc("cache_requests_total", cache="disk", result="miss")
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            metrics.inc("cache_requests_total", cache="disk", result="miss")
+            return None
+        memory_key = (entry["file"], entry["created"])
+        if self.memory is not None:
+            df = self.memory.get(memory_key)
+            if df is not None:
+                metrics.inc("cache_requests_total", cache="memory", result="hit")
+                return df
+            metrics.inc("cache_requests_total", cache="memory", result="miss")
+        metrics.inc("cache_requests_total", cache="disk", result="hit")
+        df = self._read_file(path)
+        if self.memory is not None:
+            self.memory.put(memory_key, df)
+        return df
+
+    @staticmethod
+    def _read_file(path: Path) -> pd.DataFrame:
+        with metrics.timer("cache_read"):
+            return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_pickle(path)
+
+    def read(self, entry: dict) -> pd.DataFrame | None:
+        """
+        Table of an index entry (from entries() or entry()) without marking it as used, so
+        bulk readers such as the organism index do not disturb LRU eviction. None if it is gone.
+        """
+        try:
+            return self._read_file(self.directory / entry["file"])
+        except FileNotFoundError:
+            return None
+
+    def entry(self, organism: str, release: str | None = None) -> dict | None:
+        """Index entry of a live cached table (no access-time update, table not read), else None."""
+        entry = self._lookup(organism, release)[1]
+        if entry is None or self._expired(entry, time.time()) or not (self.directory / entry["file"]).exists():
+            return None
+        return entry
+
+    @staticmethod
+    def _stem(organism: str, release: str) -> str:
+        return f"{_safe_name(organism)}__{_safe_name(release)}"
+
+    def put(
+        self,
+        organism: str,
+        df: pd.DataFrame,
+        release: str | None = None,
+        modified: str | None = None,
+    ) -> Path:
+        """
+        Store a table, then evict least recently used entries over max_bytes.
+
+        modified: the organism's last-modified stamp in the FungiDB downloads listing when the
+        table was fetched (default: from the local genome catalog); refresh uses it to skip
+        organisms that did not change.
+        """
+        release = release or _default_release()
+        modified = modified or _listing_stamp(organism)
+        key = self._key(organism, release)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = self._stem(organism, release)
+        if _parquet_available():
+            path = self.directory / f"{stem}.parquet"
+            tmp = self._tmp_path(path)
+            df.to_parquet(tmp, index=False)
+        else:
+            path = self.directory / f"{stem}.pkl"
+            tmp = self._tmp_path(path)
+            df.to_pickle(tmp)
+        tmp.replace(path)
+        now = time.time()
+        with self._locked():
+            index = self._read_index()
+            old = index.get(key)
+            if old and old["file"] != path.name:
+                (self.directory / old["file"]).unlink(missing_ok=True)
+            index[key] = {
+                "organism": organism,
+                "release": release,
+                "file": path.name,
+                "size": path.stat().st_size,
+                "created": now,
+                "accessed": now,
+                "modified": modified,
+            }
+            self._evict(index, keep=key)
+            self._write_index(index)
+        if self.memory is not None:
+            self.memory.put((path.name, now), df)
+        return path
+
+    def retag(self, organism: str, release: str, new_release: str, modified: str | None = None) -> bool:
+        """
+        Relabel a cached table as belonging to new_release without re-downloading it.
+
+        Used when a new FungiDB release did not change the organism. The entry's creation time
+        is reset so it is not expired by the TTL. Returns False if there is no such entry.
+        """
+        old_key, new_key = self._key(organism, release), self._key(organism, new_release)
+        with self._locked():
+            index = self._read_index()
+            entry = index.get(old_key)
+            if entry is None or not (self.directory / entry["file"]).exists():
+                return False
+            if old_key == new_key:
+                return True
+            self._drop(index, new_key)
+            old_path = self.directory / entry["file"]
+            path = old_path.with_name(self._stem(organism, new_release) + old_path.suffix)
+            old_path.replace(path)
+            now = time.time()
+            del index[old_key]
+            index[new_key] = {
+                **entry,
+                "release": new_release,
+                "file": path.name,
+                "created": now,
+                "accessed": now,
+                "modified": modified if modified is not None else entry.get("modified"),
+            }
+            self._write_index(index)
+        return True
+
+    def _evict(self, index: dict[str, dict], keep: str | None = None) -> None:
+        now = time.time()
+        for key in [k for k, e in index.items() if self._expired(e, now)]:
+            self._drop(index, key)
+        if not self.max_bytes:
+            return
+        total = sum(e["size"] for e in index.values())
+        for key in sorted(index, key=lambda k: self._accessed(index[k])):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= index[key]["size"]
+            self._drop(index, key)
+
+    def entries(self) -> list[dict]:
+        """List cache entries (organism, release, file, size, created, accessed, modified), newest first."""
+        entries = [{**e, "accessed": self._accessed(e)} for e in self._read_index().values()]
+        return sorted(entries, key=lambda e: e["accessed"], reverse=True)
+
+    def remove(self, organism: str | None = None, release: str | None = None) -> int:
+        """Remove matching entries (all entries if organism and release are None). Returns count."""
+        with self._locked():
+            index = self._read_index()
+            keys = [
+                k
+                for k, e in index.items()
+                if (organism is None or e["organism"] == organism)
+                and (release is None or e["release"] == release)
+            ]
+            for key in keys:
+                self._drop(index, key)
+            self._write_index(index)
+        return len(keys)
+
+    def clear(self) -> int:
+        """Remove every cached table. Returns the number of entries removed."""
+        return self.remove()
+
+
+_default_cache: OrthologCache | None = None
+
+
+def default_cache() -> OrthologCache:
+    """Process-wide cache using the settings in config."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = OrthologCache()
+    return _default_cache
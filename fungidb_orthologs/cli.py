@@ -5,32 +5,88 @@ Command-line interface for fungidb-orthologs.
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 from pathlib import Path
 
+COMMANDS = (
+    "list-genomes",
+    "extract",
+    "extract-batch",
+    "orthogroups",
+    "matrix",
+    "infer",
+    "refresh",
+    "ingest",
+    "cache",
+    "daemon",
+)
+# Arguments holding file paths; made absolute when a command runs in the daemon
+PATH_ARGS = (
+    "fasta_path",
+    "output",
+    "output_dir",
+    "manifest",
+    "fastas",
+    "store",
+    "profile_file",
+    "diff_dir",
+    "directory",
+)
+
+
+def _open_store(args: argparse.Namespace):
+    """OrthologStore for --store (None without it); exits with status 1 if the file does not exist."""
+    if not args.store:
+        return None
+    from fungidb_orthologs.store import OrthologStore
+
+    if not Path(args.store).exists():
+        print(f"Error: ortholog store not found: {args.store} (run 'fungidb-orthologs ingest')", file=sys.stderr)
+        raise SystemExit(1)
+    return OrthologStore(args.store)
+
 
 def cmd_list_genomes(args: argparse.Namespace) -> int:
     """List all available FungiDB genomes."""
-    from fungidb_orthologs.genomes import list_genomes
+    from fungidb_orthologs.genomes import default_catalog
 
+    catalog = default_catalog()
     try:
-        genomes = list_genomes()
+        if args.refresh:
+            catalog.refresh(force=True)
+        genomes = catalog.genomes(offline=args.offline)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
+    if args.match:
+        resolver = catalog.resolver()
+        key = resolver.resolve(args.match)
+        if key is None:
+            candidates = resolver.candidates(args.match)
+            print(f"Error: could not resolve {args.match!r}", file=sys.stderr)
+            if candidates:
+                print(f"Did you mean: {', '.join(candidates)}", file=sys.stderr)
+            return 1
+        print(f"{key}\t{resolver.display_name(key) or ''}" if args.names else key)
+        return 0
     for g in genomes:
-        print(g)
-    print(f"\nTotal: {len(genomes)} genomes", file=sys.stderr)
+        print(f"{g['key']}\t{g.get('name') or ''}" if args.names else g["key"])
+    release = catalog.release
+    print(f"\nTotal: {len(genomes)} genomes" + (f" (release {release})" if release else ""), file=sys.stderr)
     return 0
 
 
 def cmd_extract(args: argparse.Namespace) -> int:
     """Extract orthologs for a target genome from reference genomes."""
+    from fungidb_orthologs.genomes import resolve_organism
+    from fungidb_orthologs.metrics import timer
     from fungidb_orthologs.service import get_orthologs_for_genome
+    from fungidb_orthologs.writers import write_orthologs
     from fungidb_orthologs.service import get_orthologs_by_organism
 
-    target = args.target
-    references = args.references
+    target = args.target and (resolve_organism(args.target) or args.target)
+    references = args.references and [resolve_organism(r) or r for r in args.references]
     fasta_path = args.fasta_path
     output = args.output
 
@@ -38,6 +94,8 @@ def cmd_extract(args: argparse.Namespace) -> int:
         print("Error: Specify at least one reference genome with --references", file=sys.stderr)
         return 1
 
+    store = _open_store(args)
+
     try:
         if fasta_path:
             path = Path(fasta_path)
@@ -50,6 +108,11 @@ def cmd_extract(args: argparse.Namespace) -> int:
                 path,
                 organism=target,
                 reference_species=references,
+                use_cache=not args.no_cache,
+                stream=args.stream,
+                strategy=args.strategy,
+                store=store,
+                reciprocal=args.reciprocal,
             )
             print(f"Target organism (from FASTA): {organism}", file=sys.stderr)
         else:
@@ -59,37 +122,423 @@ def cmd_extract(args: argparse.Namespace) -> int:
             df = get_orthologs_by_organism(
                 target_organism=target,
                 reference_organisms=references,
+                use_cache=not args.no_cache,
+                stream=args.stream,
+                store=store,
+                reciprocal=args.reciprocal,
             )
             organism = target
 
         print(f"Reference genomes: {', '.join(references)}", file=sys.stderr)
         print(f"Ortholog rows: {len(df)}", file=sys.stderr)
+        if args.reciprocal == "flag":
+            print(f"Reciprocal pairs: {int(df['RECIPROCAL'].sum())}", file=sys.stderr)
 
+        with timer("write"):
+            write_orthologs(df, output or sys.stdout, fmt=args.format)
         if output:
-            Path(output).write_text(df.to_csv(sep="\t", index=False))
             print(f"Wrote {output}", file=sys.stderr)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_extract_batch(args: argparse.Namespace) -> int:
+    """Extract orthologs for many target genomes concurrently."""
+    from fungidb_orthologs.batch import BatchTarget, extract_batch, read_manifest
+
+    if args.fastas:
+        return _extract_fastas(args)
+    if args.manifest:
+        targets = read_manifest(args.manifest, default_references=args.references)
+    elif args.targets:
+        if not args.references:
+            print("Error: Specify at least one reference genome with --references", file=sys.stderr)
+            return 1
+        targets = [BatchTarget(target=t, references=args.references) for t in args.targets]
+    else:
+        print("Error: Specify --targets, --manifest or --fastas", file=sys.stderr)
+        return 1
+
+    results = extract_batch(
+        targets,
+        output_dir=args.output_dir,
+        concurrency=args.concurrency,
+        use_cache=not args.no_cache,
+        fmt=args.format,
+    )
+    failed = 0
+    for r in results:
+        if r.ok:
+            print(f"OK\t{r.target}\t{r.rows} rows\t{r.output}", file=sys.stderr)
+        else:
+            failed += 1
+            print(f"FAILED\t{r.target}\t{r.error}", file=sys.stderr)
+    print(f"\n{len(results) - failed}/{len(results)} targets succeeded", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _extract_fastas(args: argparse.Namespace) -> int:
+    """extract-batch --fastas: one output per FASTA, one lookup per organism."""
+    from fungidb_orthologs.batch import extract_fastas, find_fastas
+
+    store = _open_store(args)
+    if not find_fastas(args.fastas):
+        print(f"Error: no FASTA files found in {' '.join(args.fastas)}", file=sys.stderr)
+        return 1
+    results = extract_fastas(
+        args.fastas,
+        output_dir=args.output_dir,
+        reference_species=args.references,
+        organism=args.organism,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        use_cache=not args.no_cache,
+        strategy=args.strategy,
+        store=store,
+        fmt=args.format,
+    )
+    failed = 0
+    for r in results:
+        if r.ok:
+            print(f"OK\t{r.fasta}\t{r.organism}\t{r.rows} rows\t{r.output}", file=sys.stderr)
         else:
-            print(df.to_csv(sep="\t", index=False))
+            failed += 1
+            print(f"FAILED\t{r.fasta}\t{r.error}", file=sys.stderr)
+    organisms = len({r.organism for r in results if r.organism})
+    print(
+        f"\n{len(results) - failed}/{len(results)} FASTA files succeeded ({organisms} organisms)",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def cmd_orthogroups(args: argparse.Namespace) -> int:
+    """Query transitive orthogroups across cached ortholog tables."""
+    from fungidb_orthologs.client import fetch_ortholog_table
+    from fungidb_orthologs.orthogroups import OrthogroupIndex
+
+    try:
+        if args.organisms:
+            tables = {o: fetch_ortholog_table(o) for o in args.organisms}
+            index = OrthogroupIndex.from_tables(tables)
+        else:
+            index = OrthogroupIndex.from_cache()
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Indexed {index.n_genes} genes in {index.n_groups} orthogroups", file=sys.stderr)
+
+    if args.genes:
+        import pandas as pd
+
+        frames = []
+        for gid in args.genes:
+            members = index.members(gid)
+            if members.empty:
+                print(f"Warning: {gid} not found in any indexed table", file=sys.stderr)
+            frames.append(members.assign(QUERY=gid))
+        df = pd.concat(frames, ignore_index=True)[["QUERY", "ORTHOGROUP", "GID", "ORGANISM"]]
+    else:
+        df = index.groups(min_size=args.min_size)
+
+    if args.output:
+        Path(args.output).write_text(df.to_csv(sep="\t", index=False))
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(df.to_csv(sep="\t", index=False))
+    return 0
+
+
+def cmd_matrix(args: argparse.Namespace) -> int:
+    """Build a gene x genome ortholog copy-number (or presence/absence) matrix."""
+    from fungidb_orthologs.genomes import resolve_organism
+    from fungidb_orthologs.matrix import build_matrix
+    from fungidb_orthologs.metrics import timer
+
+    targets = args.targets and [resolve_organism(t) or t for t in args.targets]
+    references = args.references and [resolve_organism(r) or r for r in args.references]
+    store = _open_store(args)
+    try:
+        matrix = build_matrix(targets or None, references or None, use_cache=not args.no_cache, store=store)
+        if args.presence:
+            matrix = matrix.presence()
+        n_genes, n_genomes = matrix.shape
+        print(f"Matrix: {n_genes} genes x {n_genomes} genomes, {matrix.nnz} non-zero entries", file=sys.stderr)
+        with timer("write"):
+            matrix.write(args.output or sys.stdout, fmt=args.format)
+        if args.output:
+            print(f"Wrote {args.output}", file=sys.stderr)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_infer(args: argparse.Namespace) -> int:
+    """Infer each FASTA's FungiDB organism from its gene IDs with the locus-tag prefix index."""
+    from fungidb_orthologs.cache import default_cache
+    from fungidb_orthologs.genome_parser import scan_fasta
+    from fungidb_orthologs.organism_index import OrganismIndex
+
+    store = _open_store(args)
+    index = OrganismIndex()
+    if args.rebuild:
+        index.path.unlink(missing_ok=True)
+        index = OrganismIndex(index.path)
+    added = index.update(cache=default_cache(), store=store)
+    print(f"Organism index: {len(index)} organisms ({added} new sources)", file=sys.stderr)
+    if not len(index):
+        print("Warning: the index is empty (cache or ingest some tables); using filename heuristics", file=sys.stderr)
+    status = 0
+    print("file\torganism\tconfidence\tmatched\tsampled")
+    for fasta in args.fastas:
+        try:
+            gene_ids, inferred = scan_fasta(fasta)
+        except Exception as e:
+            print(f"Error: {fasta}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        guess = index.infer(gene_ids)
+        organism = guess.organism if guess.confident else (inferred or guess.organism or "")
+        print(f"{fasta}\t{organism}\t{guess.confidence:.3f}\t{guess.matched}\t{guess.sampled}")
+    return status
+
+
+def cmd_ingest(args: argparse.Namespace) -> int:
+    """Load FungiDB/OrthoMCL bulk ortholog files into the offline store."""
+    from fungidb_orthologs.store import OrthologStore
+
+    directory = Path(args.directory)
+    if not directory.is_dir():
+        print(f"Error: not a directory: {directory}", file=sys.stderr)
+        return 1
+    store = OrthologStore(args.store)
+    try:
+        loaded = store.ingest(directory)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    for path, rows in loaded.items():
+        print(f"{path}\t{rows} rows", file=sys.stderr)
+    print(f"\nIngested {len(loaded)} files into {store.path}", file=sys.stderr)
+    return 0
+
+
+def cmd_cache(args: argparse.Namespace) -> int:
+    """Inspect, clear or pre-populate the on-disk ortholog table cache."""
+    from fungidb_orthologs.cache import default_cache
+
+    cache = default_cache()
+    if args.cache_command == "list":
+        entries = cache.entries()
+        for e in entries:
+            print(f"{e['organism']}\t{e['release']}\t{e['size']}\t{e['file']}")
+        total = sum(e["size"] for e in entries)
+        print(f"\nTotal: {len(entries)} tables, {total} bytes in {cache.directory}", file=sys.stderr)
+    elif args.cache_command == "clear":
+        n = cache.remove(organism=args.organism)
+        print(f"Removed {n} cached tables", file=sys.stderr)
+    elif args.cache_command == "warm":
+        from fungidb_orthologs.client import download_ortholog_table
+
+        failed = 0
+        for organism in args.organisms:
+            try:
+                df = download_ortholog_table(organism)
+            except Exception as e:
+                print(f"Error: {organism}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            cache.put(organism, df)
+            print(f"Cached {organism}: {len(df)} rows", file=sys.stderr)
+        return 1 if failed else 0
+    return 0
+
+
+def cmd_refresh(args: argparse.Namespace) -> int:
+    """Update cached ortholog tables to the latest FungiDB release, re-fetching only what changed."""
+    from fungidb_orthologs.refresh import FAILED, UPDATED, refresh_cache
+
+    try:
+        results = refresh_cache(
+            args.organisms or None,
+            force=args.force,
+            diff_dir=args.diff_dir,
+            concurrency=args.concurrency,
+        )
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
+    for r in results:
+        if r.status == FAILED:
+            print(f"Error: {r.organism}: {r.error}", file=sys.stderr)
+            continue
+        line = f"{r.organism}\t{r.old_release or '-'} -> {r.new_release}\t{r.status}"
+        if r.diff is not None or r.added or r.removed:
+            line += f"\t+{r.added}\t-{r.removed}"
+        print(line)
+    fetched = sum(r.status == UPDATED for r in results)
+    failed = sum(r.status == FAILED for r in results)
+    print(
+        f"\nRefreshed {len(results)} organisms: {fetched} downloaded, {failed} failed",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+def cmd_daemon(args: argparse.Namespace) -> int:
+    """Start, stop or inspect the warm local daemon."""
+    from fungidb_orthologs import daemon
+
+    if args.daemon_command == "start":
+        if args.foreground:
+            try:
+                daemon.serve(args.socket)
+            except RuntimeError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+            return 0
+        try:
+            status = daemon.start(args.socket)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Daemon running (pid {status['pid']}) on {status['socket']}", file=sys.stderr)
+    elif args.daemon_command == "stop":
+        if not daemon.stop(args.socket):
+            print("No daemon running", file=sys.stderr)
+            return 1
+        print("Daemon stopped", file=sys.stderr)
+    else:
+        status = daemon.status(args.socket)
+        if status is None:
+            print("No daemon running", file=sys.stderr)
+            return 1
+        for key, value in status.items():
+            print(f"{key}\t{value}")
     return 0
 
 
+def _absolute_paths(args: argparse.Namespace, cwd: str) -> None:
+    """Resolve relative path arguments against the calling process's working directory."""
+
+    def resolve(value: str) -> str:
+        return value if value == "-" else os.path.join(cwd, os.path.expanduser(value))
+
+    for name in PATH_ARGS:
+        value = getattr(args, name, None)
+        if isinstance(value, str):
+            setattr(args, name, resolve(value))
+        elif isinstance(value, list):
+            setattr(args, name, [resolve(v) for v in value])
+
+
+def _choice_from(module: str, name: str):
+    """
+    argparse type accepting the values of module.name, imported only when the option is used
+    (the writers and matrix modules load pandas, which commands without --format never need).
+    """
+
+    def check(value: str) -> str:
+        import importlib
+
+        choices = getattr(importlib.import_module(module), name)
+        if value not in choices:
+            raise argparse.ArgumentTypeError(f"invalid choice: {value!r} (choose from {', '.join(choices)})")
+        return value
+
+    return check
+
+
+def _run_profiled(args: argparse.Namespace) -> int:
+    """Run a command with its own metrics registry and write the --profile report."""
+    import json
+    import time
+
+    from fungidb_orthologs.metrics import collect
+
+    start = time.perf_counter()
+    # Not the process-wide registry: in the daemon, other commands may be running alongside
+    with collect() as metrics:
+        try:
+            return args.func(args)
+        finally:
+            report = {
+                "command": args.command,
+                "total_seconds": time.perf_counter() - start,
+                **metrics.snapshot(),
+            }
+            text = json.dumps(report, indent=1)
+            if args.profile_file is None:
+                print(text, file=sys.stderr)
+            else:
+                Path(args.profile_file).write_text(text + "\n")
+                print(f"Wrote profile to {args.profile_file}", file=sys.stderr)
+
+
 def main() -> int:
+    from fungidb_orthologs.daemon import forward
+
+    argv = sys.argv[1:]
+    code = forward(argv)
+    if code is not None:
+        return code
+    return run(argv)
+
+
+def run(argv: list[str] | None = None, cwd: str | None = None) -> int:
+    """
+    Parse and run a command in this process.
+
+    cwd: working directory of the caller (for commands run on its behalf by the daemon);
+        relative paths in the arguments are resolved against it.
+    """
+    from fungidb_orthologs.config import DAEMON_SOCKET, STORE_PATH
+
     parser = argparse.ArgumentParser(
         prog="fungidb-orthologs",
         description="Fetch orthologs from FungiDB for fungal genomes.",
     )
+    profile_help = "Print a JSON report of stage timings, bytes, row counts and cache hits to stderr"
+    profile_file_help = "Write the --profile report to FILE instead (implies --profile)"
+    parser.add_argument("--profile", action="store_true", help=profile_help)
+    parser.add_argument("--profile-file", metavar="FILE", help=profile_file_help)
+    # Also accept both after the subcommand without overriding a value given before it
+    profile_opts = argparse.ArgumentParser(add_help=False)
+    profile_opts.add_argument("--profile", action="store_true", default=argparse.SUPPRESS, help=profile_help)
+    profile_opts.add_argument("--profile-file", metavar="FILE", default=argparse.SUPPRESS, help=profile_file_help)
     sub = parser.add_subparsers(dest="command", required=True)
 
     # list-genomes
-    p_list = sub.add_parser("list-genomes", help="List all available FungiDB genomes")
+    p_list = sub.add_parser("list-genomes", parents=[profile_opts], help="List all available FungiDB genomes")
+    p_list.add_argument(
+        "--names",
+        action="store_true",
+        help="Also print each genome's display name",
+    )
+    p_list.add_argument(
+        "--match",
+        "-m",
+        help="Resolve a name, abbreviation or prefix (e.g. 'A. fumigatus A1163') to an organism key",
+    )
+    p_list.add_argument(
+        "--offline",
+        action="store_true",
+        help="Only use the local genome catalog (no network access)",
+    )
+    p_list.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-download the genome catalog even if it is up to date",
+    )
     p_list.set_defaults(func=cmd_list_genomes)
 
     # extract
     p_extract = sub.add_parser(
         "extract",
+        parents=[profile_opts],
         help="Extract orthologs from target genome to reference genomes",
     )
     p_extract.add_argument(
@@ -112,9 +561,296 @@ def main() -> int:
     p_extract.add_argument(
         "-o",
         "--output",
-        help="Write results to TSV file",
+        help="Write results to a file (.tsv, .tsv.gz, .parquet, .feather/.arrow, .jsonl; default: TSV to stdout)",
+    )
+    p_extract.add_argument(
+        "--format",
+        type=_choice_from("fungidb_orthologs.writers", "FORMATS"),
+        help="Output format (default: from the --output extension, else tsv)",
+    )
+    p_extract.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk ortholog table cache and always download from FungiDB",
+    )
+    p_extract.add_argument(
+        "--stream",
+        action="store_true",
+        help="On a cache miss, download and filter the ortholog table in chunks to bound memory use",
+    )
+    p_extract.add_argument(
+        "--strategy",
+        choices=["auto", "table", "genes"],
+        default="auto",
+        help="With --fasta: 'genes' queries FungiDB by gene-ID list, 'table' downloads the whole "
+        "organism table, 'auto' (default) picks 'genes' for small gene lists and falls back to 'table'",
+    )
+    p_extract.add_argument(
+        "--store",
+        nargs="?",
+        const=str(STORE_PATH),
+        help="Serve from the offline ortholog store built by 'ingest' (no network). "
+        f"Default path: {STORE_PATH}",
+    )
+    p_extract.add_argument(
+        "--reciprocal",
+        nargs="?",
+        const="keep",
+        choices=["keep", "flag"],
+        help="Check pairs against each reference's own ortholog table: 'keep' (default) outputs only "
+        "reciprocal pairs, 'flag' adds a RECIPROCAL column",
     )
     p_extract.set_defaults(func=cmd_extract)
 
-    args = parser.parse_args()
-    return args.func(args)
+    # extract-batch
+    p_batch = sub.add_parser(
+        "extract-batch",
+        parents=[profile_opts],
+        help="Extract orthologs for many target genomes concurrently",
+    )
+    p_batch.add_argument(
+        "--targets",
+        "-t",
+        nargs="+",
+        help="Target genomes (FungiDB organism keys)",
+    )
+    p_batch.add_argument(
+        "--manifest",
+        "-m",
+        help="TSV of target<TAB>ref1,ref2,...[<TAB>output] lines (instead of --targets)",
+    )
+    p_batch.add_argument(
+        "--fastas",
+        nargs="+",
+        metavar="PATH",
+        help="Genome FASTA directories, glob patterns (quote them; ** recurses) or files: one output per "
+        "FASTA, each organism's orthologs fetched once (instead of --targets)",
+    )
+    p_batch.add_argument(
+        "--references",
+        "-r",
+        nargs="+",
+        help="Reference genomes (required with --targets; default for manifest lines without references "
+        "and for --fastas)",
+    )
+    p_batch.add_argument(
+        "--organism",
+        help="With --fastas: organism of every file (default: inferred per file from locus_tag)",
+    )
+    p_batch.add_argument(
+        "--workers",
+        type=int,
+        help="With --fastas: processes scanning FASTA files (default: CPU count)",
+    )
+    p_batch.add_argument(
+        "--strategy",
+        choices=["auto", "table", "genes"],
+        default="auto",
+        help="With --fastas: how to look up orthologs on a cache miss (see extract --strategy)",
+    )
+    p_batch.add_argument(
+        "--store",
+        nargs="?",
+        const=str(STORE_PATH),
+        help="With --fastas: serve from the offline ortholog store built by 'ingest' (no network)",
+    )
+    p_batch.add_argument(
+        "--output-dir",
+        "-d",
+        default=".",
+        help="Directory for per-target output files (<target>_orthologs.tsv, or <fasta name>_orthologs.tsv)",
+    )
+    p_batch.add_argument(
+        "--format",
+        type=_choice_from("fungidb_orthologs.writers", "FORMATS"),
+        default="tsv",
+        help="Output format for files in --output-dir (default: tsv); manifest outputs use their extension",
+    )
+    p_batch.add_argument(
+        "--concurrency",
+        "-j",
+        type=int,
+        default=4,
+        help="Maximum number of concurrent FungiDB downloads or organism lookups (default: 4)",
+    )
+    p_batch.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk ortholog table cache and always download from FungiDB",
+    )
+    p_batch.set_defaults(func=cmd_extract_batch)
+
+    # orthogroups
+    p_groups = sub.add_parser(
+        "orthogroups",
+        parents=[profile_opts],
+        help="Transitive orthogroups across ortholog tables (default: all cached organisms)",
+    )
+    p_groups.add_argument(
+        "--organisms",
+        nargs="+",
+        help="Organism tables to index (fetched and cached if needed). Default: every cached table.",
+    )
+    p_groups.add_argument(
+        "--gene",
+        "-g",
+        dest="genes",
+        nargs="+",
+        help="Report the orthogroup members of these gene IDs (default: list all orthogroups)",
+    )
+    p_groups.add_argument(
+        "--min-size",
+        type=int,
+        default=2,
+        help="When listing all orthogroups, skip groups smaller than this (default: 2)",
+    )
+    p_groups.add_argument(
+        "-o",
+        "--output",
+        help="Write results to TSV file",
+    )
+    p_groups.set_defaults(func=cmd_orthogroups)
+
+    # matrix
+    p_matrix = sub.add_parser(
+        "matrix",
+        parents=[profile_opts],
+        help="Gene x genome ortholog copy-number matrix (phylogenetic profiles)",
+    )
+    p_matrix.add_argument(
+        "--targets",
+        "-t",
+        nargs="+",
+        help="Target genomes whose genes form the rows (default: every cached organism, or every store organism)",
+    )
+    p_matrix.add_argument(
+        "--references",
+        "-r",
+        nargs="+",
+        help="Genome columns, in this order (default: every partner genome found)",
+    )
+    p_matrix.add_argument(
+        "--presence",
+        action="store_true",
+        help="Write 0/1 presence/absence instead of ortholog copy numbers",
+    )
+    p_matrix.add_argument(
+        "-o",
+        "--output",
+        help="Output file: .mtx[.gz] for sparse Matrix Market (plus .genes.tsv/.genomes.tsv labels), "
+        "else dense TSV (default: dense TSV to stdout)",
+    )
+    p_matrix.add_argument(
+        "--format",
+        type=_choice_from("fungidb_orthologs.matrix", "MATRIX_FORMATS"),
+        help="mtx (sparse), tsv (dense) or triplets (GID/GENOME/COPIES rows; .parquet, .tsv, ... by extension)",
+    )
+    p_matrix.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk ortholog table cache and always download from FungiDB",
+    )
+    p_matrix.add_argument(
+        "--store",
+        nargs="?",
+        const=str(STORE_PATH),
+        help="Read tables from the offline ortholog store built by 'ingest' (no network)",
+    )
+    p_matrix.set_defaults(func=cmd_matrix)
+
+    # infer
+    p_infer = sub.add_parser(
+        "infer",
+        parents=[profile_opts],
+        help="Infer the FungiDB organism of FASTA files from their gene IDs",
+    )
+    p_infer.add_argument("fastas", nargs="+", help="FASTA files (gene IDs in headers)")
+    p_infer.add_argument(
+        "--store",
+        nargs="?",
+        const=str(STORE_PATH),
+        help="Also index the gene IDs in the offline ortholog store built by 'ingest'",
+    )
+    p_infer.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the prefix index from scratch instead of updating it",
+    )
+    p_infer.set_defaults(func=cmd_infer)
+
+    # refresh
+    p_refresh = sub.add_parser(
+        "refresh",
+        parents=[profile_opts],
+        help="Update cached tables to the latest FungiDB release (only changed organisms are downloaded)",
+    )
+    p_refresh.add_argument(
+        "organisms",
+        nargs="*",
+        help="Organisms to refresh (default: every cached organism)",
+    )
+    p_refresh.add_argument(
+        "--diff-dir",
+        help="Write added/removed ortholog pairs per updated organism to DIR/<organism>.diff.tsv",
+    )
+    p_refresh.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-download every organism even if unchanged",
+    )
+    p_refresh.add_argument(
+        "--concurrency",
+        "-j",
+        type=int,
+        default=4,
+        help="Maximum concurrent downloads (default: 4)",
+    )
+    p_refresh.set_defaults(func=cmd_refresh)
+
+    # ingest
+    p_ingest = sub.add_parser(
+        "ingest",
+        parents=[profile_opts],
+        help="Load FungiDB/OrthoMCL bulk ortholog files into an offline SQLite store",
+    )
+    p_ingest.add_argument(
+        "directory",
+        help="Directory of ortholog tables (<OrganismKey>.tsv/.csv[.gz]) and OrthoMCL groups*.txt files",
+    )
+    p_ingest.add_argument(
+        "--store",
+        default=str(STORE_PATH),
+        help=f"SQLite database to create or update (default: {STORE_PATH})",
+    )
+    p_ingest.set_defaults(func=cmd_ingest)
+
+    # cache
+    p_cache = sub.add_parser("cache", parents=[profile_opts], help="Manage the on-disk ortholog table cache")
+    cache_sub = p_cache.add_subparsers(dest="cache_command", required=True)
+    cache_sub.add_parser("list", parents=[profile_opts], help="List cached ortholog tables")
+    p_clear = cache_sub.add_parser("clear", parents=[profile_opts], help="Remove cached ortholog tables")
+    p_clear.add_argument("--organism", help="Only remove tables for this organism key")
+    p_warm = cache_sub.add_parser("warm", parents=[profile_opts], help="Download and cache ortholog tables")
+    p_warm.add_argument("organisms", nargs="+", help="FungiDB organism keys to cache")
+    p_cache.set_defaults(func=cmd_cache)
+
+    # daemon
+    p_daemon = sub.add_parser("daemon", help="Warm local daemon that the CLI forwards commands to")
+    daemon_sub = p_daemon.add_subparsers(dest="daemon_command", required=True)
+    p_start = daemon_sub.add_parser("start", help="Start the daemon in the background")
+    p_start.add_argument("--foreground", action="store_true", help="Run in this process until interrupted")
+    daemon_sub.add_parser("stop", help="Stop the running daemon")
+    daemon_sub.add_parser("status", help="Show the running daemon's pid, uptime and request count")
+    p_daemon.add_argument(
+        "--socket",
+        default=str(DAEMON_SOCKET),
+        help=f"Unix socket path (default: {DAEMON_SOCKET})",
+    )
+    p_daemon.set_defaults(func=cmd_daemon)
+
+    args = parser.parse_args(argv)
+    if cwd is not None:
+        _absolute_paths(args, cwd)
+    if not (args.profile or args.profile_file):
+        return args.func(args)
+    return _run_profiled(args)
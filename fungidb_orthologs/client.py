@@ -6,35 +6,58 @@ Uses the same record table API as the EuPathDB R package.
 
 from __future__ import annotations
 
+import asyncio
 import io
 import json
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
+import numpy as np
 import pandas as pd
 
+from fungidb_orthologs import metrics, session
+from fungidb_orthologs.cache import default_cache
 from fungidb_orthologs.config import FUNGIDB_ORGANISMS
+from fungidb_orthologs.genomes import display_name
+from fungidb_orthologs.store import OrthologStore
 
 FUNGIDB_BASE = "https://fungidb.org/fungidb"
 REPORT_URL = f"{FUNGIDB_BASE}/service/record-types/gene/searches/GenesByTaxonGene/reports/tableTabular"
+GENE_LIST_REPORT_URL = f"{FUNGIDB_BASE}/service/record-types/gene/searches/GeneByLocusTag/reports/tableTabular"
+GENE_ORGANISM_REPORT_URL = f"{FUNGIDB_BASE}/service/record-types/gene/searches/GeneByLocusTag/reports/attributesTabular"
+DATASETS_URL = f"{FUNGIDB_BASE}/service/users/current/datasets"
 TIMEOUT = 300  # ortholog table can be large
+STREAM_CHUNK_ROWS = 100_000  # rows parsed per chunk in streaming mode
+PUSHDOWN_MAX_GENES = 2000  # "auto" strategy queries by gene list up to this many genes
+PUSHDOWN_CHUNK_SIZE = 500  # gene IDs per gene-list request
+STRATEGIES = ("auto", "table", "genes")
+RECIPROCAL_MODES = ("keep", "flag")  # keep only reciprocal pairs, or add a RECIPROCAL column
+TABLE_COLUMNS = ("GID", "ORTHOLOGS_GID", "ORTHOLOGS_ORGANISM", "ORTHOLOGS_PRODUCT")
 
 
 def _organism_for_api(organism: str) -> str:
-    """Use full display name for API if we have it."""
-    return FUNGIDB_ORGANISMS.get(organism, organism)
+    """Use full display name for API if we have it (built-in names, then the local genome catalog)."""
+    return FUNGIDB_ORGANISMS.get(organism) or display_name(organism) or organism
 
 
-def fetch_ortholog_table(organism: str) -> pd.DataFrame:
-    """
-    Fetch the OrthologsLite table for a FungiDB organism.
+def _http_client() -> httpx.Client:
+    """Shared pooled client (see fungidb_orthologs.session); do not close it."""
+    return session.shared_client()
 
-    organism: FungiDB organism key, e.g. "AfumigatusA1163", "CalbicansSC5314".
-    Returns DataFrame with columns like GID, ORTHOLOGS_GID, ORTHOLOGS_ORGANISM, ORTHOLOGS_PRODUCT.
-    """
-    api_organism = _organism_for_api(organism)
+
+def _async_http_client() -> httpx.AsyncClient:
+    return session.new_async_client()
+
+
+def _report_body(organism: str) -> str:
+    return _table_report_body({"organism": _organism_for_api(organism)})
+
+
+def _table_report_body(parameters: dict[str, str]) -> str:
     body = {
         "searchConfig": {
-            "parameters": {"organism": api_organism},
+            "parameters": parameters,
             "wdkWeight": 10,
         },
         "reportConfig": {
@@ -43,25 +66,32 @@ def fetch_ortholog_table(organism: str) -> pd.DataFrame:
             "attachmentType": "csv",
         },
     }
-    with httpx.Client(timeout=TIMEOUT) as client:
-        r = client.post(
-            REPORT_URL,
-            content=json.dumps(body),
-            headers={"Content-Type": "application/json"},
-        )
+    return json.dumps(body)
+
+
+def _check_response(r: httpx.Response, organism: str) -> None:
     if r.status_code == 422:
         raise ValueError(
             f"FungiDB returned 422 for organism {organism!r}. "
             "Try the full name or run 'fungidb-orthologs list-genomes' to see valid keys."
         )
     r.raise_for_status()
-    csv_text = r.text
-    # Handle embedded commas in product descriptions
-    df = pd.read_csv(
-        io.StringIO(csv_text),
-        quoting=1,  # QUOTE_ALL
-        on_bad_lines="skip",
-    )
+
+
+class GeneListQueryError(ValueError):
+    """A push-down (gene-ID list) query failed; the "auto" strategy falls back to the table download."""
+
+
+def _check_gene_list_response(r: httpx.Response, n_ids: int) -> None:
+    if r.status_code == 422:
+        raise GeneListQueryError(
+            f"FungiDB returned 422 for a gene-ID list query ({n_ids} IDs). "
+            "Check the gene IDs, or use strategy='table' to download the organism's whole table."
+        )
+    r.raise_for_status()
+
+
+def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = (
         df.columns.str.upper()
         .str.replace(r"\.$", "", regex=True)
@@ -83,6 +113,292 @@ def fetch_ortholog_table(organism: str) -> pd.DataFrame:
     return df
 
 
+def _read_ortholog_csv(source, chunksize: int | None = None):
+    # Handle embedded commas in product descriptions
+    return pd.read_csv(
+        source,
+        quoting=1,  # QUOTE_ALL
+        on_bad_lines="skip",
+        chunksize=chunksize,
+    )
+
+
+def _parse_table(content: bytes) -> pd.DataFrame:
+    """Parse a tableTabular CSV response body into a compact ortholog table."""
+    with metrics.timer("parse"):
+        df = compact_ortholog_table(_normalize_columns(_read_ortholog_csv(io.BytesIO(content))))
+    metrics.inc("rows_parsed_total", len(df))
+    return df
+
+
+def _to_category(values: pd.Series) -> pd.Categorical:
+    """Dictionary-encode a column, stripping whitespace once per distinct value."""
+    codes, uniques = pd.factorize(values)
+    stripped = pd.Index(uniques.astype(str)).str.strip()
+    stripped_codes, categories = pd.factorize(stripped)
+    # Append a -1 slot so missing values (code -1) stay missing
+    lookup = np.append(stripped_codes, -1)
+    return pd.Categorical.from_codes(lookup[codes], categories=categories)
+
+
+def is_compact(df: pd.DataFrame) -> bool:
+    """True if the ortholog table's columns are already dictionary-encoded by compact_ortholog_table."""
+    return all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in TABLE_COLUMNS if c in df.columns)
+
+
+def compact_ortholog_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return the table with gene ID, organism and product columns as categoricals.
+
+    Values are whitespace-normalized once here, so later filters and joins compare small
+    category arrays and integer codes instead of re-stripping every row.
+    """
+    if is_compact(df):
+        return df
+    df = df.copy()
+    for col in TABLE_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = _to_category(df[col])
+    return df
+
+
+def _isin(values: pd.Series, allowed: set[str]) -> np.ndarray:
+    """Boolean mask of values in allowed; on categoricals only the categories are compared."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories
+        # get_indexer reuses the categories' cached hash table across calls
+        positions = categories.get_indexer(list(allowed))
+        # Extra False slot at the end for missing values (code -1)
+        keep = np.zeros(len(categories) + 1, dtype=bool)
+        keep[positions[positions >= 0]] = True
+        return keep[values.cat.codes.to_numpy()]
+    return values.astype(str).str.strip().isin(allowed).to_numpy()
+
+
+class _ByteStreamReader(io.RawIOBase):
+    """Read-only file object over an iterator of byte chunks (e.g. httpx iter_bytes)."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+def fetch_ortholog_table(organism: str, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Fetch the OrthologsLite table for a FungiDB organism.
+
+    organism: FungiDB organism key, e.g. "AfumigatusA1163", "CalbicansSC5314".
+    use_cache: read from and write to the on-disk table cache (see fungidb_orthologs.cache).
+    Returns DataFrame with columns like GID, ORTHOLOGS_GID, ORTHOLOGS_ORGANISM, ORTHOLOGS_PRODUCT.
+    """
+    if not use_cache:
+        return download_ortholog_table(organism)
+    cache = default_cache()
+    df = cache.get(organism)
+    if df is None:
+        df = download_ortholog_table(organism)
+        cache.put(organism, df)
+    return compact_ortholog_table(df)
+
+
+def download_ortholog_table(organism: str) -> pd.DataFrame:
+    """Download the OrthologsLite table for a FungiDB organism, bypassing the cache (compact form)."""
+    with metrics.timer("download"):
+        r = _http_client().post(
+            REPORT_URL,
+            content=_report_body(organism),
+            headers={"Content-Type": "application/json"},
+            timeout=TIMEOUT,
+        )
+    _check_response(r, organism)
+    metrics.inc("download_bytes_total", r.num_bytes_downloaded, source="table")
+    return _parse_table(r.content)
+
+
+async def fetch_ortholog_table_async(
+    organism: str,
+    client: httpx.AsyncClient,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Async variant of fetch_ortholog_table using a shared httpx.AsyncClient.
+
+    Cache reads/writes and CSV parsing run in worker threads so the event loop stays free
+    for other downloads.
+    """
+    cache = default_cache() if use_cache else None
+    if cache is not None:
+        df = await asyncio.to_thread(cache.get, organism)
+        if df is not None:
+            return compact_ortholog_table(df)
+    with metrics.timer("download"):
+        r = await client.post(
+            REPORT_URL,
+            content=_report_body(organism),
+            headers={"Content-Type": "application/json"},
+            timeout=TIMEOUT,
+        )
+    _check_response(r, organism)
+    metrics.inc("download_bytes_total", r.num_bytes_downloaded, source="table")
+    df = await asyncio.to_thread(_parse_table, r.content)
+    if cache is not None:
+        await asyncio.to_thread(cache.put, organism, df)
+    return df
+
+
+def _gene_organisms(client: httpx.Client, dataset_id: str, n_ids: int) -> pd.Series:
+    """Organism display name of each gene ID in an uploaded ID-list dataset (GeneByLocusTag search)."""
+    body = {
+        "searchConfig": {"parameters": {"ds_gene_ids": dataset_id}, "wdkWeight": 10},
+        "reportConfig": {"attributes": ["primary_key", "organism"], "includeHeader": True, "attachmentType": "csv"},
+    }
+    r = client.post(
+        GENE_ORGANISM_REPORT_URL,
+        content=json.dumps(body),
+        headers={"Content-Type": "application/json"},
+        timeout=TIMEOUT,
+    )
+    _check_gene_list_response(r, n_ids)
+    try:
+        df = _normalize_columns(_read_ortholog_csv(io.BytesIO(r.content)))
+    except pd.errors.EmptyDataError:
+        return pd.Series(dtype=object)
+    genes = pd.Index(df["GID"].astype(str).str.strip())
+    return pd.Series(df["ORTHOLOGS_ORGANISM"].astype(str).str.strip().to_numpy(), index=genes)
+
+
+def fetch_orthologs_for_gene_list(
+    gene_ids: list[str],
+    organism: str | None = None,
+    chunk_size: int | None = None,
+) -> pd.DataFrame:
+    """
+    Fetch OrthologsLite rows for specific genes only (push-down query).
+
+    Gene IDs are uploaded as a WDK ID-list dataset and queried with the GeneByLocusTag
+    search, chunk_size IDs per request (default PUSHDOWN_CHUNK_SIZE), instead of downloading
+    the organism's whole table. The search matches locus tags across all organisms, so with
+    organism given only rows for that organism's genes are kept; ValueError if the IDs were
+    found but all belong to other organisms (as the table download rejects an unknown organism).
+    GeneListQueryError if a dataset upload or report request fails.
+    """
+    chunk_size = chunk_size or PUSHDOWN_CHUNK_SIZE
+    ids = list(dict.fromkeys(str(g) for g in gene_ids))
+    names = {organism, _organism_for_api(organism)} if organism else None
+    others: set[str] = set()
+    parts = []
+    client = _http_client()
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start : start + chunk_size]
+        try:
+            with metrics.timer("download"):
+                r = client.post(
+                    DATASETS_URL,
+                    json={"sourceType": "idList", "sourceContent": {"ids": chunk}},
+                    timeout=TIMEOUT,
+                )
+                _check_gene_list_response(r, len(chunk))
+                dataset_id = str(r.json()["id"])
+                r = client.post(
+                    GENE_LIST_REPORT_URL,
+                    content=_table_report_body({"ds_gene_ids": dataset_id}),
+                    headers={"Content-Type": "application/json"},
+                    timeout=TIMEOUT,
+                )
+                _check_gene_list_response(r, len(chunk))
+                gene_organisms = _gene_organisms(client, dataset_id, len(chunk)) if names else None
+        except GeneListQueryError:
+            raise
+        except (httpx.HTTPError, KeyError, ValueError) as e:
+            # Dataset upload refused, unexpected response shape, network failure, ...
+            raise GeneListQueryError(f"FungiDB gene-ID list query failed: {e}") from e
+        metrics.inc("download_bytes_total", r.num_bytes_downloaded, source="gene_list")
+        try:
+            part = _parse_table(r.content)
+        except pd.errors.EmptyDataError:
+            continue
+        if gene_organisms is not None:
+            own = gene_organisms.isin(names)
+            others.update(gene_organisms[~own])
+            part = part[part["GID"].astype(str).isin(set(gene_organisms.index[own]))]
+        parts.append(part)
+    if names and others and not any(len(part) for part in parts):
+        raise ValueError(
+            f"The gene IDs belong to {', '.join(sorted(others))}, not organism {organism!r}. "
+            "Check the organism key or run 'fungidb-orthologs list-genomes' to see valid keys."
+        )
+    if not parts:
+        return pd.DataFrame(columns=list(TABLE_COLUMNS))
+    return compact_ortholog_table(pd.concat(parts, ignore_index=True))
+
+
+def iter_ortholog_table(organism: str, chunksize: int = STREAM_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream the OrthologsLite table for a FungiDB organism as DataFrame chunks.
+
+    The response body is consumed as a byte stream and parsed incrementally, so at most
+    about one chunk of rows is held in memory at a time. The cache is not used.
+    """
+    with _http_client().stream(
+        "POST",
+        REPORT_URL,
+        content=_report_body(organism),
+        headers={"Content-Type": "application/json"},
+        timeout=TIMEOUT,
+    ) as r:
+        _check_response(r, organism)
+        reader = io.BufferedReader(_ByteStreamReader(r.iter_bytes()))
+        try:
+            chunks = _read_ortholog_csv(reader, chunksize=chunksize)
+        except pd.errors.EmptyDataError:
+            return
+        with chunks:
+            while True:
+                # Download and parse are interleaved here, so they are timed as one stage
+                with metrics.timer("stream"):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                metrics.inc("rows_parsed_total", len(chunk))
+                yield _normalize_columns(chunk)
+        metrics.inc("download_bytes_total", r.num_bytes_downloaded, source="stream")
+
+
+def stream_ortholog_table(
+    organism: str,
+    gene_ids: list[str] | None = None,
+    reference_organisms: list[str] | None = None,
+    chunksize: int = STREAM_CHUNK_ROWS,
+) -> pd.DataFrame:
+    """
+    Download and filter the ortholog table chunk by chunk.
+
+    Reference-organism and gene-ID filters are applied to each chunk as it is parsed,
+    so peak memory is bounded by the chunk size plus the rows that are kept.
+    """
+    parts = [
+        select_orthologs(chunk, gene_ids=gene_ids, reference_organisms=reference_organisms)
+        for chunk in iter_ortholog_table(organism, chunksize=chunksize)
+    ]
+    if not parts:
+        return pd.DataFrame(columns=list(TABLE_COLUMNS))
+    return pd.concat(parts, ignore_index=True)
+
+
 def filter_orthologs_to_references(
     ortholog_df: pd.DataFrame,
     reference_organisms: list[str],
@@ -93,26 +409,171 @@ def filter_orthologs_to_references(
         return ortholog_df
     allowed = set(reference_organisms)
     for key in reference_organisms:
-        if key in FUNGIDB_ORGANISMS:
-            allowed.add(FUNGIDB_ORGANISMS[key])
-    return ortholog_df[
-        ortholog_df[org_col].astype(str).str.strip().isin(allowed)
-    ].copy()
+        allowed.add(_organism_for_api(key))
+    return ortholog_df[_isin(ortholog_df[org_col], allowed)].copy()
+
+
+def select_orthologs(
+    ortholog_df: pd.DataFrame,
+    gene_ids: list[str] | None = None,
+    reference_organisms: list[str] | None = None,
+) -> pd.DataFrame:
+    """Apply the reference-species and gene-ID filters (None skips a filter)."""
+    df = ortholog_df
+    with metrics.timer("filter"):
+        if reference_organisms is not None:
+            df = filter_orthologs_to_references(df, reference_organisms)
+        if gene_ids is not None:
+            df = df[_isin(df["GID"], set(str(g) for g in gene_ids))].copy()
+    metrics.inc("filter_rows_in_total", len(ortholog_df))
+    metrics.inc("filter_rows_out_total", len(df))
+    return df
+
+
+def _gene_codes(columns: list[pd.Series]) -> list[np.ndarray]:
+    """
+    Integer codes for several gene-ID columns over one shared vocabulary (-1 for missing).
+
+    Only the IDs that occur are hashed: a filtered table keeps its source table's full
+    category list, which can be orders of magnitude longer than the rows left.
+    """
+    parts = []
+    for c in columns:
+        if not isinstance(c.dtype, pd.CategoricalDtype):
+            c = pd.Series(_to_category(c))
+        local, used = pd.factorize(c.cat.codes.to_numpy())
+        parts.append((local, used, c.cat.categories.take(used)))
+    vocab = pd.Index(np.concatenate([names.to_numpy(dtype=object) for _, _, names in parts])).unique()
+    codes = []
+    for local, used, names in parts:
+        lookup = vocab.get_indexer(names)
+        lookup[used < 0] = -1  # code -1 (missing) took an arbitrary category above
+        codes.append(lookup[local])
+    return codes
+
+
+def reciprocal_mask(forward: pd.DataFrame, reverse: list[pd.DataFrame]) -> np.ndarray:
+    """
+    Boolean mask of forward rows (GID -> ORTHOLOGS_GID) listed in some reverse table as
+    (GID=ORTHOLOGS_GID -> ORTHOLOGS_GID=GID). Gene pairs are packed into int64 keys and
+    matched with one hash join.
+    """
+    columns = [forward["GID"], forward["ORTHOLOGS_GID"]]
+    for table in reverse:
+        columns += [table["GID"], table["ORTHOLOGS_GID"]]
+    codes = _gene_codes(columns)
+    gid, orth = codes[0].astype(np.int64), codes[1].astype(np.int64)
+    forward_keys = (gid << 32) | orth
+    reverse_keys = []
+    for rev_gid, rev_orth in zip(codes[2::2], codes[3::2]):
+        valid = (rev_gid >= 0) & (rev_orth >= 0)
+        reverse_keys.append((rev_orth[valid].astype(np.int64) << 32) | rev_gid[valid])
+    if not reverse_keys:
+        return np.zeros(len(forward), dtype=bool)
+    found = pd.Series(forward_keys).isin(np.concatenate(reverse_keys)).to_numpy()
+    return found & (gid >= 0) & (orth >= 0)
+
+
+def _reverse_tables(
+    forward: pd.DataFrame,
+    organism: str,
+    reference_organisms: list[str],
+    **options,
+) -> list[pd.DataFrame]:
+    """Each partner organism's orthologs back into organism, for the partner genes in forward."""
+    keys = {}
+    for ref in reference_organisms:
+        keys[ref] = ref
+        keys[_organism_for_api(ref)] = ref
+    pairs = forward[["ORTHOLOGS_ORGANISM", "ORTHOLOGS_GID"]].dropna().drop_duplicates()
+    jobs = [
+        (keys.get(str(name), str(name)), genes.astype(str).tolist())
+        for name, genes in pairs.groupby("ORTHOLOGS_ORGANISM", observed=True)["ORTHOLOGS_GID"]
+    ]
+    if not jobs:
+        return []
+
+    def fetch(job: tuple[str, list[str]]) -> pd.DataFrame:
+        partner, genes = job
+        return _get_orthologs(partner, gene_ids=genes, reference_organisms=[organism], **options)
+
+    with ThreadPoolExecutor(max_workers=min(len(jobs), 8)) as pool:
+        return list(pool.map(metrics.in_context(fetch), jobs))
 
 
 def get_orthologs_for_genes(
     organism: str,
     gene_ids: list[str] | None = None,
     reference_organisms: list[str] | None = None,
+    use_cache: bool = True,
+    stream: bool = False,
+    strategy: str = "auto",
+    store: OrthologStore | None = None,
+    reciprocal: str | None = None,
 ) -> pd.DataFrame:
     """
     Get orthologs for an organism, optionally restricted to given gene IDs and reference species.
+
+    store: serve from this offline OrthologStore (indexed lookups, no network) instead of FungiDB.
+
+    A cached table is always used when present. On a cache miss:
+    strategy: "table" downloads the organism's whole table; "genes" queries FungiDB by gene-ID
+        list (requires gene_ids), keeping only the organism's genes; "auto" (default) uses
+        "genes" for up to PUSHDOWN_MAX_GENES gene IDs and "table" otherwise, and falls back to
+        "table" if the gene-ID list query fails.
+    stream: download and filter the whole table in chunks instead of loading it
+        (bounded memory; the filtered result is not cached).
+    reciprocal: check each pair against the reference organism's own table (fetched the same
+        way, restricted to the partner genes): "keep" returns only pairs found in both
+        directions, "flag" adds a boolean RECIPROCAL column. None (default) skips the check.
     """
     from fungidb_orthologs.config import DEFAULT_REFERENCE_SPECIES
 
-    df = fetch_ortholog_table(organism)
+    if reciprocal is not None and reciprocal not in RECIPROCAL_MODES:
+        raise ValueError(f"Unknown reciprocal mode {reciprocal!r}; expected one of {', '.join(RECIPROCAL_MODES)}")
     refs = reference_organisms or DEFAULT_REFERENCE_SPECIES
-    df = filter_orthologs_to_references(df, refs)
-    if gene_ids is not None:
-        df = df[df["GID"].astype(str).isin(set(str(g) for g in gene_ids))].copy()
+    options = {"use_cache": use_cache, "stream": stream, "strategy": strategy, "store": store}
+    df = _get_orthologs(organism, gene_ids=gene_ids, reference_organisms=refs, **options)
+    if reciprocal is None:
+        return df
+    reverse = _reverse_tables(df, organism, refs, **options)
+    with metrics.timer("reciprocal"):
+        mask = reciprocal_mask(df, reverse)
+    metrics.inc("reciprocal_pairs_total", int(mask.sum()))
+    if reciprocal == "keep":
+        return df[mask].reset_index(drop=True)
+    return df.assign(RECIPROCAL=mask)
+
+
+def _get_orthologs(
+    organism: str,
+    gene_ids: list[str] | None,
+    reference_organisms: list[str],
+    use_cache: bool,
+    stream: bool,
+    strategy: str,
+    store: OrthologStore | None,
+) -> pd.DataFrame:
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+    if strategy == "genes" and gene_ids is None:
+        raise ValueError("strategy='genes' requires gene_ids")
+    if store is not None:
+        return store.get_orthologs(organism, gene_ids=gene_ids, reference_organisms=reference_organisms)
+    df = default_cache().get(organism) if use_cache else None
+    if df is None and gene_ids is not None and (
+        strategy == "genes" or (strategy == "auto" and len(set(gene_ids)) <= PUSHDOWN_MAX_GENES)
+    ):
+        try:
+            df = fetch_orthologs_for_gene_list(gene_ids, organism=organism)
+        except GeneListQueryError:
+            if strategy == "genes":
+                raise
+            metrics.inc("pushdown_fallbacks_total")
+    if df is None and stream:
+        df = stream_ortholog_table(organism, gene_ids=gene_ids, reference_organisms=reference_organisms)
+        return df.reset_index(drop=True)
+    if df is None:
+        df = fetch_ortholog_table(organism, use_cache=use_cache)
+    df = select_orthologs(df, gene_ids=gene_ids, reference_organisms=reference_organisms)
     return df.reset_index(drop=True)
@@ -0,0 +1,81 @@
+"""
+In-process request coalescing and result caching.
+
+SingleFlight lets concurrent async callers asking for the same key share one
+in-flight execution; TTLCache is a small thread-safe LRU with expiry that holds
+recently used results (e.g. ortholog tables) in memory.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class SingleFlight:
+    """De-duplicate concurrent async calls: callers with the same key await one shared task."""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() unless a call for key is already in flight; either way return its result."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+
+            def forget(t: asyncio.Task) -> None:
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+
+            task.add_done_callback(forget)
+        # shield: a cancelled caller must not cancel the download other callers are waiting on
+        return await asyncio.shield(task)
+
+
+class TTLCache:
+    """Thread-safe LRU mapping with a maximum size and per-entry time-to-live (0 = no expiry)."""
+
+    def __init__(self, max_items: int = 16, ttl: float = 600):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            stored, value = item
+            if self.ttl and time.monotonic() - stored > self.ttl:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
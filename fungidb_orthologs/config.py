@@ -1,5 +1,8 @@
 """Species and FungiDB organism mapping for ortholog search."""
 
+import os
+from pathlib import Path
+
 # Common FungiDB organism keys and their full display names (for API)
 # See https://fungidb.org/common/downloads/Current_Release/
 FUNGIDB_ORGANISMS = {
@@ -17,16 +20,59 @@ DEFAULT_REFERENCE_SPECIES = [
     "Spombe972h",        # S. pombe
 ]
 
+# On-disk ortholog table cache (override with environment variables)
+CACHE_DIR = Path(
+    os.environ.get("FUNGIDB_ORTHOLOGS_CACHE_DIR", Path.home() / ".cache" / "fungidb-orthologs")
+)
+CACHE_MAX_BYTES = int(os.environ.get("FUNGIDB_ORTHOLOGS_CACHE_MAX_BYTES", 5 * 1024**3))
+CACHE_TTL = float(os.environ.get("FUNGIDB_ORTHOLOGS_CACHE_TTL", 7 * 24 * 3600))  # seconds; 0 = never expire
+FUNGIDB_RELEASE = os.environ.get("FUNGIDB_RELEASE", "current")
+
+# Offline ortholog store built by 'fungidb-orthologs ingest'; setting the variable makes the
+# API serve from it instead of FungiDB
+STORE_PATH = Path(os.environ.get("FUNGIDB_ORTHOLOGS_STORE", CACHE_DIR / "orthologs.sqlite"))
+USE_STORE = "FUNGIDB_ORTHOLOGS_STORE" in os.environ
+
+# In-process table cache used by long-running processes (API server)
+MEMORY_CACHE_ITEMS = int(os.environ.get("FUNGIDB_ORTHOLOGS_MEMORY_CACHE_ITEMS", 16))
+MEMORY_CACHE_TTL = float(os.environ.get("FUNGIDB_ORTHOLOGS_MEMORY_CACHE_TTL", 3600))  # seconds; 0 = never expire
+
+# Ortholog tables shared by API worker processes as memory-mapped Arrow files (needs pyarrow); setting
+# the variable turns sharing on. A tmpfs directory such as /dev/shm/fungidb-orthologs keeps them in RAM.
+SHARED_TABLES_DIR = Path(os.environ.get("FUNGIDB_ORTHOLOGS_SHARED_TABLES", CACHE_DIR / "shared"))
+USE_SHARED_TABLES = "FUNGIDB_ORTHOLOGS_SHARED_TABLES" in os.environ
+
+# Background extraction jobs (API server)
+JOB_WORKERS = int(os.environ.get("FUNGIDB_ORTHOLOGS_JOB_WORKERS", 2))
+JOB_RESULT_TTL = float(os.environ.get("FUNGIDB_ORTHOLOGS_JOB_RESULT_TTL", 3600))  # seconds finished jobs are kept
+
+# Rows per JSON page when a request does not pass limit (API server)
+API_PAGE_ROWS = int(os.environ.get("FUNGIDB_ORTHOLOGS_PAGE_ROWS", 10_000))
+
+# Shared HTTP session (see fungidb_orthologs.session)
+HTTP_MAX_CONNECTIONS = int(os.environ.get("FUNGIDB_ORTHOLOGS_HTTP_MAX_CONNECTIONS", 10))
+HTTP_RETRIES = int(os.environ.get("FUNGIDB_ORTHOLOGS_HTTP_RETRIES", 3))  # retries after the first attempt
+HTTP_BACKOFF = float(os.environ.get("FUNGIDB_ORTHOLOGS_HTTP_BACKOFF", 1.0))  # seconds before the first retry
+HTTP_BACKOFF_MAX = float(os.environ.get("FUNGIDB_ORTHOLOGS_HTTP_BACKOFF_MAX", 60))
+HTTP2 = os.environ.get("FUNGIDB_ORTHOLOGS_HTTP2", "auto").lower()  # auto (if h2 is installed), 1 or 0
+
+# Warm local daemon (see fungidb_orthologs.daemon); the CLI forwards commands to it when it is running
+DAEMON_SOCKET = Path(os.environ.get("FUNGIDB_ORTHOLOGS_DAEMON_SOCKET", CACHE_DIR / "daemon.sock"))
+USE_DAEMON = os.environ.get("FUNGIDB_ORTHOLOGS_DAEMON", "auto").lower() not in ("0", "false", "no")
+
+
+_NORMALIZED_KEYS = {key.replace(" ", "").lower(): key for key in FUNGIDB_ORGANISMS}
+
 
 def get_fungidb_organism_key(name: str) -> str | None:
-    """Resolve a name (e.g. 'A. fumigatus A1163', 'AfumigatusA1163') to FungiDB key."""
+    """
+    Resolve a name (e.g. 'A. fumigatus A1163', 'AfumigatusA1163') to FungiDB key.
+
+    Only knows the built-in organisms; see genomes.resolve_organism for the full catalog.
+    """
     name = (name or "").strip()
     if not name:
         return None
     if name in FUNGIDB_ORGANISMS:
         return name
-    key_like = name.replace(" ", "").replace(".", "").lower()
-    for key in FUNGIDB_ORGANISMS:
-        if key.replace(" ", "").lower() == key_like:
-            return key
-    return None
+    return _NORMALIZED_KEYS.get(name.replace(" ", "").replace(".", "").lower())
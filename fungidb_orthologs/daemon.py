@@ -0,0 +1,405 @@
+"""
+Warm local daemon for fast repeated CLI calls.
+
+`fungidb-orthologs daemon start` runs a background process that keeps pandas/httpx
+imported, the genome catalog loaded, a pooled HTTP session open and recently used
+ortholog tables in memory. While it is running, the CLI forwards extract,
+list-genomes, matrix and orthogroups commands to it over a Unix socket
+(config.DAEMON_SOCKET) instead of starting cold; the front-end only imports this
+module, so a warm `extract` costs a socket round trip plus the lookup itself.
+
+Protocol: the client sends one JSON line {"op", "protocol", "version", "env", ...};
+the daemon answers with frames of (1-byte channel, 4-byte length, payload) carrying
+stdout, stderr and finally the exit status. The daemon refuses commands from a
+different package version or with different FUNGIDB_* settings, and the CLI then
+runs the command itself. Set FUNGIDB_ORTHOLOGS_DAEMON=0 to never forward.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from fungidb_orthologs import __version__, config
+
+PROTOCOL = 1
+CONNECT_TIMEOUT = 0.5  # seconds; an unresponsive socket means "no daemon"
+START_TIMEOUT = 60  # seconds to wait for a started daemon to answer
+# Short commands that benefit from warm state; long-running ones (batch, refresh, ingest,
+# cache management) always run in the calling process
+FORWARD_COMMANDS = frozenset({"extract", "list-genomes", "matrix", "orthogroups"})
+FRAME = struct.Struct("!cI")
+STDOUT, STDERR, EXIT = b"o", b"e", b"x"
+REJECTED = b"rejected"
+_FLUSH_CHARS = 64 * 1024
+
+
+def _settings_env() -> dict[str, str]:
+    """FUNGIDB_* environment that determines behavior (the daemon's own switches excluded)."""
+    return {
+        k: v
+        for k, v in os.environ.items()
+        if k.startswith("FUNGIDB_") and not k.startswith("FUNGIDB_ORTHOLOGS_DAEMON")
+    }
+
+
+def _send_frame(sock: socket.socket, channel: bytes, payload: bytes) -> None:
+    sock.sendall(FRAME.pack(channel, len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes | None:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+# -- server --------------------------------------------------------------------
+
+
+class _FrameWriter(io.TextIOBase):
+    """Text stream sending what is written to the client, in frames on one channel."""
+
+    def __init__(self, sock: socket.socket, channel: bytes):
+        self._sock: socket.socket | None = sock
+        self._channel = channel
+        self._buffer: list[str] = []
+        self._size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self._buffer.append(s)
+        self._size += len(s)
+        if self._size >= _FLUSH_CHARS:
+            self.flush()
+        return len(s)
+
+    def flush(self) -> None:
+        if self._buffer and self._sock is not None:
+            data = "".join(self._buffer).encode()
+            self._buffer.clear()
+            self._size = 0
+            _send_frame(self._sock, self._channel, data)
+
+    def detach_socket(self) -> None:
+        self.flush()
+        self._sock = None
+
+
+class _ThreadLocalStream(io.TextIOBase):
+    """sys.stdout/sys.stderr stand-in routing each handler thread's output to its own client."""
+
+    def __init__(self, default, local: threading.local, name: str):
+        self._default = default
+        self._local = local
+        self._name = name
+
+    def _target(self):
+        return getattr(self._local, self._name, None) or self._default
+
+    @property
+    def encoding(self) -> str:
+        return "utf-8"
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path):
+        super().__init__(str(path), _Handler)
+        self.path = path
+        self.started = time.time()
+        self.requests = 0
+        self.local = threading.local()
+        self.env = _settings_env()
+        self._streams_lock = threading.Lock()
+
+    def install_streams(self) -> None:
+        """Route sys.stdout/sys.stderr through per-request writers (again, if something replaced them)."""
+        with self._streams_lock:
+            if not isinstance(sys.stdout, _ThreadLocalStream):
+                sys.stdout = _ThreadLocalStream(sys.stdout, self.local, "stdout")
+            if not isinstance(sys.stderr, _ThreadLocalStream):
+                sys.stderr = _ThreadLocalStream(sys.stderr, self.local, "stderr")
+
+    def status(self) -> dict:
+        from fungidb_orthologs.cache import default_cache
+
+        memory = default_cache().memory
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.path),
+            "version": __version__,
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "tables_in_memory": len(memory) if memory is not None else 0,
+        }
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return
+        sock = self.connection
+        try:
+            op = request.get("op")
+            if request.get("protocol") != PROTOCOL or request.get("version") != __version__:
+                _send_frame(sock, EXIT, REJECTED)
+            elif op == "run" and request.get("env", {}) != self.server.env:
+                # Commands must see the caller's settings; status and stop work regardless
+                _send_frame(sock, EXIT, REJECTED)
+            elif op == "run":
+                self.server.requests += 1
+                code = self._run(request.get("argv") or [], request.get("cwd"))
+                _send_frame(sock, EXIT, str(code).encode())
+            elif op == "status":
+                _send_frame(sock, STDOUT, json.dumps(self.server.status()).encode())
+                _send_frame(sock, EXIT, b"0")
+            elif op == "stop":
+                _send_frame(sock, EXIT, b"0")
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                _send_frame(sock, EXIT, REJECTED)
+        except OSError:  # client went away
+            pass
+
+    def _run(self, argv: list[str], cwd: str | None) -> int:
+        from fungidb_orthologs import cli
+
+        self.server.install_streams()
+        local = self.server.local
+        out, err = _FrameWriter(self.connection, STDOUT), _FrameWriter(self.connection, STDERR)
+        local.stdout, local.stderr = out, err
+        try:
+            return cli.run(argv, cwd=cwd)
+        except SystemExit as e:  # argparse errors and --help
+            if isinstance(e.code, str):
+                print(e.code, file=err)
+                return 1
+            return e.code or 0
+        except Exception as e:
+            print(f"Error: {e}", file=err)
+            return 1
+        finally:
+            local.stdout = local.stderr = None
+            out.detach_socket()
+            err.detach_socket()
+
+
+def _warm() -> None:
+    """Import the heavy modules and load shared state once, before accepting requests."""
+    from fungidb_orthologs import cli, service  # noqa: F401  (imports pandas, httpx, ...)
+    from fungidb_orthologs.cache import default_cache
+    from fungidb_orthologs.coalesce import TTLCache
+    from fungidb_orthologs.genomes import default_catalog
+    from fungidb_orthologs.session import shared_client
+
+    cache = default_cache()
+    if cache.memory is None:
+        cache.memory = TTLCache(config.MEMORY_CACHE_ITEMS, config.MEMORY_CACHE_TTL)
+    default_catalog().resolver()
+    shared_client()
+
+
+def serve(socket_path: str | Path | None = None) -> None:
+    """Run the daemon in this process until it is stopped (SIGTERM, SIGINT or `daemon stop`)."""
+    path = Path(socket_path or config.DAEMON_SOCKET)
+    if status(path) is not None:
+        raise RuntimeError(f"A daemon is already running on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)  # stale socket from a daemon that did not shut down cleanly
+    _warm()
+    # Owner-only from the moment the socket exists: the daemon runs commands as this user
+    umask = os.umask(0o077)
+    try:
+        server = _Server(path)
+    finally:
+        os.umask(umask)
+    saved = sys.stdout, sys.stderr
+    server.install_streams()
+
+    def stop(signum, frame) -> None:
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+    try:
+        print(f"fungidb-orthologs daemon {os.getpid()} listening on {path}", file=saved[1], flush=True)
+        server.serve_forever()
+    finally:
+        sys.stdout, sys.stderr = saved
+        server.server_close()
+        path.unlink(missing_ok=True)
+        from fungidb_orthologs import session
+
+        session.close()
+
+
+# -- client --------------------------------------------------------------------
+
+
+def _connect(path: Path) -> socket.socket | None:
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return sock
+
+
+def _request(path: Path, op: str, stdout, stderr, **fields) -> int | None:
+    """
+    Send one request and copy the response frames to the binary streams stdout/stderr.
+
+    Returns the exit status, or None if there is no usable daemon (nothing was output).
+    """
+    sock = _connect(path)
+    if sock is None:
+        return None
+    received = False
+    with sock:
+        try:
+            message = {"op": op, "protocol": PROTOCOL, "version": __version__, "env": _settings_env(), **fields}
+            sock.sendall(json.dumps(message).encode() + b"\n")
+            while True:
+                header = _recv_exact(sock, FRAME.size)
+                if header is None:
+                    break
+                channel, size = FRAME.unpack(header)
+                payload = _recv_exact(sock, size)
+                if payload is None:
+                    break
+                if channel == EXIT:
+                    return None if payload == REJECTED else int(payload)
+                received = True
+                try:
+                    (stdout if channel == STDOUT else stderr).write(payload)
+                except BrokenPipeError:  # e.g. piped into `head`; stop quietly
+                    return 1
+        except OSError:
+            pass
+    if not received:
+        return None
+    stderr.write(b"Error: lost connection to the fungidb-orthologs daemon\n")
+    return 1
+
+
+def _command(argv: list[str]) -> str | None:
+    from fungidb_orthologs.cli import COMMANDS
+
+    return next((a for a in argv if a in COMMANDS), None)
+
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Run a CLI command in the daemon if one is running and the command benefits from it.
+
+    Returns the exit status, or None if the caller should run the command itself.
+    """
+    if not config.USE_DAEMON or _command(argv) not in FORWARD_COMMANDS:
+        return None
+    stdout, stderr = sys.stdout.buffer, sys.stderr.buffer
+    try:
+        return _request(config.DAEMON_SOCKET, "run", stdout, stderr, argv=argv, cwd=os.getcwd())
+    finally:
+        try:
+            stdout.flush()
+            stderr.flush()
+        except BrokenPipeError:
+            # Keep the interpreter from reporting the closed pipe again at exit
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+
+def status(socket_path: str | Path | None = None) -> dict | None:
+    """Status of the running daemon (pid, uptime, requests, ...), or None if none is running."""
+    out = io.BytesIO()
+    code = _request(Path(socket_path or config.DAEMON_SOCKET), "status", out, io.BytesIO())
+    return json.loads(out.getvalue()) if code == 0 else None
+
+
+def stop(socket_path: str | Path | None = None) -> bool:
+    """Ask the running daemon to exit. Returns False if none was running."""
+    return _request(Path(socket_path or config.DAEMON_SOCKET), "stop", io.BytesIO(), io.BytesIO()) == 0
+
+
+def start(socket_path: str | Path | None = None, timeout: float = START_TIMEOUT) -> dict:
+    """
+    Start a background daemon (unless one is running) and return its status.
+
+    The daemon inherits this process's environment; its log is <socket>.log.
+    """
+    path = Path(socket_path or config.DAEMON_SOCKET)
+    running = status(path)
+    if running is not None:
+        return running
+    path.parent.mkdir(parents=True, exist_ok=True)
+    log_path = path.with_name(path.name + ".log")
+    with open(log_path, "ab") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "fungidb_orthologs.daemon", "--socket", str(path)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        running = status(path)
+        if running is not None:
+            return running
+        if proc.poll() is not None:
+            raise RuntimeError(f"Daemon exited with status {proc.returncode}; see {log_path}")
+        time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError(f"Daemon did not start within {timeout:g}s; see {log_path}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the fungidb-orthologs daemon in the foreground.")
+    parser.add_argument("--socket", default=str(config.DAEMON_SOCKET), help="Unix socket path")
+    args = parser.parse_args(argv)
+    serve(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Memory-mapped per-gene ortholog index for single-gene queries.
+
+Looking up one gene should not load a whole organism table. Each organism gets one
+index file under <config.CACHE_DIR>/genes, built once from its cached table (or the
+offline store) and rebuilt when that source changes. The file is memory-mapped and
+queried in place:
+
+    header      magic, key width, counts and the source stamp it was built from
+    keys        sorted gene IDs as fixed-width byte strings (binary search)
+    starts      uint64[genes + 1]: each gene's slice of the records block
+    records     uint32[records, 3]: ortholog ID, organism and product string numbers
+    offsets     uint64[strings + 1] into the string blob
+    blob        UTF-8 strings (each distinct ortholog ID, organism and product once)
+
+A query is one searchsorted over the keys plus a few slices, so it touches a handful
+of pages and answers in well under a millisecond.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fungidb_orthologs import config, metrics
+from fungidb_orthologs.client import _organism_for_api, compact_ortholog_table, fetch_ortholog_table
+
+MAGIC = b"FOGIDX01"
+HEADER = struct.Struct("<8sIIQQQ")  # magic, key width, source length, genes, records, strings
+MISSING = 0xFFFFFFFF  # string number of a missing organism or product
+SUFFIX = ".gidx"
+RECHECK_SECONDS = 5.0  # how often an open index is compared with its source table
+RECORD_FIELDS = ("ORTHOLOGS_GID", "ORTHOLOGS_ORGANISM", "ORTHOLOGS_PRODUCT")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _string_codes(values: pd.Series, base: int) -> tuple[np.ndarray, list[str]]:
+    """Codes of a categorical column shifted by base (MISSING for missing), and its categories."""
+    codes = values.cat.codes.to_numpy().astype(np.int64)
+    shifted = np.where(codes >= 0, codes + base, MISSING).astype(np.uint32)
+    return shifted, [str(c) for c in values.cat.categories]
+
+
+def write_gene_index(df: pd.DataFrame, path: str | Path, source: str = "") -> Path:
+    """
+    Write the index file for one organism's ortholog table (GID, ORTHOLOGS_GID, ...).
+
+    source: stamp of the table's origin, stored so a changed table triggers a rebuild.
+    """
+    path = Path(path)
+    df = compact_ortholog_table(df)
+    df = df[df["GID"].cat.codes.to_numpy() >= 0]
+    for col in RECORD_FIELDS:
+        if col not in df.columns:
+            df = df.assign(**{col: pd.Categorical([None] * len(df))})
+    with metrics.timer("gene_index_build"):
+        genes = df["GID"].cat.categories
+        keys = np.char.encode(np.asarray(genes, dtype=str), "utf-8")
+        key_width = max(keys.dtype.itemsize, 1)
+        key_order = np.argsort(keys, kind="stable")
+        rank = np.empty(len(keys), dtype=np.int64)
+        rank[key_order] = np.arange(len(keys))
+        row_rank = rank[df["GID"].cat.codes.to_numpy()]
+        row_order = np.argsort(row_rank, kind="stable")
+        starts = np.zeros(len(keys) + 1, dtype=np.uint64)
+        np.cumsum(np.bincount(row_rank, minlength=len(keys)), out=starts[1:])
+
+        strings: list[str] = []
+        columns = []
+        for col in RECORD_FIELDS:
+            codes, categories = _string_codes(df[col], len(strings))
+            columns.append(codes[row_order])
+            strings += categories
+        records = np.ascontiguousarray(np.column_stack(columns), dtype=np.uint32)
+        encoded = [s.encode() for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.uint64, count=len(encoded)), out=offsets[1:])
+
+    source_bytes = source.encode()
+    sections = [
+        np.ascontiguousarray(keys[key_order].astype(f"S{key_width}")).tobytes(),
+        starts.tobytes(),
+        records.tobytes(),
+        offsets.tobytes(),
+        b"".join(encoded),
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        header = HEADER.pack(MAGIC, key_width, len(source_bytes), len(keys), len(records), len(strings))
+        for block in (header + source_bytes, *sections):
+            f.write(block)
+            f.write(b"\0" * (_align(len(block)) - len(block)))
+    tmp.replace(path)
+    return path
+
+
+class GeneIndex:
+    """Read-only view of an index file; lookup() answers one gene without loading the table."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, key_width, source_len, n_genes, n_records, n_strings = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a gene index file: {self.path}")
+        pos = HEADER.size
+        self.source = self._mm[pos : pos + source_len].decode()
+        pos = _align(pos + source_len)
+
+        def section(dtype, count: int) -> np.ndarray:
+            nonlocal pos
+            array = np.frombuffer(self._mm, dtype=dtype, count=count, offset=pos)
+            pos = _align(pos + array.nbytes)
+            return array
+
+        self._keys = section(f"S{key_width}", n_genes)
+        self._starts = section(np.uint64, n_genes + 1)
+        self._records = section(np.uint32, n_records * 3).reshape(n_records, 3)
+        self._offsets = section(np.uint64, n_strings + 1)
+        self._blob = pos
+        self.checked = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _position(self, gene_id: str) -> int | None:
+        key = gene_id.strip().encode()
+        if len(key) > self._keys.dtype.itemsize or not key:
+            return None
+        i = int(np.searchsorted(self._keys, key))
+        return i if i < len(self._keys) and self._keys[i] == key else None
+
+    def __contains__(self, gene_id: str) -> bool:
+        return self._position(gene_id) is not None
+
+    def _strings(self, numbers: np.ndarray) -> list[str | None]:
+        valid = numbers != MISSING
+        safe = np.where(valid, numbers, 0)
+        begins = (self._offsets[safe] + self._blob).tolist()
+        ends = (self._offsets[safe + 1] + self._blob).tolist()
+        mm = self._mm
+        return [mm[b:e].decode() if ok else None for b, e, ok in zip(begins, ends, valid.tolist())]
+
+    def lookup(self, gene_id: str, reference_organisms: list[str] | None = None) -> list[dict] | None:
+        """
+        Orthologs of gene_id as dicts (ORTHOLOGS_GID, ORTHOLOGS_ORGANISM, ORTHOLOGS_PRODUCT),
+        optionally only in reference_organisms (keys or display names). None if the gene is unknown.
+        """
+        i = self._position(gene_id)
+        if i is None:
+            return None
+        begin, end = int(self._starts[i]), int(self._starts[i + 1])
+        block = self._records[begin:end]
+        organisms = self._strings(block[:, 1])
+        if reference_organisms is not None:
+            # Filter on the organism column before decoding the other two
+            allowed = set(reference_organisms) | {_organism_for_api(r) for r in reference_organisms}
+            keep = [j for j, name in enumerate(organisms) if name in allowed]
+            block = block[keep]
+            organisms = [organisms[j] for j in keep]
+        columns = (self._strings(block[:, 0]), organisms, self._strings(block[:, 2]))
+        return [dict(zip(RECORD_FIELDS, values)) for values in zip(*columns)]
+
+    def close(self) -> None:
+        # Drop the array views first; mmap refuses to close while buffers are exported
+        self._keys = self._starts = self._records = self._offsets = None
+        self._mm.close()
+
+
+_open: dict[tuple[str, str], GeneIndex] = {}  # (organism, source stamp) -> open index
+_checked: dict[str, tuple[float, str]] = {}  # organism -> (when its source was last checked, stamp)
+_locks: dict[str, threading.Lock] = {}
+_lock = threading.Lock()  # guards the three dicts above; never held while building an index
+
+
+def _organism_lock(organism: str) -> threading.Lock:
+    with _lock:
+        return _locks.setdefault(organism, threading.Lock())
+
+
+def _index_path(organism: str) -> Path:
+    from fungidb_orthologs.cache import _safe_name
+
+    return config.CACHE_DIR / "genes" / f"{_safe_name(organism)}{SUFFIX}"
+
+
+def _source_stamp(organism: str, store=None) -> str | None:
+    """Identity of the table an index would be built from; None if it is not available locally."""
+    if store is not None:
+        path = Path(store.path)
+        return f"store:{path.resolve()}:{path.stat().st_mtime_ns}" if path.exists() else None
+    from fungidb_orthologs.cache import default_cache
+
+    entry = default_cache().entry(organism)
+    return f"cache:{entry['file']}:{entry['created']}" if entry else None
+
+
+def _register(organism: str, index: GeneIndex) -> GeneIndex:
+    with _lock:
+        # Indexes of older sources are forgotten but not closed: another thread may still be reading one
+        for key in [k for k in _open if k[0] == organism]:
+            del _open[key]
+        _open[(organism, index.source)] = index
+        _checked[organism] = (time.monotonic(), index.source)
+    return index
+
+
+def open_gene_index(organism: str, store=None) -> GeneIndex:
+    """
+    Gene index for organism, kept open per process. Built on first use (and when the cached
+    table or store has changed, checked every RECHECK_SECONDS) from the table cache,
+    downloading the table if it is not cached, or from store when given. Only lookups of
+    the same organism wait while its table is downloaded and indexed.
+    """
+    checked = _checked.get(organism)
+    if checked is not None and time.monotonic() - checked[0] < RECHECK_SECONDS:
+        index = _open.get((organism, checked[1]))
+        if index is not None:
+            return index
+    with _organism_lock(organism):
+        stamp = _source_stamp(organism, store)
+        index = _open.get((organism, stamp)) if stamp is not None else None
+        if index is not None:
+            return _register(organism, index)
+        path = _index_path(organism)
+        if stamp is not None and path.exists():
+            candidate = GeneIndex(path)
+            if candidate.source == stamp:
+                return _register(organism, candidate)
+            candidate.close()
+        if store is not None:
+            df = store.get_orthologs(organism)
+        else:
+            df = fetch_ortholog_table(organism)
+            stamp = _source_stamp(organism)
+        write_gene_index(df, path, source=stamp or "")
+        return _register(organism, GeneIndex(path))
+
+
+def get_gene_orthologs(
+    gene_id: str,
+    organism: str | None = None,
+    reference_organisms: list[str] | None = None,
+    store=None,
+) -> tuple[list[dict] | None, str]:
+    """
+    Orthologs of a single gene from the organism's memory-mapped gene index.
+
+    organism: FungiDB organism key (default: inferred from the gene ID's locus-tag prefix).
+    reference_organisms: only orthologs in these organisms (default: all).
+    store: build the index from this offline OrthologStore instead of the table cache.
+    Returns (rows or None if the organism has no such gene, organism key used).
+    """
+    if organism is None:
+        from fungidb_orthologs.service import resolve_target_organism
+
+        # Only a confident vote of the prefix index; raises ValueError (pass organism=) otherwise
+        organism = resolve_target_organism(None, None, [gene_id])
+    else:
+        from fungidb_orthologs.genomes import resolve_organism
+
+        organism = resolve_organism(organism) or organism
+    with metrics.timer("gene_lookup"):
+        rows = open_gene_index(organism, store=store).lookup(gene_id, reference_organisms)
+    return rows, organism
@@ -1,18 +1,39 @@
 """
 Parse query genome FASTA to extract gene IDs for ortholog lookup.
+
+Only header lines are read: plain files are memory-mapped and scanned for '>' line
+starts, gzip/bgzip files are streamed, and sequence lines are never materialized.
+FastaHeaderParser does the same for bytes arriving in chunks (e.g. an HTTP upload).
 """
 
 from __future__ import annotations
 
+import gzip
+import mmap
 import re
+import zlib
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
-from Bio import SeqIO
+from fungidb_orthologs import metrics
+
+MAX_HEADER_BYTES = 64 * 1024  # longer header lines are truncated (the gene ID comes first)
+INFLATE_CHUNK = 1 << 20  # decompressed bytes produced per step, so memory stays bounded
+
+_LOCUS_TAG = re.compile(r"\[locus_tag=([^\]]+)\]", re.IGNORECASE)
+
+PREFIXES_TO_ORGANISM = {
+    "AFUB_": "AfumigatusA1163",
+    "AFUA_": "AfumigatusAf293",
+    "CAAL_": "CalbicansSC5314",
+    "SPBC": "Spombe972h",
+    "SPAC": "Spombe972h",
+}
 
 
 def parse_locus_tag(header: str) -> str | None:
     """Extract locus_tag from a FASTA header if present."""
-    m = re.search(r"\[locus_tag=([^\]]+)\]", header, re.IGNORECASE)
+    m = _LOCUS_TAG.search(header)
     if m:
         return m.group(1).strip()
     parts = header.split()
@@ -23,17 +44,199 @@ def parse_locus_tag(header: str) -> str | None:
     return None
 
 
-def get_gene_ids_from_fasta(fasta_path: str | Path) -> list[str]:
-    """Read a CDS or protein FASTA and return a list of gene IDs."""
+def _gene_id_from_header(header: str) -> str | None:
+    # Fast path for the common NCBI form before falling back to the regex
+    start = header.find("[locus_tag=")
+    if start != -1:
+        end = header.find("]", start)
+        if end != -1:
+            tag = header[start + 11 : end].strip()
+            if tag:
+                return tag
+    parts = header.split(maxsplit=1)
+    return parse_locus_tag(header) or (parts[0] if parts else None)
+
+
+def _is_gzip(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(2) == b"\x1f\x8b"
+
+
+def iter_fasta_headers(fasta_path: str | Path) -> Iterator[str]:
+    """Yield FASTA header lines (without the leading '>'), skipping sequence lines."""
+    path = Path(fasta_path)
+    if _is_gzip(path):
+        # gzip.open also reads multi-member (bgzip) files
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                if line.startswith(b">"):
+                    yield line[1:].rstrip(b"\r\n").decode("utf-8", "replace")
+        return
+    with open(path, "rb") as f:
+        if path.stat().st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = 0 if mm[:1] == b">" else mm.find(b"\n>")
+            if pos > 0:
+                pos += 1
+            while pos != -1:
+                end = mm.find(b"\n", pos)
+                if end == -1:
+                    end = size
+                yield mm[pos + 1 : end].rstrip(b"\r").decode("utf-8", "replace")
+                pos = mm.find(b"\n>", end)
+                if pos != -1:
+                    pos += 1
+
+
+class FastaHeaderParser:
+    """
+    Incremental FASTA header parser for data arriving in chunks.
+
+    feed() accepts plain or gzip/bgzip bytes (detected from the first two bytes) and
+    extracts gene IDs as complete header lines arrive; sequence data is skipped without
+    being copied, and gzip input is inflated in bounded steps. Only the current header
+    line is held between chunks. Call close() once the input ends.
+    """
+
+    def __init__(self):
+        self.gene_ids: list[str] = []
+        self.bytes_in = 0
+        self._pending = b""
+        self._sniffed = False
+        self._inflater = None
+        self._header: bytearray | None = None
+        self._line_start = True
+
+    def feed(self, data: bytes) -> None:
+        self.bytes_in += len(data)
+        if not self._sniffed:
+            self._pending += data
+            if len(self._pending) < 2:
+                return
+            data, self._pending = self._pending, b""
+            self._sniffed = True
+            if data[:2] == b"\x1f\x8b":
+                self._inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        if self._inflater is None:
+            self._scan(data)
+            return
+        while data:
+            if self._inflater.eof:
+                # Next member of a multi-member (bgzip) file
+                self._inflater = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            try:
+                out = self._inflater.decompress(data, INFLATE_CHUNK)
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip data: {e}") from None
+            self._scan(out)
+            data = self._inflater.unconsumed_tail
+            if self._inflater.eof:
+                data = self._inflater.unused_data + data
+
+    def _scan(self, data: bytes) -> None:
+        pos, size = 0, len(data)
+        while pos < size:
+            if self._header is not None:
+                end = data.find(b"\n", pos)
+                stop = size if end == -1 else end
+                room = MAX_HEADER_BYTES - len(self._header)
+                if room > 0:
+                    self._header += data[pos : min(stop, pos + room)]
+                if end == -1:
+                    return
+                self._end_header()
+                pos, self._line_start = end + 1, True
+            elif self._line_start and data[pos] == 0x3E:  # '>'
+                self._header = bytearray()
+                pos += 1
+            else:
+                # Sequence (or blank) line: jump to the next line that starts a record
+                nxt = data.find(b"\n>", pos)
+                if nxt == -1:
+                    self._line_start = data[size - 1] == 0x0A
+                    return
+                pos, self._line_start = nxt + 1, True
+
+    def _end_header(self) -> None:
+        header = bytes(self._header).rstrip(b"\r").decode("utf-8", "replace")
+        self._header = None
+        gid = _gene_id_from_header(header)
+        if gid:
+            self.gene_ids.append(gid)
+
+    def close(self) -> list[str]:
+        """Finish parsing (a last header without a newline counts) and return the gene IDs."""
+        if not self._sniffed and self._pending:
+            self._sniffed = True
+            self._scan(self._pending)
+        if self._inflater is not None:
+            self._scan(self._inflater.flush())
+            if not self._inflater.eof:
+                raise ValueError("Truncated gzip data")
+        if self._header is not None:
+            self._end_header()
+        return self.gene_ids
+
+
+def scan_fasta_chunks(chunks: Iterable[bytes], name: str = "") -> tuple[list[str], str | None]:
+    """
+    scan_fasta for FASTA data arriving as byte chunks (plain or gzip).
+
+    name: original file name, used like a path's name for organism inference.
+    """
+    parser = FastaHeaderParser()
+    with metrics.timer("fasta_scan"):
+        for chunk in chunks:
+            parser.feed(chunk)
+        ids = parser.close()
+    metrics.inc("fasta_records_total", len(ids))
+    return ids, infer_organism_from_name(Path(name), ids[0] if ids else None)
+
+
+def infer_organism_from_name(path: str | Path, first_gene_id: str | None) -> str | None:
+    """
+    Heuristic FungiDB organism from a FASTA file name and its first gene ID, or None.
+
+    path: file name or path (only the name is used)
+    first_gene_id: first gene ID in the file, matched against known locus-tag prefixes
+    """
+    path = Path(path)
+    name = path.name.upper()
+    if "A1163" in name and ("ASM15014" in name or "FUMIGATUS" in name or "AFUB" in name):
+        return "AfumigatusA1163"
+    if "AF293" in name or "AFUMIGATUS" in name:
+        return "AfumigatusAf293"
+    if first_gene_id:
+        for prefix, org in PREFIXES_TO_ORGANISM.items():
+            if first_gene_id.upper().startswith(prefix):
+                return org
+    return None
+
+
+def scan_fasta(fasta_path: str | Path) -> tuple[list[str], str | None]:
+    """
+    Read a CDS or protein FASTA once and return (gene IDs, inferred FungiDB organism or None).
+
+    Supports plain and gzip/bgzip-compressed files.
+    """
     path = Path(fasta_path)
     if not path.exists():
         raise FileNotFoundError(f"FASTA file not found: {path}")
     ids = []
-    for rec in SeqIO.parse(path, "fasta"):
-        gid = parse_locus_tag(rec.description) or parse_locus_tag(rec.id) or rec.id
-        if gid:
-            ids.append(gid)
-    return ids
+    with metrics.timer("fasta_scan"):
+        for header in iter_fasta_headers(path):
+            gid = _gene_id_from_header(header)
+            if gid:
+                ids.append(gid)
+    metrics.inc("fasta_records_total", len(ids))
+    return ids, infer_organism_from_name(path, ids[0] if ids else None)
+
+
+def get_gene_ids_from_fasta(fasta_path: str | Path) -> list[str]:
+    """Read a CDS or protein FASTA and return a list of gene IDs."""
+    return scan_fasta(fasta_path)[0]
 
 
 def infer_fungidb_organism_from_fasta(fasta_path: str | Path) -> str | None:
@@ -41,24 +244,9 @@ def infer_fungidb_organism_from_fasta(fasta_path: str | Path) -> str | None:
     path = Path(fasta_path)
     if not path.exists():
         return None
-    name = path.stem.upper()
-    if "A1163" in name and ("ASM15014" in name or "FUMIGATUS" in name or "AFUB" in name):
-        return "AfumigatusA1163"
-    if "AF293" in name or "AFUMIGATUS" in name:
-        return "AfumigatusAf293"
-    prefixes_to_organism = {
-        "AFUB_": "AfumigatusA1163",
-        "AFUA_": "AfumigatusAf293",
-        "CAAL_": "CalbicansSC5314",
-        "SPBC": "Spombe972h",
-        "SPAC": "Spombe972h",
-    }
-    for rec in SeqIO.parse(path, "fasta"):
-        gid = parse_locus_tag(rec.description) or parse_locus_tag(rec.id) or rec.id
-        if not gid:
-            continue
-        for prefix, org in prefixes_to_organism.items():
-            if gid.upper().startswith(prefix):
-                return org
-        break
-    return None
+    first = None
+    for header in iter_fasta_headers(path):
+        first = _gene_id_from_header(header)
+        if first:
+            break
+    return infer_organism_from_name(path, first)
@@ -1,29 +1,38 @@
 """
 Fetch the list of all available genomes in FungiDB.
 
-Parses the FungiDB downloads directory listing to get organism keys.
+Parses the FungiDB downloads directory listing to get organism keys. The listing,
+organism display names and the release (build) number are kept in a local catalog
+file that is revalidated with ETag / If-Modified-Since, and an indexed resolver maps
+user input (keys, display names, abbreviations, prefixes, typos) to organism keys offline.
 """
 
 from __future__ import annotations
 
+import bisect
+import difflib
+import json
+import os
 import re
+import tempfile
+import time
+from pathlib import Path
 
 import httpx
 
+from fungidb_orthologs import config, session
+
 FUNGIDB_DOWNLOADS = "https://fungidb.org/common/downloads/Current_Release/"
+BUILD_NUMBER_URL = f"{FUNGIDB_DOWNLOADS}Build_number"
+ORGANISM_REPORT_URL = (
+    "https://fungidb.org/fungidb/service/record-types/organism/searches/GenomeDataTypes/reports/standard"
+)
 TIMEOUT = 30
+CATALOG_FILE = "genomes.json"
+CATALOG_MAX_AGE = 3600  # seconds before the catalog is revalidated against FungiDB
 
 
-def list_genomes() -> list[str]:
-    """
-    Fetch and return all FungiDB organism keys (genome identifiers).
-
-    Returns a sorted list of organism keys, e.g. ['AfumigatusA1163', 'CalbicansSC5314', ...].
-    """
-    with httpx.Client(timeout=TIMEOUT) as client:
-        r = client.get(FUNGIDB_DOWNLOADS)
-    r.raise_for_status()
-    text = r.text
+def _parse_listing(text: str) -> list[str]:
     # Parse Apache-style HTML listing: <a href="AfumigatusA1163/">AfumigatusA1163/</a>
     pattern = re.compile(r'href="([A-Za-z0-9_.-]+)/"')
     organisms = []
@@ -33,3 +42,284 @@ def list_genomes() -> list[str]:
             continue
         organisms.append(name)
     return sorted(set(organisms))
+
+
+_LISTING_ROW = re.compile(
+    r'href="([A-Za-z0-9_.-]+)/".*?(\d{4}-\d{2}-\d{2} \d{2}:\d{2}|\d{2}-[A-Za-z]{3}-\d{4} \d{2}:\d{2})'
+)
+
+
+def _parse_listing_dates(text: str) -> dict[str, str]:
+    """Organism key -> last-modified stamp of its downloads directory, as shown in the listing."""
+    return {m.group(1): m.group(2) for line in text.splitlines() for m in _LISTING_ROW.finditer(line)}
+
+
+def _http_client() -> httpx.Client:
+    """Shared pooled client (see fungidb_orthologs.session); do not close it."""
+    return session.shared_client()
+
+
+def _fetch_release(client: httpx.Client) -> str | None:
+    try:
+        r = client.get(BUILD_NUMBER_URL, timeout=TIMEOUT)
+        r.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    return r.text.strip() or None
+
+
+def _fetch_display_names(client: httpx.Client) -> dict[str, str]:
+    """Map organism key (name_for_filenames) -> display name; empty if the report is unavailable."""
+    body = {
+        "searchConfig": {"parameters": {}},
+        "reportConfig": {"attributes": ["organism_name", "name_for_filenames"]},
+    }
+    try:
+        r = client.post(ORGANISM_REPORT_URL, json=body, timeout=TIMEOUT)
+        r.raise_for_status()
+        records = r.json().get("records", [])
+    except (httpx.HTTPError, ValueError):
+        return {}
+    names = {}
+    for rec in records:
+        attrs = rec.get("attributes", {})
+        key, name = attrs.get("name_for_filenames"), attrs.get("organism_name")
+        if key and name:
+            names[key] = name
+    return names
+
+
+class GenomeCatalog:
+    """
+    Locally cached FungiDB genome catalog: organism key, display name and release.
+
+    path: catalog JSON file (default: <config.CACHE_DIR>/genomes.json).
+    max_age: seconds before the catalog is revalidated with a conditional request.
+    """
+
+    def __init__(self, path: str | Path | None = None, max_age: float = CATALOG_MAX_AGE):
+        self.path = Path(path) if path is not None else config.CACHE_DIR / CATALOG_FILE
+        self.max_age = max_age
+        self._data: dict | None = None
+        self._resolver: OrganismResolver | None = None
+
+    def load(self) -> dict | None:
+        """Catalog data from memory or disk, without any network access."""
+        if self._data is None:
+            try:
+                self._data = json.loads(self.path.read_text())
+            except (FileNotFoundError, json.JSONDecodeError):
+                return None
+        return self._data
+
+    def _save(self, data: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(data, indent=1))
+            os.replace(name, self.path)
+        except BaseException:
+            Path(name).unlink(missing_ok=True)
+            raise
+        self._data = data
+        self._resolver = None
+
+    def refresh(self, force: bool = False) -> dict:
+        """Revalidate against FungiDB (conditional GET unless force) and return catalog data."""
+        cached = self.load()
+        headers = {}
+        if cached and not force:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        client = _http_client()
+        r = client.get(FUNGIDB_DOWNLOADS, headers=headers, timeout=TIMEOUT)
+        if r.status_code == 304 and cached:
+            data = {**cached, "checked": time.time()}
+            self._save(data)
+            return data
+        r.raise_for_status()
+        keys = _parse_listing(r.text)
+        modified = _parse_listing_dates(r.text)
+        names = _fetch_display_names(client)
+        release = _fetch_release(client)
+        previous = {g["key"]: g["name"] for g in (cached or {}).get("genomes", []) if g.get("name")}
+        names = {**previous, **names}
+        data = {
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "checked": time.time(),
+            "release": release,
+            "genomes": [
+                {"key": k, "name": names.get(k) or config.FUNGIDB_ORGANISMS.get(k), "modified": modified.get(k)}
+                for k in keys
+            ],
+        }
+        self._save(data)
+        return data
+
+    def get(self, offline: bool = False) -> dict:
+        """
+        Catalog data, revalidated when older than max_age.
+
+        offline: never touch the network (raises LookupError if there is no local catalog).
+        Falls back to the local catalog if FungiDB cannot be reached.
+        """
+        cached = self.load()
+        if cached and (offline or time.time() - cached.get("checked", 0) < self.max_age):
+            return cached
+        if offline:
+            raise LookupError(
+                f"No local genome catalog at {self.path}; run 'fungidb-orthologs list-genomes' once online."
+            )
+        try:
+            return self.refresh()
+        except httpx.HTTPError:
+            if cached:
+                return cached
+            raise
+
+    def genomes(self, offline: bool = False) -> list[dict]:
+        """List of {"key", "name"} for every genome."""
+        return self.get(offline=offline)["genomes"]
+
+    @property
+    def release(self) -> str | None:
+        """Release (build number) of the local catalog, if known. Never touches the network."""
+        data = self.load()
+        return data.get("release") if data else None
+
+    def modified(self) -> dict[str, str]:
+        """Organism key -> last-modified stamp from the downloads listing. Never touches the network."""
+        data = self.load()
+        return {g["key"]: g["modified"] for g in (data or {}).get("genomes", []) if g.get("modified")}
+
+    def resolver(self) -> OrganismResolver:
+        """Resolver over the local catalog plus the built-in organisms. Never touches the network."""
+        if self._resolver is None:
+            data = self.load()
+            genomes = list(data["genomes"]) if data else []
+            known = {g["key"] for g in genomes}
+            genomes += [{"key": k, "name": n} for k, n in config.FUNGIDB_ORGANISMS.items() if k not in known]
+            self._resolver = OrganismResolver(genomes)
+        return self._resolver
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+class OrganismResolver:
+    """
+    Indexed organism name resolution over a genome list.
+
+    Tries, in order: exact key, normalized key or display name (case, spaces and
+    punctuation ignored, so 'A. fumigatus A1163' matches AfumigatusA1163), unique
+    prefix, then fuzzy match.
+    """
+
+    FUZZY_CUTOFF = 0.85
+
+    def __init__(self, genomes: list[dict]):
+        self._keys = {g["key"] for g in genomes}
+        self._names = {g["key"]: g.get("name") for g in genomes}
+        self._normalized: dict[str, str] = {}
+        for g in genomes:
+            self._normalized.setdefault(_normalize(g["key"]), g["key"])
+            if g.get("name"):
+                self._normalized.setdefault(_normalize(g["name"]), g["key"])
+        self._sorted = sorted(self._normalized)
+
+    def display_name(self, key: str) -> str | None:
+        return self._names.get(key)
+
+    def _prefix_matches(self, norm: str) -> set[str]:
+        i = bisect.bisect_left(self._sorted, norm)
+        keys = set()
+        while i < len(self._sorted) and self._sorted[i].startswith(norm):
+            keys.add(self._normalized[self._sorted[i]])
+            i += 1
+        return keys
+
+    def exact(self, name: str) -> str | None:
+        """Key for an exact key or normalized key/display-name match (no prefix or fuzzy matching)."""
+        name = (name or "").strip()
+        if name in self._keys:
+            return name
+        return self._normalized.get(_normalize(name))
+
+    def resolve(self, name: str) -> str | None:
+        """Return the organism key for name, or None if it is unknown or ambiguous."""
+        name = (name or "").strip()
+        if not name:
+            return None
+        if name in self._keys:
+            return name
+        norm = _normalize(name)
+        if not norm:
+            return None
+        if norm in self._normalized:
+            return self._normalized[norm]
+        prefixed = self._prefix_matches(norm)
+        if len(prefixed) == 1:
+            return prefixed.pop()
+        if prefixed:
+            return None
+        close = difflib.get_close_matches(norm, self._sorted, n=1, cutoff=self.FUZZY_CUTOFF)
+        return self._normalized[close[0]] if close else None
+
+    def candidates(self, name: str, n: int = 5) -> list[str]:
+        """Best guesses for an unresolved name (prefix matches, then fuzzy matches)."""
+        norm = _normalize(name or "")
+        if not norm:
+            return []
+        found = sorted(self._prefix_matches(norm))
+        for close in difflib.get_close_matches(norm, self._sorted, n=n, cutoff=0.6):
+            key = self._normalized[close]
+            if key not in found:
+                found.append(key)
+        return found[:n]
+
+
+_default_catalog: GenomeCatalog | None = None
+
+
+def default_catalog() -> GenomeCatalog:
+    """Process-wide genome catalog using the settings in config."""
+    global _default_catalog
+    if _default_catalog is None:
+        _default_catalog = GenomeCatalog()
+    return _default_catalog
+
+
+def resolve_organism(name: str) -> str | None:
+    """Resolve a user-supplied organism name to a FungiDB key using the local catalog (offline)."""
+    return default_catalog().resolver().resolve(name)
+
+
+def display_name(key: str) -> str | None:
+    """Display name for an organism key from the local catalog (offline), if known."""
+    return default_catalog().resolver().display_name(key)
+
+
+def current_release(catalog: GenomeCatalog | None = None) -> str:
+    """
+    Release label for cached tables: FUNGIDB_RELEASE if set, otherwise the FungiDB build
+    number from the local catalog (offline), otherwise "current".
+    """
+    if config.FUNGIDB_RELEASE != "current":
+        return config.FUNGIDB_RELEASE
+    return (catalog or default_catalog()).release or config.FUNGIDB_RELEASE
+
+
+def list_genomes(offline: bool = False) -> list[str]:
+    """
+    Fetch and return all FungiDB organism keys (genome identifiers).
+
+    Uses the local catalog, revalidated against FungiDB once it is older than CATALOG_MAX_AGE.
+    offline: only use the local catalog.
+    Returns a sorted list of organism keys, e.g. ['AfumigatusA1163', 'CalbicansSC5314', ...].
+    """
+    return [g["key"] for g in default_catalog().genomes(offline=offline)]
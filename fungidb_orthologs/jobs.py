@@ -0,0 +1,165 @@
+"""
+Background job queue for long-running ortholog extractions.
+
+Jobs run get_orthologs_for_genome on a bounded in-process thread pool. Each job
+records its status, current stage and progress; queued or running jobs can be
+cancelled (running jobs stop at the next stage boundary), and finished jobs are
+kept with their results until result_ttl seconds after they finish.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from fungidb_orthologs import config
+from fungidb_orthologs.service import get_orthologs_for_genome
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's worker thread when the job has been cancelled."""
+
+
+@dataclass
+class Job:
+    """State of one extraction job."""
+
+    id: str
+    fasta_path: Path
+    organism: str | None = None
+    references: list[str] | None = None
+    status: str = QUEUED
+    stage: str | None = None
+    progress: float = 0.0
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    result: pd.DataFrame | None = None
+    error: str | None = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    _future: Future | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        """JSON-serializable summary (without the result rows)."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "fasta_path": str(self.fasta_path),
+            "organism": self.organism,
+            "references": self.references,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "error": self.error,
+            "count": None if self.result is None else len(self.result),
+        }
+
+
+class JobManager:
+    """
+    In-process job queue with a bounded worker pool.
+
+    max_workers: extractions that may run at the same time.
+    result_ttl: seconds a finished job (and its result) is kept.
+    """
+
+    def __init__(self, max_workers: int | None = None, result_ttl: float | None = None):
+        self.max_workers = max_workers or config.JOB_WORKERS
+        self.result_ttl = config.JOB_RESULT_TTL if result_ttl is None else result_ttl
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ortholog-job")
+
+    def submit(
+        self,
+        fasta_path: str | Path,
+        organism: str | None = None,
+        references: list[str] | None = None,
+    ) -> Job:
+        """Queue an extraction and return its Job immediately."""
+        job = Job(id=uuid.uuid4().hex, fasta_path=Path(fasta_path), organism=organism, references=references)
+        with self._lock:
+            self._purge()
+            self._jobs[job.id] = job
+        job._future = self._pool.submit(self._run, job)
+        return job
+
+    def _run(self, job: Job) -> None:
+        if job._cancel.is_set():
+            # Cancelled after a worker took the job but before it started; cancel() could not finish it
+            job.status, job.finished = CANCELLED, time.time()
+            return
+        job.status, job.started = RUNNING, time.time()
+
+        def progress(stage: str, fraction: float) -> None:
+            if job._cancel.is_set():
+                raise JobCancelled(job.id)
+            job.stage, job.progress = stage, fraction
+
+        try:
+            df, organism = get_orthologs_for_genome(
+                job.fasta_path,
+                organism=job.organism,
+                reference_species=job.references,
+                progress=progress,
+            )
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status, job.error = FAILED, str(e)
+        else:
+            if job._cancel.is_set():
+                job.status = CANCELLED
+            else:
+                job.result, job.organism, job.status = df, organism, DONE
+        job.finished = time.time()
+
+    def _purge(self) -> None:
+        if not self.result_ttl:
+            return
+        cutoff = time.time() - self.result_ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished is not None and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job | None:
+        """Job by id, or None if unknown or expired."""
+        with self._lock:
+            self._purge()
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        """All known jobs, oldest first."""
+        with self._lock:
+            self._purge()
+            return sorted(self._jobs.values(), key=lambda j: j.created)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued or running job. Finished jobs are returned unchanged."""
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            job.status, job.finished = CANCELLED, time.time()
+        return job
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancel queued jobs and stop the worker pool."""
+        for job in self.list():
+            self.cancel(job.id)
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,354 @@
+"""
+Gene x genome ortholog copy-number matrix (phylogenetic profiles).
+
+Rows are the genes of one or more target organisms, columns are partner genomes, and
+each entry counts a gene's distinct orthologs in that genome (0 = absent). Genes and
+genomes are integer-encoded and only non-zero entries are kept, in COO form sorted by
+row (so rows can also be sliced CSR-style). Tables are added one at a time and
+aggregated in chunks, so hundreds of genomes never need a dense pivot in memory.
+Export to Matrix Market (.mtx), dense TSV (written in row blocks), long triplets, or
+a scipy.sparse matrix when scipy is installed.
+"""
+
+from __future__ import annotations
+
+import gzip
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fungidb_orthologs import metrics
+from fungidb_orthologs.client import _organism_for_api, compact_ortholog_table
+
+BUILD_CHUNK_ROWS = 1_000_000  # ortholog pairs aggregated per step
+COMPACT_ENTRIES = 5_000_000  # merge pending COO pieces once they hold this many entries
+DENSE_CHUNK_ROWS = 10_000  # matrix rows densified per block when writing TSV
+MATRIX_FORMATS = ("mtx", "tsv", "triplets")
+_COL_BITS = 32
+
+
+def _open_text_out(path: Path):
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "wt", compresslevel=6, newline="")
+    return open(path, "w", newline="")
+
+
+def _sidecar(path: Path, suffix: str) -> Path:
+    """matrix.mtx[.gz] -> matrix.<suffix>.tsv, next to the matrix file."""
+    name = path.name
+    for ext in (".gz", ".mtx"):
+        if name.endswith(ext):
+            name = name[: -len(ext)]
+    return path.with_name(f"{name}.{suffix}.tsv")
+
+
+class MatrixBuilder:
+    """
+    Accumulate ortholog tables into an OrthologMatrix.
+
+    references: fixed genome columns (organism keys or display names, in this order);
+        rows for other genomes are dropped. Default: every partner genome seen, sorted.
+    """
+
+    def __init__(self, references: list[str] | None = None, chunk_rows: int = BUILD_CHUNK_ROWS):
+        self._genes: dict[str, int] = {}
+        self._gene_organisms: list[str] = []
+        self._genomes: dict[str, int] = {}
+        self._genome_labels: list[str] = []
+        self._fixed = references is not None
+        for ref in references or []:
+            if ref in self._genomes:
+                continue
+            # Rows may name the genome by key or by display name
+            self._genomes[ref] = len(self._genome_labels)
+            self._genomes.setdefault(_organism_for_api(ref), len(self._genome_labels))
+            self._genome_labels.append(ref)
+        self._chunk_rows = max(1, chunk_rows)
+        self._keys: list[np.ndarray] = []
+        self._counts: list[np.ndarray] = []
+        self._pending = 0
+
+    def _encode_genes(self, categories: pd.Index, organism: str) -> np.ndarray:
+        ids = np.empty(len(categories), dtype=np.int64)
+        for i, gid in enumerate(categories):
+            row = self._genes.get(gid)
+            if row is None:
+                row = self._genes[gid] = len(self._gene_organisms)
+                self._gene_organisms.append(organism)
+            ids[i] = row
+        return ids
+
+    def _encode_genomes(self, categories: pd.Index) -> np.ndarray:
+        ids = np.full(len(categories), -1, dtype=np.int64)
+        for i, name in enumerate(categories):
+            col = self._genomes.get(name)
+            if col is None and not self._fixed:
+                col = self._genomes[name] = len(self._genome_labels)
+                self._genome_labels.append(name)
+            if col is not None:
+                ids[i] = col
+        return ids
+
+    def add_table(self, organism: str, df: pd.DataFrame) -> None:
+        """Add one target organism's OrthologsLite table (GID, ORTHOLOGS_GID, ORTHOLOGS_ORGANISM)."""
+        if df.empty or "ORTHOLOGS_ORGANISM" not in df.columns:
+            return
+        df = compact_ortholog_table(df[["GID", "ORTHOLOGS_GID", "ORTHOLOGS_ORGANISM"]])
+        gid = df["GID"].cat.codes.to_numpy().astype(np.int64)
+        partner = df["ORTHOLOGS_GID"].cat.codes.to_numpy().astype(np.int64)
+        genome = df["ORTHOLOGS_ORGANISM"].cat.codes.to_numpy()
+        valid = (gid >= 0) & (partner >= 0) & (genome >= 0)
+        # Each (gene, ortholog) pair counts once, however often the table repeats it
+        _, first = np.unique(gid[valid] * len(df["ORTHOLOGS_GID"].cat.categories) + partner[valid], return_index=True)
+        rows_idx = np.flatnonzero(valid)[first]
+        gene_ids = self._encode_genes(df["GID"].cat.categories, organism)
+        genome_ids = self._encode_genomes(df["ORTHOLOGS_ORGANISM"].cat.categories)
+        for start in range(0, len(rows_idx), self._chunk_rows):
+            idx = rows_idx[start : start + self._chunk_rows]
+            cols = genome_ids[genome[idx]]
+            keep = cols >= 0
+            keys = (gene_ids[gid[idx][keep]] << _COL_BITS) | cols[keep]
+            keys, counts = np.unique(keys, return_counts=True)
+            self._keys.append(keys)
+            self._counts.append(counts.astype(np.int32))
+            self._pending += len(keys)
+            if self._pending >= COMPACT_ENTRIES:
+                self._compact()
+
+    def _compact(self) -> None:
+        if len(self._keys) > 1:
+            keys, inverse = np.unique(np.concatenate(self._keys), return_inverse=True)
+            counts = np.bincount(inverse, weights=np.concatenate(self._counts)).astype(np.int32)
+            self._keys, self._counts = [keys], [counts]
+        self._pending = len(self._keys[0]) if self._keys else 0
+
+    def build(self) -> OrthologMatrix:
+        self._compact()
+        keys = self._keys[0] if self._keys else np.array([], dtype=np.int64)
+        counts = self._counts[0] if self._counts else np.array([], dtype=np.int32)
+        return OrthologMatrix(
+            genes=pd.Index(list(self._genes), dtype=object),
+            gene_organisms=np.array(self._gene_organisms, dtype=object),
+            genomes=pd.Index(self._genome_labels, dtype=object),
+            rows=keys >> _COL_BITS,
+            cols=keys & ((1 << _COL_BITS) - 1),
+            counts=counts,
+        ).sorted_genomes(not self._fixed)
+
+
+class OrthologMatrix:
+    """
+    Sparse gene x genome ortholog copy-number matrix.
+
+    Build with OrthologMatrix.from_tables({organism_key: df, ...}) or build_matrix();
+    rows, cols and counts are the non-zero entries sorted by (row, col).
+    """
+
+    def __init__(
+        self,
+        genes: pd.Index,
+        gene_organisms: np.ndarray,
+        genomes: pd.Index,
+        rows: np.ndarray,
+        cols: np.ndarray,
+        counts: np.ndarray,
+    ):
+        self.genes = genes
+        self.gene_organisms = gene_organisms
+        self.genomes = genomes
+        order = np.lexsort((cols, rows))
+        self.rows = rows[order].astype(np.int64)
+        self.cols = cols[order].astype(np.int64)
+        self.counts = counts[order].astype(np.int32)
+        self._offsets = np.zeros(len(genes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.rows, minlength=len(genes)), out=self._offsets[1:])
+
+    @classmethod
+    def from_tables(
+        cls,
+        tables: dict[str, pd.DataFrame],
+        references: list[str] | None = None,
+    ) -> OrthologMatrix:
+        """Build from {target organism key: OrthologsLite DataFrame}."""
+        builder = MatrixBuilder(references)
+        for organism, df in tables.items():
+            builder.add_table(organism, df)
+        return builder.build()
+
+    def sorted_genomes(self, sort: bool = True) -> OrthologMatrix:
+        """The same matrix with genome columns in alphabetical order."""
+        if not sort or self.genomes.is_monotonic_increasing:
+            return self
+        order = np.argsort(self.genomes.to_numpy().astype(str), kind="stable")
+        new_col = np.empty(len(order), dtype=np.int64)
+        new_col[order] = np.arange(len(order))
+        return OrthologMatrix(
+            self.genes, self.gene_organisms, self.genomes[order], self.rows, new_col[self.cols], self.counts
+        )
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.genes), len(self.genomes)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.counts)
+
+    def presence(self) -> OrthologMatrix:
+        """0/1 presence/absence matrix."""
+        return OrthologMatrix(
+            self.genes, self.gene_organisms, self.genomes, self.rows, self.cols, np.ones_like(self.counts)
+        )
+
+    def row(self, gene_id: str) -> pd.Series:
+        """Copy numbers of one gene across all genomes (0 where absent)."""
+        pos = self.genes.get_indexer([gene_id])[0]
+        if pos < 0:
+            raise KeyError(gene_id)
+        values = np.zeros(len(self.genomes), dtype=np.int32)
+        lo, hi = self._offsets[pos], self._offsets[pos + 1]
+        values[self.cols[lo:hi]] = self.counts[lo:hi]
+        return pd.Series(values, index=self.genomes, name=gene_id)
+
+    def to_scipy(self):
+        """scipy.sparse CSR matrix of shape (genes, genomes); needs scipy."""
+        try:
+            from scipy import sparse
+        except ImportError:
+            raise ValueError('Sparse matrix export needs scipy: pip install "fungidb-orthologs[sparse]"') from None
+        return sparse.csr_matrix((self.counts, self.cols, self._offsets), shape=self.shape)
+
+    def to_triplets(self) -> pd.DataFrame:
+        """Non-zero entries as a long table (GID, ORGANISM, GENOME, COPIES)."""
+        return pd.DataFrame(
+            {
+                "GID": pd.Categorical.from_codes(self.rows, categories=self.genes),
+                "ORGANISM": self.gene_organisms[self.rows],
+                "GENOME": pd.Categorical.from_codes(self.cols, categories=self.genomes),
+                "COPIES": self.counts,
+            }
+        )
+
+    def iter_dense(self, chunk_rows: int = DENSE_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+        """Dense blocks of at most chunk_rows genes (columns GID, ORGANISM, then one per genome)."""
+        n_genomes = len(self.genomes)
+        for start in range(0, len(self.genes), max(1, chunk_rows)):
+            stop = min(start + chunk_rows, len(self.genes))
+            lo, hi = self._offsets[start], self._offsets[stop]
+            block = np.zeros((stop - start, n_genomes), dtype=np.int32)
+            block[self.rows[lo:hi] - start, self.cols[lo:hi]] = self.counts[lo:hi]
+            frame = pd.DataFrame(block, columns=self.genomes)
+            frame.insert(0, "GID", self.genes[start:stop])
+            frame.insert(1, "ORGANISM", self.gene_organisms[start:stop])
+            yield frame
+
+    def to_dense(self) -> pd.DataFrame:
+        """The whole matrix as a DataFrame (small matrices only; see iter_dense)."""
+        frames = list(self.iter_dense(max(1, len(self.genes))))
+        if frames:
+            return frames[0]
+        return pd.DataFrame(columns=["GID", "ORGANISM", *self.genomes])
+
+    def write_dense(self, output, chunk_rows: int = DENSE_CHUNK_ROWS) -> None:
+        """Write the dense matrix as TSV (path, .gz path or text stream), one row block at a time."""
+
+        def write(f) -> None:
+            header = True
+            for frame in self.iter_dense(chunk_rows):
+                frame.to_csv(f, sep="\t", index=False, header=header)
+                header = False
+            if header:
+                f.write("\t".join(["GID", "ORGANISM", *self.genomes]) + "\n")
+
+        if hasattr(output, "write"):
+            write(output)
+        else:
+            with _open_text_out(Path(output)) as f:
+                write(f)
+
+    def write_mtx(self, path: str | Path, chunk_rows: int = BUILD_CHUNK_ROWS) -> list[Path]:
+        """
+        Write Matrix Market coordinate format plus row and column labels.
+
+        path.mtx[.gz] gets the entries (1-based); <name>.genes.tsv (GID, ORGANISM) and
+        <name>.genomes.tsv list the row and column labels in matrix order.
+        Returns the written paths.
+        """
+        path = Path(path)
+        with _open_text_out(path) as f:
+            f.write("%%MatrixMarket matrix coordinate integer general\n")
+            f.write(f"{len(self.genes)} {len(self.genomes)} {self.nnz}\n")
+            for start in range(0, self.nnz, max(1, chunk_rows)):
+                stop = start + chunk_rows
+                entries = pd.DataFrame(
+                    {"row": self.rows[start:stop] + 1, "col": self.cols[start:stop] + 1, "n": self.counts[start:stop]}
+                )
+                entries.to_csv(f, sep=" ", index=False, header=False)
+        genes_path, genomes_path = _sidecar(path, "genes"), _sidecar(path, "genomes")
+        pd.DataFrame({"GID": self.genes, "ORGANISM": self.gene_organisms}).to_csv(genes_path, sep="\t", index=False)
+        pd.DataFrame({"GENOME": self.genomes}).to_csv(genomes_path, sep="\t", index=False)
+        return [path, genes_path, genomes_path]
+
+    def write(self, output, fmt: str | None = None) -> None:
+        """
+        Write in one of MATRIX_FORMATS.
+
+        fmt: "mtx" (sparse Matrix Market + label files), "tsv" (dense), or "triplets"
+            (long table through fungidb_orthologs.writers, format from the extension).
+            Default: "mtx" for .mtx/.mtx.gz paths, else "tsv".
+        """
+        is_stream = hasattr(output, "write")
+        if fmt is None:
+            fmt = "mtx" if not is_stream and Path(output).name.endswith((".mtx", ".mtx.gz")) else "tsv"
+        if fmt not in MATRIX_FORMATS:
+            raise ValueError(f"Unknown matrix format {fmt!r}; expected one of {', '.join(MATRIX_FORMATS)}")
+        if not is_stream:
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+        if fmt == "mtx":
+            if is_stream:
+                raise ValueError("mtx output needs a file path (-o/--output)")
+            self.write_mtx(output)
+        elif fmt == "tsv":
+            self.write_dense(output)
+        else:
+            from fungidb_orthologs.writers import write_orthologs
+
+            write_orthologs(self.to_triplets(), output)
+
+
+def build_matrix(
+    targets: list[str] | None = None,
+    references: list[str] | None = None,
+    use_cache: bool = True,
+    store=None,
+    chunk_rows: int = BUILD_CHUNK_ROWS,
+) -> OrthologMatrix:
+    """
+    Copy-number matrix for the genes of targets against references.
+
+    targets: target organism keys; default every cached organism (or every organism in store).
+    references: genome columns (keys or display names); default every partner genome found.
+    store: read tables from this offline OrthologStore instead of the cache/FungiDB.
+    Tables are loaded one at a time, so peak memory is about one table plus the sparse entries.
+    """
+    from fungidb_orthologs.cache import default_cache
+    from fungidb_orthologs.client import fetch_ortholog_table
+
+    if targets is None:
+        if store is not None:
+            targets = store.organisms()
+        else:
+            targets = list(dict.fromkeys(e["organism"] for e in default_cache().entries()))
+    builder = MatrixBuilder(references, chunk_rows=chunk_rows)
+    for organism in dict.fromkeys(targets):
+        if store is not None:
+            df = store.get_orthologs(organism, reference_organisms=references)
+        else:
+            df = fetch_ortholog_table(organism, use_cache=use_cache)
+        with metrics.timer("matrix_build"):
+            builder.add_table(organism, df)
+        del df
+    with metrics.timer("matrix_build"):
+        return builder.build()
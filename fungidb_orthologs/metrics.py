@@ -0,0 +1,206 @@
+"""
+In-process performance metrics: stage timers and counters.
+
+Instrumented code records how long each stage took (upstream download, CSV parse,
+FASTA scan, filtering, serialization, ...) and counts bytes downloaded, rows before
+and after filtering and cache hits and misses. Metrics can be read as a JSON-friendly
+snapshot (CLI --profile) or in the Prometheus text format (REST API /metrics).
+
+collect() gives one command its own registry (e.g. a profiled run in the daemon, next
+to other commands) while the process-wide registry keeps counting everything.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+PREFIX = "fungidb_orthologs_"
+STAGE_SECONDS = "stage_seconds"
+
+HELP = {
+    STAGE_SECONDS: "Time spent per processing stage",
+    "download_bytes_total": "Response bytes downloaded from FungiDB",
+    "rows_parsed_total": "Ortholog rows parsed from FungiDB responses",
+    "filter_rows_in_total": "Ortholog rows entering the gene/reference filter",
+    "filter_rows_out_total": "Ortholog rows kept by the gene/reference filter",
+    "fasta_records_total": "FASTA records with a gene ID",
+    "cache_requests_total": "Ortholog table cache lookups by result",
+    "http_retries_total": "FungiDB requests retried after a transient failure",
+    "pushdown_fallbacks_total": "Gene-ID list queries that failed and fell back to a table download",
+    "http_requests_total": "REST API requests",
+    "http_request_seconds": "REST API request latency",
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+class Metrics:
+    """Thread-safe registry of counters and summaries (count, sum and max of observations)."""
+
+    def __init__(self):
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._summaries: dict[tuple[str, Labels], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add value to a counter."""
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one observation (e.g. a duration in seconds) in a summary."""
+        key = (name, _labels(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                self._summaries[key] = [1, value, value]
+            else:
+                summary[0] += 1
+                summary[1] += value
+                summary[2] = max(summary[2], value)
+
+    @contextmanager
+    def timer(self, stage: str, **labels) -> Iterator[None]:
+        """Time the enclosed block as one observation of stage_seconds{stage=...}."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(STAGE_SECONDS, time.perf_counter() - start, stage=stage, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+    def snapshot(self) -> dict:
+        """
+        JSON-serializable view: {"stages": {stage: {"count", "seconds", "max_seconds"}},
+        "counters": {"name{label=...}": value}, "summaries": {"name{label=...}": {...}}}.
+        Stages are ordered by total time, slowest first.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            summaries = {k: list(v) for k, v in self._summaries.items()}
+        stages, other = {}, {}
+        for (name, labels), (count, total, peak) in summaries.items():
+            entry = {"count": int(count), "seconds": total, "max_seconds": peak}
+            label_map = dict(labels)
+            if name == STAGE_SECONDS and list(label_map) == ["stage"]:
+                stages[label_map["stage"]] = entry
+            else:
+                other[name + _format_labels(labels)] = entry
+        return {
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["seconds"])),
+            "counters": {name + _format_labels(labels): value for (name, labels), value in sorted(counters.items())},
+            "summaries": dict(sorted(other.items())),
+        }
+
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            summaries = sorted((k, list(v)) for k, v in self._summaries.items())
+        lines = []
+        seen = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {PREFIX}{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            text = str(int(value)) if float(value).is_integer() else repr(float(value))
+            lines.append(f"{PREFIX}{name}{_format_labels(labels)} {text}")
+        for (name, labels), (count, total, _) in summaries:
+            header(name, "summary")
+            lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {int(count)}")
+            lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {total:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+_default_metrics: Metrics | None = None
+
+
+def default_metrics() -> Metrics:
+    """Process-wide metrics registry used by the instrumented library code."""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = Metrics()
+    return _default_metrics
+
+
+_collector: ContextVar[Metrics | None] = ContextVar("fungidb_orthologs_collector", default=None)
+
+
+@contextmanager
+def collect() -> Iterator[Metrics]:
+    """
+    Also record the metrics of the enclosed block in a fresh registry, which is yielded.
+
+    Covers the calling thread and asyncio tasks and to_thread calls started from it; wrap
+    functions handed to other worker threads with in_context().
+    """
+    registry = Metrics()
+    token = _collector.set(registry)
+    try:
+        yield registry
+    finally:
+        _collector.reset(token)
+
+
+def in_context(fn: Callable) -> Callable:
+    """fn, recording into the caller's collect() registry when run on another thread."""
+    registry = _collector.get()
+    if registry is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _collector.set(registry)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _collector.reset(token)
+
+    return run
+
+
+def _registries() -> list[Metrics]:
+    collector = _collector.get()
+    return [default_metrics()] if collector is None else [default_metrics(), collector]
+
+
+@contextmanager
+def timer(stage: str, **labels) -> Iterator[None]:
+    """Time a stage in the process-wide registry and any collect() registry (see Metrics.timer)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        for registry in _registries():
+            registry.observe(STAGE_SECONDS, elapsed, stage=stage, **labels)
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Increment a counter in the process-wide registry and any collect() registry."""
+    for registry in _registries():
+        registry.inc(name, value, **labels)
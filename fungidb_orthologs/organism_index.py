@@ -0,0 +1,280 @@
+"""
+Organism inference from gene IDs, learned from ortholog tables.
+
+Every cached or ingested ortholog table names genes of its target organism (GID) and
+of hundreds of partner genomes (ORTHOLOGS_GID / ORTHOLOGS_ORGANISM). Counting the
+leading characters of those IDs per organism gives a locus-tag prefix index covering
+most of FungiDB. The counts are kept in a character trie: a gene ID is matched to its
+deepest known prefix, and the organisms under that node vote in proportion to how
+many of their genes share it. Inference samples many FASTA headers, tallies their
+votes and reports the winner with a confidence score (its share of the sample).
+
+The index is stored as JSON next to the table cache and updated incrementally: only
+tables cached or ingested since the last update are read.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fungidb_orthologs import config, metrics
+
+INDEX_FILE = "organism_index.json"
+SCHEMA = 1
+PREFIX_DEPTH = 8  # characters of each gene ID kept in the index
+MIN_MATCH_DEPTH = 3  # shorter matches (e.g. "A") carry no information
+SAMPLE_SIZE = 1000  # gene IDs sampled per inference
+MIN_CONFIDENCE = 0.5  # share of sampled genes needed to trust an inference
+_COUNTS = ""  # trie node key holding {organism: genes}; never a gene ID character
+
+
+@dataclass
+class Inference:
+    """Result of OrganismIndex.infer: best organism, its share of the sample, and the vote tally."""
+
+    organism: str | None
+    confidence: float
+    sampled: int
+    matched: int
+    votes: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def confident(self) -> bool:
+        return self.organism is not None and self.confidence >= MIN_CONFIDENCE
+
+
+class PrefixTrie:
+    """Character trie of gene-ID prefixes; each node counts the genes per organism below it."""
+
+    def __init__(self):
+        self._root: dict = {}
+
+    def insert(self, prefix: str, organism: str, genes: int) -> None:
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+            counts = node.setdefault(_COUNTS, {})
+            counts[organism] = counts.get(organism, 0) + genes
+
+    def match(self, gene_id: str) -> tuple[int, dict[str, int]]:
+        """(depth, {organism: genes}) of the deepest indexed prefix of gene_id; (0, {}) if none."""
+        node, depth = self._root, 0
+        for char in gene_id[:PREFIX_DEPTH]:
+            child = node.get(char)
+            if child is None:
+                break
+            node, depth = child, depth + 1
+        return depth, node.get(_COUNTS, {})
+
+
+def _sample(gene_ids: Sequence[str], size: int) -> list[str]:
+    """Up to size IDs spread evenly over the file (not just the first records)."""
+    if len(gene_ids) <= size:
+        return list(gene_ids)
+    positions = np.linspace(0, len(gene_ids) - 1, size).astype(int)
+    return [gene_ids[i] for i in positions]
+
+
+def _prefix_counts(ids: pd.Index) -> dict[str, int]:
+    prefixes = pd.Series(ids.astype(str), dtype=object).str.strip().str[:PREFIX_DEPTH]
+    return {p: int(n) for p, n in prefixes[prefixes != ""].value_counts().items()}
+
+
+class OrganismIndex:
+    """
+    Persistent locus-tag prefix index: organism -> {gene-ID prefix: distinct genes}.
+
+    path: JSON file (default: <config.CACHE_DIR>/organism_index.json).
+    Build or extend with update() (cached tables and an OrthologStore) or add_table().
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path is not None else config.CACHE_DIR / INDEX_FILE
+        self._organisms: dict[str, dict[str, int]] = {}
+        self._sources: set[str] = set()
+        self._trie: PrefixTrie | None = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if data.get("schema") == SCHEMA and data.get("depth") == PREFIX_DEPTH:
+            self._organisms = data["organisms"]
+            self._sources = set(data["sources"])
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "schema": SCHEMA,
+            "depth": PREFIX_DEPTH,
+            "sources": sorted(self._sources),
+            "organisms": self._organisms,
+        }
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, separators=(",", ":")))
+        tmp.replace(self.path)
+
+    @property
+    def organisms(self) -> list[str]:
+        return sorted(self._organisms)
+
+    def __len__(self) -> int:
+        return len(self._organisms)
+
+    def add_prefix_counts(self, organism: str, counts: dict[str, int]) -> None:
+        """
+        Merge one organism's prefix counts. Counts are merged by maximum, since partner genes
+        seen through different tables overlap.
+        """
+        current = self._organisms.setdefault(organism, {})
+        for prefix, n in counts.items():
+            if n > current.get(prefix, 0):
+                current[prefix] = n
+        self._trie = None
+
+    def add_table(self, organism: str, df: pd.DataFrame) -> None:
+        """Index the gene IDs of one OrthologsLite table (target genes and partner genes)."""
+        from fungidb_orthologs.client import compact_ortholog_table
+
+        if df.empty:
+            return
+        df = compact_ortholog_table(df)
+        self.add_prefix_counts(organism, _prefix_counts(pd.Index(df["GID"].dropna().unique())))
+        if "ORTHOLOGS_GID" not in df.columns or "ORTHOLOGS_ORGANISM" not in df.columns:
+            return
+        pairs = df[["ORTHOLOGS_ORGANISM", "ORTHOLOGS_GID"]].dropna().drop_duplicates()
+        for name, genes in pairs.groupby("ORTHOLOGS_ORGANISM", observed=True)["ORTHOLOGS_GID"]:
+            self.add_prefix_counts(_organism_key(str(name)), _prefix_counts(pd.Index(genes)))
+
+    def _add_store(self, store) -> None:
+        query = (
+            "SELECT organism, substr(gid, 1, ?) AS prefix, COUNT(DISTINCT gid) FROM orthologs "
+            "GROUP BY 1, 2 UNION ALL "
+            "SELECT ortholog_organism, substr(ortholog_gid, 1, ?), COUNT(DISTINCT ortholog_gid) FROM orthologs "
+            "WHERE ortholog_organism IS NOT NULL GROUP BY 1, 2 UNION ALL "
+            "SELECT organism, substr(gid, 1, ?), COUNT(DISTINCT gid) FROM group_members "
+            "WHERE organism IS NOT NULL GROUP BY 1, 2"
+        )
+        counts: dict[str, dict[str, int]] = {}
+        with store.connect() as conn:
+            for organism, prefix, n in conn.execute(query, (PREFIX_DEPTH,) * 3):
+                per_org = counts.setdefault(_organism_key(organism.strip()), {})
+                per_org[prefix] = max(per_org.get(prefix, 0), n)
+        for organism, per_org in counts.items():
+            self.add_prefix_counts(organism, per_org)
+
+    def update(self, cache=None, store=None) -> int:
+        """
+        Index cached tables and/or an OrthologStore not seen before; saves if anything changed.
+
+        Returns the number of new sources read.
+        """
+        added = 0
+        with self._lock, metrics.timer("organism_index_update"):
+            if cache is not None:
+                for entry in cache.entries():
+                    source = f"cache:{entry['file']}:{entry['created']}"
+                    if source in self._sources:
+                        continue
+                    df = cache.read(entry)
+                    if df is not None:
+                        self.add_table(entry["organism"], df)
+                    self._sources.add(source)
+                    added += 1
+            if store is not None and Path(store.path).exists():
+                source = f"store:{Path(store.path).resolve()}:{Path(store.path).stat().st_mtime_ns}"
+                if source not in self._sources:
+                    self._add_store(store)
+                    self._sources.add(source)
+                    added += 1
+            if added:
+                self.save()
+        return added
+
+    @property
+    def trie(self) -> PrefixTrie:
+        if self._trie is None:
+            trie = PrefixTrie()
+            for organism, counts in self._organisms.items():
+                for prefix, n in counts.items():
+                    trie.insert(prefix, organism, n)
+            self._trie = trie
+        return self._trie
+
+    def infer(self, gene_ids: Sequence[str], sample: int = SAMPLE_SIZE) -> Inference:
+        """
+        Vote over a sample of gene IDs. Each ID's deepest matching prefix splits one vote among
+        the organisms under it by gene count; confidence is the winner's share of the sample.
+        """
+        ids = _sample(gene_ids, sample)
+        trie = self.trie
+        votes: dict[str, float] = {}
+        matched = 0
+        for gid in ids:
+            depth, counts = trie.match(gid)
+            if depth < MIN_MATCH_DEPTH:
+                continue
+            matched += 1
+            total = sum(counts.values())
+            for organism, n in counts.items():
+                votes[organism] = votes.get(organism, 0.0) + n / total
+        if not votes:
+            return Inference(None, 0.0, len(ids), 0)
+        ranked = dict(sorted(votes.items(), key=lambda item: -item[1])[:5])
+        best = next(iter(ranked))
+        return Inference(best, votes[best] / len(ids), len(ids), matched, ranked)
+
+
+def _organism_key(name: str) -> str:
+    """Organism key for a display name when the local catalog knows it exactly, else the name."""
+    from fungidb_orthologs.genomes import default_catalog
+
+    return default_catalog().resolver().exact(name) or name
+
+
+_default_index: OrganismIndex | None = None
+_default_sources: tuple | None = None
+_default_lock = threading.Lock()
+
+
+def _mtime_ns(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def default_organism_index() -> OrganismIndex:
+    """
+    Process-wide index, brought up to date with the table cache and offline store whenever
+    either has changed (compared by the modification times of the cache index and store file).
+    """
+    global _default_index, _default_sources
+    from fungidb_orthologs.cache import default_cache
+    from fungidb_orthologs.store import default_store
+
+    cache, store = default_cache(), default_store()
+    sources = (_mtime_ns(cache._index_path()), _mtime_ns(Path(store.path)) if store is not None else None)
+    with _default_lock:
+        if _default_index is None:
+            _default_index = OrganismIndex()
+        if sources != _default_sources:
+            _default_index.update(cache=cache, store=store)
+            _default_sources = sources
+        return _default_index
+
+
+def infer_organism(gene_ids: Sequence[str], index: OrganismIndex | None = None) -> Inference:
+    """Infer the organism of a gene-ID list (e.g. a FASTA's) with the default index."""
+    return (index or default_organism_index()).infer(gene_ids)
@@ -0,0 +1,150 @@
+"""
+Orthogroup graph index across many organisms' ortholog tables.
+
+Genes from all tables are integer-encoded once; each OrthologsLite row is an edge
+between two gene nodes. Connected components (orthogroups) are computed with a
+vectorized union-find (hooking + pointer jumping) and stored in CSR form, so group
+and membership queries never re-scan the source DataFrames.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from fungidb_orthologs.cache import OrthologCache, default_cache
+from fungidb_orthologs.config import FUNGIDB_ORGANISMS
+
+
+def _connected_components(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Return the smallest node index in each node's component (vectorized union-find)."""
+    parent = np.arange(n, dtype=np.int64)
+    while True:
+        ps, pd_ = parent[src], parent[dst]
+        differ = ps != pd_
+        if not differ.any():
+            return parent
+        ps, pd_ = ps[differ], pd_[differ]
+        low = np.minimum(ps, pd_)
+        # Hook both roots onto the smaller one; parents only ever decrease, so no cycles.
+        np.minimum.at(parent, ps, low)
+        np.minimum.at(parent, pd_, low)
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+class OrthogroupIndex:
+    """
+    In-memory orthogroup index over one or more ortholog tables.
+
+    Build with OrthogroupIndex.from_tables({organism_key: df, ...}) or
+    OrthogroupIndex.from_cache(); query with group_of(), members() and groups().
+    """
+
+    def __init__(self, genes: pd.Index, organisms: np.ndarray, components: np.ndarray):
+        self._genes = genes
+        self._organisms = organisms
+        group, _ = pd.factorize(components, sort=True)
+        self._group = group.astype(np.int64)
+        self._order = np.argsort(self._group, kind="stable")
+        self._offsets = np.zeros(group.max() + 2 if len(group) else 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._group), out=self._offsets[1:])
+
+    @classmethod
+    def from_tables(cls, tables: dict[str, pd.DataFrame]) -> OrthogroupIndex:
+        """Build from {target organism key: OrthologsLite DataFrame}."""
+        src_ids, dst_ids, src_orgs, dst_orgs = [], [], [], []
+        for organism, df in tables.items():
+            if "ORTHOLOGS_GID" not in df.columns:
+                continue
+            df = df.dropna(subset=["GID", "ORTHOLOGS_GID"])
+            src_ids.append(df["GID"].astype(str).str.strip().to_numpy())
+            dst_ids.append(df["ORTHOLOGS_GID"].astype(str).str.strip().to_numpy())
+            src_orgs.append(np.full(len(df), FUNGIDB_ORGANISMS.get(organism, organism), dtype=object))
+            if "ORTHOLOGS_ORGANISM" in df.columns:
+                dst_orgs.append(df["ORTHOLOGS_ORGANISM"].astype(str).str.strip().to_numpy())
+            else:
+                dst_orgs.append(np.full(len(df), None, dtype=object))
+        if not src_ids:
+            return cls(pd.Index([], dtype=object), np.array([], dtype=object), np.array([], dtype=np.int64))
+        src = np.concatenate(src_ids)
+        dst = np.concatenate(dst_ids)
+        codes, genes = pd.factorize(np.concatenate([src, dst]))
+        n = len(genes)
+        src_codes, dst_codes = codes[: len(src)], codes[len(src) :]
+        organisms = np.full(n, None, dtype=object)
+        # Ortholog-side labels first, then table owners, which take precedence.
+        organisms[dst_codes] = np.concatenate(dst_orgs)
+        organisms[src_codes] = np.concatenate(src_orgs)
+        components = _connected_components(n, src_codes, dst_codes)
+        return cls(pd.Index(genes), organisms, components)
+
+    @classmethod
+    def from_cache(
+        cls,
+        organisms: list[str] | None = None,
+        cache: OrthologCache | None = None,
+    ) -> OrthogroupIndex:
+        """Build from cached tables (all cached organisms if organisms is None)."""
+        cache = cache or default_cache()
+        tables = {}
+        for entry in cache.entries():
+            organism = entry["organism"]
+            if organism in tables or (organisms is not None and organism not in organisms):
+                continue
+            # read(), not get(): building the index must not mark every table as used
+            df = cache.read(entry)
+            if df is not None:
+                tables[organism] = df
+        return cls.from_tables(tables)
+
+    @property
+    def n_genes(self) -> int:
+        return len(self._genes)
+
+    @property
+    def n_groups(self) -> int:
+        return len(self._offsets) - 1
+
+    def group_of(self, gene_id: str) -> int | None:
+        """Orthogroup number of a gene, or None if the gene is not in any table."""
+        pos = self._genes.get_indexer([gene_id])[0]
+        return None if pos < 0 else int(self._group[pos])
+
+    def _group_frame(self, group: int) -> pd.DataFrame:
+        nodes = self._order[self._offsets[group] : self._offsets[group + 1]]
+        return pd.DataFrame(
+            {
+                "ORTHOGROUP": group,
+                "GID": self._genes.to_numpy()[nodes],
+                "ORGANISM": self._organisms[nodes],
+            }
+        )
+
+    def members(self, gene_id: str) -> pd.DataFrame:
+        """All genes transitively linked to gene_id (columns ORTHOGROUP, GID, ORGANISM)."""
+        group = self.group_of(gene_id)
+        if group is None:
+            return pd.DataFrame(columns=["ORTHOGROUP", "GID", "ORGANISM"])
+        return self._group_frame(group)
+
+    def same_group(self, gene_a: str, gene_b: str) -> bool:
+        """True if both genes are in the same orthogroup."""
+        group = self.group_of(gene_a)
+        return group is not None and group == self.group_of(gene_b)
+
+    def groups(self, min_size: int = 2) -> pd.DataFrame:
+        """All orthogroups with at least min_size members, one row per member."""
+        sizes = np.diff(self._offsets)
+        keep = np.repeat(sizes >= min_size, sizes)
+        nodes = self._order[keep]
+        return pd.DataFrame(
+            {
+                "ORTHOGROUP": self._group[nodes],
+                "GID": self._genes.to_numpy()[nodes],
+                "ORGANISM": self._organisms[nodes],
+            }
+        )
@@ -0,0 +1,162 @@
+"""
+Release-aware incremental refresh of cached ortholog tables.
+
+The genome catalog records the FungiDB build number and, for every organism, the
+last-modified stamp of its downloads directory. When a new release appears, cached
+organisms whose stamp is unchanged are relabelled to the new release without a
+download; only organisms that changed (or whose stamp is unknown) are re-fetched,
+and for those a diff of added and removed ortholog pairs is reported.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+from fungidb_orthologs.batch import DEFAULT_CONCURRENCY
+from fungidb_orthologs.cache import OrthologCache, default_cache
+from fungidb_orthologs.client import _async_http_client, fetch_ortholog_table_async
+from fungidb_orthologs.genomes import GenomeCatalog, current_release, default_catalog
+
+PAIR_COLUMNS = ["GID", "ORTHOLOGS_GID"]
+
+CURRENT = "current"  # already cached for the latest release
+UNCHANGED = "unchanged"  # relabelled to the latest release, no download
+UPDATED = "updated"  # re-downloaded
+FAILED = "failed"
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of refreshing one organism."""
+
+    organism: str
+    status: str
+    old_release: str | None = None
+    new_release: str | None = None
+    rows: int = 0
+    added: int = 0
+    removed: int = 0
+    diff: Path | None = None
+    error: str | None = None
+
+
+def diff_ortholog_tables(old: pd.DataFrame | None, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ortholog pairs (GID, ORTHOLOGS_GID) added or removed between two tables.
+
+    Returns columns CHANGE ("+" added, "-" removed), GID, ORTHOLOGS_GID and
+    ORTHOLOGS_ORGANISM when present, sorted by gene ID.
+    """
+    columns = [c for c in (*PAIR_COLUMNS, "ORTHOLOGS_ORGANISM") if c in new.columns]
+
+    def pairs(df: pd.DataFrame) -> pd.DataFrame:
+        # Plain strings: categoricals from different downloads have different categories
+        return df[columns].astype(str).drop_duplicates(subset=PAIR_COLUMNS)
+
+    if old is None:
+        old = new.iloc[:0]
+    merged = pairs(old).merge(pairs(new), on=PAIR_COLUMNS, how="outer", indicator=True, suffixes=("_old", ""))
+    merged = merged[merged["_merge"] != "both"]
+    out = pd.DataFrame(
+        {
+            "CHANGE": (merged["_merge"] == "right_only").map({True: "+", False: "-"}),
+            "GID": merged["GID"],
+            "ORTHOLOGS_GID": merged["ORTHOLOGS_GID"],
+        }
+    )
+    if "ORTHOLOGS_ORGANISM" in columns:
+        out["ORTHOLOGS_ORGANISM"] = merged["ORTHOLOGS_ORGANISM"].fillna(merged["ORTHOLOGS_ORGANISM_old"])
+    return out.sort_values(["GID", "ORTHOLOGS_GID", "CHANGE"]).reset_index(drop=True)
+
+
+def _latest_entries(cache: OrthologCache) -> dict[str, dict]:
+    latest: dict[str, dict] = {}
+    for entry in cache.entries():
+        current = latest.get(entry["organism"])
+        if current is None or entry["created"] > current["created"]:
+            latest[entry["organism"]] = entry
+    return latest
+
+
+async def refresh_cache_async(
+    organisms: list[str] | None = None,
+    cache: OrthologCache | None = None,
+    catalog: GenomeCatalog | None = None,
+    force: bool = False,
+    diff_dir: str | Path | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[RefreshResult]:
+    """
+    Bring cached ortholog tables up to the latest FungiDB release.
+
+    organisms: organisms to refresh (default: every organism in the cache).
+    force: re-download every organism even if it is current or unchanged.
+    diff_dir: write each updated organism's pair diff to diff_dir/<organism>.diff.tsv.
+    Returns one RefreshResult per organism, in order.
+    """
+    cache = cache or default_cache()
+    catalog = catalog or default_catalog()
+    await asyncio.to_thread(catalog.refresh)
+    release = current_release(catalog)
+    stamps = catalog.modified()
+    latest = _latest_entries(cache)
+    organisms = list(dict.fromkeys(organisms or sorted(latest)))
+    diff_dir = Path(diff_dir) if diff_dir is not None else None
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async with _async_http_client() as client:
+
+        async def run(organism: str) -> RefreshResult:
+            entry = latest.get(organism)
+            old_release = entry["release"] if entry else None
+            result = RefreshResult(organism, CURRENT, old_release=old_release, new_release=release)
+            stamp = stamps.get(organism)
+            if entry and not force:
+                if old_release == release:
+                    return result
+                if stamp and entry.get("modified") == stamp:
+                    if await asyncio.to_thread(cache.retag, organism, old_release, release, stamp):
+                        result.status = UNCHANGED
+                        return result
+            try:
+                async with semaphore:
+                    new = await fetch_ortholog_table_async(organism, client, use_cache=False)
+                # The entry itself, even if its TTL has run out, and without marking it as used
+                old = await asyncio.to_thread(cache.read, entry) if entry else None
+                diff = await asyncio.to_thread(diff_ortholog_tables, old, new)
+                await asyncio.to_thread(cache.put, organism, new, release, stamp)
+                if old_release is not None and old_release != release:
+                    await asyncio.to_thread(cache.remove, organism, old_release)
+            except Exception as e:
+                result.status, result.error = FAILED, str(e)
+                return result
+            result.status, result.rows = UPDATED, len(new)
+            result.added = int((diff["CHANGE"] == "+").sum())
+            result.removed = int((diff["CHANGE"] == "-").sum())
+            if diff_dir is not None:
+                diff_dir.mkdir(parents=True, exist_ok=True)
+                result.diff = diff_dir / f"{organism}.diff.tsv"
+                await asyncio.to_thread(diff.to_csv, result.diff, sep="\t", index=False)
+            return result
+
+        return list(await asyncio.gather(*(run(o) for o in organisms)))
+
+
+def refresh_cache(
+    organisms: list[str] | None = None,
+    cache: OrthologCache | None = None,
+    catalog: GenomeCatalog | None = None,
+    force: bool = False,
+    diff_dir: str | Path | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> list[RefreshResult]:
+    """Synchronous wrapper around refresh_cache_async."""
+    return asyncio.run(
+        refresh_cache_async(
+            organisms, cache=cache, catalog=catalog, force=force, diff_dir=diff_dir, concurrency=concurrency
+        )
+    )
@@ -4,49 +4,94 @@ Orchestrates ortholog lookup: parse genome FASTA, call FungiDB, return orthologs
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from pathlib import Path
 
 import pandas as pd
 
 from fungidb_orthologs.config import DEFAULT_REFERENCE_SPECIES, get_fungidb_organism_key
 from fungidb_orthologs.client import get_orthologs_for_genes
-from fungidb_orthologs.genome_parser import get_gene_ids_from_fasta, infer_fungidb_organism_from_fasta
+from fungidb_orthologs.genome_parser import scan_fasta
+from fungidb_orthologs.genomes import resolve_organism
+from fungidb_orthologs.organism_index import infer_organism
+from fungidb_orthologs.store import OrthologStore
+
+
+def resolve_target_organism(
+    organism: str | None,
+    inferred: str | None,
+    gene_ids: list[str] | None = None,
+) -> str:
+    """
+    Pick the FungiDB organism key for a lookup: the given organism (resolved via the
+    genome catalog), else a confident vote of gene_ids against the locus-tag prefix index
+    built from cached and ingested tables, else the one inferred from the FASTA's name and
+    first record. Raises ValueError if none applies.
+    """
+    if organism:
+        return get_fungidb_organism_key(organism) or resolve_organism(organism) or organism
+    guess = infer_organism(gene_ids) if gene_ids else None
+    if guess is not None and guess.confident:
+        return guess.organism
+    if inferred is not None:
+        return inferred
+    hint = ""
+    if guess is not None and guess.organism:
+        hint = f" Best guess from gene IDs: {guess.organism} (confidence {guess.confidence:.2f})."
+    raise ValueError(
+        "Could not determine FungiDB organism."
+        f"{hint} "
+        "Provide organism= (e.g. 'AfumigatusA1163') or use a FASTA with recognizable locus_tag. "
+        "Run 'fungidb-orthologs list-genomes' to see available genomes."
+    )
 
 
 def get_orthologs_for_genome(
     fasta_path: str | Path,
     organism: str | None = None,
     reference_species: list[str] | None = None,
+    use_cache: bool = True,
+    stream: bool = False,
+    strategy: str = "auto",
+    progress: Callable[[str, float], None] | None = None,
+    store: OrthologStore | None = None,
+    reciprocal: str | None = None,
 ) -> tuple[pd.DataFrame, str]:
     """
     Get orthologs for all genes in a genome FASTA.
 
-    If organism is None, tries to infer from FASTA (e.g. AFUB_ -> AfumigatusA1163).
+    If organism is None, infers it from the FASTA's gene IDs (see resolve_target_organism).
     reference_species: list of FungiDB organism keys to extract orthologs from.
+    use_cache: use the on-disk ortholog table cache (False bypasses it).
+    stream: on a cache miss, download and filter the table in chunks (bounded memory).
+    strategy: "auto" (default), "table" or "genes" (gene-ID list query); see get_orthologs_for_genes.
+    progress: optional callback(stage, fraction) called as the lookup advances; it may raise
+        to abort the lookup between stages.
+    store: serve from this offline OrthologStore instead of FungiDB.
+    reciprocal: "keep" or "flag" pairs confirmed by the reference organisms' own tables.
     Returns (ortholog DataFrame, organism key used).
     """
     fasta_path = Path(fasta_path)
     if not fasta_path.exists():
         raise FileNotFoundError(f"Genome FASTA not found: {fasta_path}")
 
-    org_key = None
-    if organism:
-        org_key = get_fungidb_organism_key(organism) or organism
-    if org_key is None:
-        org_key = infer_fungidb_organism_from_fasta(fasta_path)
-    if org_key is None:
-        raise ValueError(
-            "Could not determine FungiDB organism. "
-            "Provide organism= (e.g. 'AfumigatusA1163') or use a FASTA with recognizable locus_tag. "
-            "Run 'fungidb-orthologs list-genomes' to see available genomes."
-        )
+    report = progress or (lambda stage, fraction: None)
+    report("scan", 0.0)
+    gene_ids, inferred = scan_fasta(fasta_path)
+    org_key = resolve_target_organism(organism, inferred, gene_ids)
 
-    gene_ids = get_gene_ids_from_fasta(fasta_path)
+    report("fetch", 0.1)
     df = get_orthologs_for_genes(
         organism=org_key,
         gene_ids=gene_ids if gene_ids else None,
         reference_organisms=reference_species or DEFAULT_REFERENCE_SPECIES,
+        use_cache=use_cache,
+        stream=stream,
+        strategy=strategy,
+        store=store,
+        reciprocal=reciprocal,
     )
+    report("done", 1.0)
     return df, org_key
 
 
@@ -54,13 +99,24 @@ def get_orthologs_by_organism(
     target_organism: str,
     reference_organisms: list[str],
     gene_ids: list[str] | None = None,
+    use_cache: bool = True,
+    stream: bool = False,
+    strategy: str = "auto",
+    store: OrthologStore | None = None,
+    reciprocal: str | None = None,
 ) -> pd.DataFrame:
     """
     Get orthologs for a target organism (by FungiDB key) from specified reference organisms.
-    No FASTA needed - use when you know the organism key.
+    No FASTA needed - use when you know the organism key (names are resolved via the genome catalog).
+    reciprocal: "keep" or "flag" pairs confirmed by the reference organisms' own tables.
     """
     return get_orthologs_for_genes(
-        organism=target_organism,
+        organism=resolve_organism(target_organism) or target_organism,
         gene_ids=gene_ids,
         reference_organisms=reference_organisms,
+        use_cache=use_cache,
+        stream=stream,
+        strategy=strategy,
+        store=store,
+        reciprocal=reciprocal,
     )
@@ -0,0 +1,221 @@
+"""
+Shared HTTP transport for FungiDB requests.
+
+One pooled httpx.Client is reused for every synchronous request, so repeated calls
+skip the TCP/TLS handshake. Responses are requested compressed (gzip, plus Brotli
+when a Brotli decoder is installed), HTTP/2 is used when the h2 package is available
+(FUNGIDB_ORTHOLOGS_HTTP2), and transient failures (connection errors, 429 and 5xx)
+are retried with exponential backoff and jitter. Client errors such as 422 (unknown
+organism) are returned immediately.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from fungidb_orthologs import config, metrics
+
+DEFAULT_TIMEOUT = 30
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Errors where the request most likely never reached FungiDB or the connection dropped;
+# read timeouts are not retried since a slow query will usually time out again
+RETRY_EXCEPTIONS = (
+    httpx.ConnectError,
+    httpx.ConnectTimeout,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+)
+
+
+def _module_available(name: str) -> bool:
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+def accept_encoding() -> str:
+    """Accept-Encoding value listing the encodings httpx can decode in this environment."""
+    encodings = ["gzip", "deflate"]
+    if _module_available("brotli") or _module_available("brotlicffi"):
+        encodings.append("br")
+    return ", ".join(encodings)
+
+
+def http2_enabled() -> bool:
+    """Whether to negotiate HTTP/2 (FUNGIDB_ORTHOLOGS_HTTP2: auto, 1 or 0)."""
+    if config.HTTP2 in ("1", "true", "yes"):
+        return True
+    if config.HTTP2 in ("0", "false", "no"):
+        return False
+    return _module_available("h2")
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _RetryPolicy:
+    def __init__(self, retries: int | None, backoff: float | None, backoff_max: float | None):
+        self.retries = config.HTTP_RETRIES if retries is None else retries
+        self.backoff = config.HTTP_BACKOFF if backoff is None else backoff
+        self.backoff_max = config.HTTP_BACKOFF_MAX if backoff_max is None else backoff_max
+
+    def delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        """Seconds to wait before retry number attempt + 1 (with jitter, honoring Retry-After)."""
+        delay = min(self.backoff_max, self.backoff * 2**attempt) * random.uniform(0.5, 1.0)
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is not None:
+            delay = min(self.backoff_max, max(delay, retry_after))
+        return delay
+
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    Wrap a transport with retries for transient failures.
+
+    retries: retries after the first attempt (default: config.HTTP_RETRIES).
+    backoff: base delay in seconds, doubled on every retry up to backoff_max.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.BaseTransport,
+        retries: int | None = None,
+        backoff: float | None = None,
+        backoff_max: float | None = None,
+    ):
+        self._transport = transport
+        self.policy = _RetryPolicy(retries, backoff, backoff_max)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = self._transport.handle_request(request)
+            except RETRY_EXCEPTIONS as e:
+                if attempt >= self.policy.retries:
+                    raise
+                delay, reason = self.policy.delay(attempt), type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.policy.retries:
+                    return response
+                delay, reason = self.policy.delay(attempt, response), str(response.status_code)
+                response.close()
+            metrics.inc("http_retries_total", reason=reason)
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of RetryTransport."""
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        retries: int | None = None,
+        backoff: float | None = None,
+        backoff_max: float | None = None,
+    ):
+        self._transport = transport
+        self.policy = _RetryPolicy(retries, backoff, backoff_max)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await self._transport.handle_async_request(request)
+            except RETRY_EXCEPTIONS as e:
+                if attempt >= self.policy.retries:
+                    raise
+                delay, reason = self.policy.delay(attempt), type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.policy.retries:
+                    return response
+                delay, reason = self.policy.delay(attempt, response), str(response.status_code)
+                await response.aclose()
+            metrics.inc("http_retries_total", reason=reason)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _client_options() -> dict:
+    return {
+        "timeout": DEFAULT_TIMEOUT,
+        "headers": {"Accept-Encoding": accept_encoding()},
+        "follow_redirects": True,
+    }
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_MAX_CONNECTIONS,
+    )
+
+
+def new_client() -> httpx.Client:
+    """A new client with the shared configuration (pooling, compression, HTTP/2, retries)."""
+    transport = httpx.HTTPTransport(http2=http2_enabled(), limits=_limits())
+    return httpx.Client(transport=RetryTransport(transport), **_client_options())
+
+
+def new_async_client() -> httpx.AsyncClient:
+    """
+    A new async client with the shared configuration.
+
+    Async clients are bound to an event loop, so each loop (batch run, API server) creates
+    its own and shares it across that loop's requests.
+    """
+    transport = httpx.AsyncHTTPTransport(http2=http2_enabled(), limits=_limits())
+    return httpx.AsyncClient(transport=AsyncRetryTransport(transport), **_client_options())
+
+
+_shared_client: httpx.Client | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_client() -> httpx.Client:
+    """
+    Process-wide pooled client for synchronous requests (thread-safe).
+
+    Callers must not close it; pass per-request timeouts with timeout=... where needed.
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None or _shared_client.is_closed:
+            _shared_client = new_client()
+        return _shared_client
+
+
+def close() -> None:
+    """Close the shared client's connections (a later shared_client() call opens a new pool)."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is not None:
+            _shared_client.close()
+            _shared_client = None
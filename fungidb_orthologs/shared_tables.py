@@ -0,0 +1,204 @@
+"""
+Ortholog tables shared between processes as memory-mapped Arrow IPC files.
+
+Under several API workers (uvicorn --workers N) each process would otherwise download
+and hold its own copy of the same large tables. Here the first process that needs an
+organism writes its table once as an uncompressed Arrow IPC file with dictionary-encoded
+columns, and every process memory-maps that file: the table's pages are held once in
+the OS page cache and read zero-copy by all workers. An exclusive lock file per organism
+(fcntl.flock) lets only one process fetch a given table at a time; the others wait, then
+map the file it wrote. Queries filter the mapped table with Arrow compute kernels and
+convert only the selected rows to pandas.
+
+Enabled in the API by FUNGIDB_ORTHOLOGS_SHARED_TABLES=<directory> (see config).
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from fungidb_orthologs import config, metrics
+from fungidb_orthologs.client import _organism_for_api, compact_ortholog_table
+from fungidb_orthologs.coalesce import TTLCache
+
+SUFFIX = ".arrow"
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError(
+            'Shared tables need pyarrow: pip install "fungidb-orthologs[columnar]"'
+        ) from None
+    return pa
+
+
+class SharedTables:
+    """
+    Directory of memory-mapped Arrow tables, one per organism and release.
+
+    directory: location (default: config.SHARED_TABLES_DIR); use a tmpfs path to keep tables in RAM.
+    ttl: seconds after which a table file is fetched again (default: config.CACHE_TTL; 0 = never).
+    max_mapped: tables this process keeps mapped, least recently used dropped first
+        (default: config.MEMORY_CACHE_ITEMS); a replaced file's old mapping is dropped at once.
+    """
+
+    def __init__(self, directory: str | Path | None = None, ttl: float | None = None, max_mapped: int | None = None):
+        _arrow()
+        self.directory = Path(directory if directory is not None else config.SHARED_TABLES_DIR)
+        self.ttl = config.CACHE_TTL if ttl is None else ttl
+        # path -> ((mtime_ns, inode), table); a mapping is unmapped once no table or query result refers to it
+        self._mapped = TTLCache(max_items=max_mapped or config.MEMORY_CACHE_ITEMS, ttl=config.MEMORY_CACHE_TTL)
+
+    def path(self, organism: str, release: str | None = None) -> Path:
+        from fungidb_orthologs.cache import _default_release, _safe_name
+
+        release = release or _default_release()
+        return self.directory / f"{_safe_name(organism)}__{_safe_name(release)}{SUFFIX}"
+
+    def _fresh(self, path: Path) -> os.stat_result | None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if self.ttl and time.time() - stat.st_mtime > self.ttl:
+            return None
+        return stat
+
+    @contextmanager
+    def _locked(self, path: Path) -> Iterator[None]:
+        """Exclusive cross-process lock for one table file (held while it is fetched and written)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(path.with_suffix(".lock"), "a") as f:
+            with metrics.timer("shared_table_lock_wait"):
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def write(self, path: Path, df: pd.DataFrame) -> None:
+        """Write a table file atomically; categorical columns become Arrow dictionary arrays."""
+        pa = _arrow()
+        import pyarrow.ipc as ipc
+
+        table = pa.Table.from_pandas(compact_ortholog_table(df), preserve_index=False)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        # No compression: compressed buffers would have to be decoded into private memory
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        tmp.replace(path)
+
+    def _map(self, path: Path, stat: os.stat_result):
+        pa = _arrow()
+        import pyarrow.ipc as ipc
+
+        # Files are replaced by rename, so the inode changes even within one mtime tick
+        stamp = (stat.st_mtime_ns, stat.st_ino)
+        mapped = self._mapped.get(path)
+        if mapped is not None and mapped[0] == stamp:
+            return mapped[1]
+        with metrics.timer("shared_table_map"):
+            table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        # Replaces (and so releases) the mapping of an older file at the same path
+        self._mapped.put(path, (stamp, table))
+        return table
+
+    def get(self, organism: str, load: Callable[[], pd.DataFrame], release: str | None = None):
+        """
+        Memory-mapped pyarrow.Table for organism. If no current file exists, one process calls
+        load() (e.g. fetch_ortholog_table) and writes it while the others wait for it.
+        """
+        path = self.path(organism, release)
+        stat = self._fresh(path)
+        if stat is None:
+            with self._locked(path):
+                # Another process may have written the table while this one waited
+                stat = self._fresh(path)
+                if stat is None:
+                    metrics.inc("shared_table_requests_total", result="miss")
+                    self.write(path, load())
+                    stat = path.stat()
+        else:
+            metrics.inc("shared_table_requests_total", result="hit")
+        return self._map(path, stat)
+
+    def remove(self, organism: str | None = None) -> int:
+        """Delete table files (all if organism is None); processes that mapped them keep their view."""
+        from fungidb_orthologs.cache import _safe_name
+
+        pattern = f"{_safe_name(organism)}__*{SUFFIX}" if organism else f"*{SUFFIX}"
+        removed = 0
+        for path in self.directory.glob(pattern):
+            path.unlink(missing_ok=True)
+            self._mapped.discard(path)
+            removed += 1
+        return removed
+
+
+def _mask(column, allowed: set[str]) -> np.ndarray:
+    """Boolean row mask of column values in allowed; for dictionary chunks only the dictionary is compared."""
+    pa = _arrow()
+    import pyarrow.compute as pc
+
+    values = pa.array(sorted(allowed), type=pa.string())
+    parts = []
+    for chunk in column.chunks:
+        if pa.types.is_dictionary(chunk.type):
+            keep = pc.is_in(chunk.dictionary, value_set=values).to_numpy(zero_copy_only=False)
+            # Extra False slot for missing values
+            keep = np.append(keep, False)
+            indices = pc.fill_null(chunk.indices, len(chunk.dictionary))
+            parts.append(keep[indices.to_numpy(zero_copy_only=False)])
+        else:
+            found = pc.fill_null(pc.is_in(chunk, value_set=values), False)
+            parts.append(found.to_numpy(zero_copy_only=False))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=bool)
+
+
+def select(table, gene_ids: list[str] | None = None, reference_organisms: list[str] | None = None) -> pd.DataFrame:
+    """
+    select_orthologs for a memory-mapped table: only the matching rows are copied out of the
+    mapping and converted to a (compact) DataFrame.
+    """
+    pa = _arrow()
+    import pyarrow.compute as pc
+
+    with metrics.timer("filter"):
+        mask = np.ones(table.num_rows, dtype=bool)
+        if reference_organisms is not None and "ORTHOLOGS_ORGANISM" in table.column_names:
+            allowed = set(reference_organisms) | {_organism_for_api(r) for r in reference_organisms}
+            mask &= _mask(table.column("ORTHOLOGS_ORGANISM"), allowed)
+        if gene_ids is not None:
+            mask &= _mask(table.column("GID"), {str(g) for g in gene_ids})
+        rows = table.filter(pa.array(mask))
+        # Decode dictionaries so the result does not carry the whole table's category lists
+        columns = [
+            pc.cast(col, col.type.value_type) if pa.types.is_dictionary(col.type) else col for col in rows.columns
+        ]
+        df = compact_ortholog_table(pa.table(columns, names=rows.column_names).to_pandas())
+    metrics.inc("filter_rows_in_total", table.num_rows)
+    metrics.inc("filter_rows_out_total", len(df))
+    return df
+
+
+_default_shared: SharedTables | None = None
+
+
+def default_shared_tables() -> SharedTables | None:
+    """Shared table directory when FUNGIDB_ORTHOLOGS_SHARED_TABLES is set, else None."""
+    global _default_shared
+    if not config.USE_SHARED_TABLES:
+        return None
+    if _default_shared is None:
+        _default_shared = SharedTables()
+    return _default_shared
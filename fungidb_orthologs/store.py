@@ -0,0 +1,329 @@
+"""
+Offline ortholog store built from FungiDB / OrthoMCL bulk download files.
+
+Files in a local directory are ingested into an indexed SQLite database:
+
+- Ortholog tables (``.csv``, ``.tsv``, ``.txt``, optionally ``.gz``) with OrthologsLite
+  columns (Gene ID / Ortholog / Organism / Product, as written by ``extract``); the
+  target organism key is taken from the file name (``AfumigatusA1163.tsv``,
+  ``AfumigatusA1163_orthologs.tsv``).
+- OrthoMCL group files (``groups*.txt``) with lines ``OG6_100000: taxon|gene taxon|gene ...``;
+  taxon abbreviations are mapped to organism names with an optional
+  ``taxon_map.tsv`` (``abbrev<TAB>organism``) in the same directory.
+
+Lookups then run as indexed queries on gene ID and organism with no network access.
+"""
+
+from __future__ import annotations
+
+import gzip
+import re
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from fungidb_orthologs import config, metrics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orthologs (
+    organism TEXT NOT NULL,
+    gid TEXT NOT NULL,
+    ortholog_gid TEXT NOT NULL,
+    ortholog_organism TEXT,
+    product TEXT,
+    source TEXT
+);
+CREATE TABLE IF NOT EXISTS group_members (
+    group_id TEXT NOT NULL,
+    gid TEXT NOT NULL,
+    organism TEXT
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_orthologs_organism_gid ON orthologs (organism, gid);
+CREATE INDEX IF NOT EXISTS idx_orthologs_ortholog_organism ON orthologs (ortholog_organism);
+CREATE INDEX IF NOT EXISTS idx_orthologs_source ON orthologs (source);
+CREATE INDEX IF NOT EXISTS idx_group_members_gid ON group_members (gid);
+CREATE INDEX IF NOT EXISTS idx_group_members_group ON group_members (group_id);
+CREATE INDEX IF NOT EXISTS idx_group_members_organism ON group_members (organism);
+"""
+
+TABLE_SUFFIXES = (".csv", ".tsv", ".txt")
+TAXON_MAP_FILE = "taxon_map.tsv"
+INGEST_CHUNK_ROWS = 100_000
+QUERY_CHUNK = 900  # stay below SQLite's bound-parameter limit
+
+_schema_ready: set[Path] = set()  # database files whose tables exist (checked once per process)
+_schema_lock = threading.Lock()
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def _base_name(path: Path) -> str:
+    name = path.name
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return name.rsplit(".", 1)[0]
+
+
+def _organism_from_filename(path: Path) -> str:
+    return re.sub(r"[_.-]?(orthologs?|orthologslite)$", "", _base_name(path), flags=re.IGNORECASE)
+
+
+def _is_group_file(path: Path) -> bool:
+    return "groups" in _base_name(path).lower()
+
+
+class OrthologStore:
+    """
+    Indexed SQLite store of ortholog pairs and OrthoMCL groups.
+
+    path: database file (default: config.STORE_PATH).
+    Typical use: OrthologStore(path).ingest(directory), then get_orthologs(organism, ...).
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path if path is not None else config.STORE_PATH)
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        path = self.path.resolve()
+        with _schema_lock:
+            if path in _schema_ready:
+                return
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(orthologs)")}
+            if "source" not in columns:  # stores created before rows were tagged with their file
+                conn.execute("ALTER TABLE orthologs ADD COLUMN source TEXT")
+                conn.commit()
+            _schema_ready.add(path)
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection in a transaction (committed on success, rolled back on error), closed afterwards."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            _schema_ready.discard(self.path.resolve())
+        conn = sqlite3.connect(self.path)
+        try:
+            self._ensure_schema(conn)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # -- ingest --------------------------------------------------------------
+
+    def ingest(self, directory: str | Path) -> dict[str, int]:
+        """
+        Load every ortholog table and group file under directory (recursively).
+
+        Files already ingested are replaced. Returns {file path: rows loaded}.
+        """
+        directory = Path(directory)
+        taxon_map = self._read_taxon_map(directory / TAXON_MAP_FILE)
+        loaded = {}
+        with self.connect() as conn:
+            for path in sorted(directory.rglob("*")):
+                if not path.is_file() or path.name == TAXON_MAP_FILE:
+                    continue
+                suffix = Path(path.name[:-3]).suffix if path.name.endswith(".gz") else path.suffix
+                if suffix not in TABLE_SUFFIXES:
+                    continue
+                conn.execute("DELETE FROM sources WHERE path = ?", (str(path),))
+                if _is_group_file(path):
+                    rows = self._ingest_groups(conn, path, taxon_map)
+                    kind = "groups"
+                else:
+                    rows = self._ingest_table(conn, path)
+                    kind = "orthologs"
+                conn.execute("INSERT INTO sources (path, kind, rows) VALUES (?, ?, ?)", (str(path), kind, rows))
+                loaded[str(path)] = rows
+            # Indexes are built once the rows are in (cheaper than maintaining them per insert)
+            conn.executescript(INDEXES)
+            conn.execute("ANALYZE")
+        return loaded
+
+    @staticmethod
+    def _read_taxon_map(path: Path) -> dict[str, str]:
+        if not path.exists():
+            return {}
+        mapping = {}
+        for line in path.read_text().splitlines():
+            fields = line.strip().split("\t")
+            if len(fields) >= 2 and not line.startswith("#"):
+                mapping[fields[0].strip()] = fields[1].strip()
+        return mapping
+
+    def _ingest_table(self, conn: sqlite3.Connection, path: Path) -> int:
+        from fungidb_orthologs.client import _normalize_columns
+
+        organism = _organism_from_filename(path)
+        sep = "," if ".csv" in path.name else "\t"
+        # Replace only this file's rows (other files may map to the same organism); rows from
+        # stores that predate the source column are matched by organism
+        conn.execute(
+            "DELETE FROM orthologs WHERE source = ? OR (source IS NULL AND organism = ?)", (str(path), organism)
+        )
+        rows = 0
+        for chunk in pd.read_csv(path, sep=sep, dtype=str, chunksize=INGEST_CHUNK_ROWS, on_bad_lines="skip"):
+            chunk = _normalize_columns(chunk)
+            if "ORTHOLOGS_GID" not in chunk.columns:
+                raise ValueError(f"{path}: no ortholog column (expected Gene ID / Ortholog / Organism / Product)")
+            chunk = chunk.dropna(subset=["GID", "ORTHOLOGS_GID"])
+            missing = [None] * len(chunk)
+            records = zip(
+                [organism] * len(chunk),
+                chunk["GID"].str.strip(),
+                chunk["ORTHOLOGS_GID"].str.strip(),
+                chunk["ORTHOLOGS_ORGANISM"].str.strip() if "ORTHOLOGS_ORGANISM" in chunk.columns else missing,
+                chunk["ORTHOLOGS_PRODUCT"] if "ORTHOLOGS_PRODUCT" in chunk.columns else missing,
+                [str(path)] * len(chunk),
+            )
+            conn.executemany(
+                "INSERT INTO orthologs (organism, gid, ortholog_gid, ortholog_organism, product, source) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                records,
+            )
+            rows += len(chunk)
+        return rows
+
+    @staticmethod
+    def _iter_group_members(path: Path, taxon_map: dict[str, str]) -> Iterator[tuple[str, str, str | None]]:
+        with _open_text(path) as f:
+            for line in f:
+                group, sep, members = line.partition(":")
+                if not sep:
+                    continue
+                group = group.strip()
+                for member in members.split():
+                    taxon, bar, gid = member.partition("|")
+                    if not bar:
+                        yield group, taxon, None
+                    else:
+                        yield group, gid, taxon_map.get(taxon, taxon)
+
+    def _ingest_groups(self, conn: sqlite3.Connection, path: Path, taxon_map: dict[str, str]) -> int:
+        rows = 0
+        batch: list[tuple[str, str, str | None]] = []
+
+        def flush() -> None:
+            groups = {m[0] for m in batch}
+            conn.executemany("DELETE FROM group_members WHERE group_id = ?", ((g,) for g in groups))
+            conn.executemany("INSERT INTO group_members (group_id, gid, organism) VALUES (?, ?, ?)", batch)
+            batch.clear()
+
+        last_group = None
+        for member in self._iter_group_members(path, taxon_map):
+            # Only flush on a group boundary so a group's delete never removes rows just inserted
+            if len(batch) >= INGEST_CHUNK_ROWS and member[0] != last_group:
+                flush()
+            batch.append(member)
+            last_group = member[0]
+            rows += 1
+        flush()
+        return rows
+
+    # -- lookup --------------------------------------------------------------
+
+    def organisms(self) -> list[str]:
+        """Target organisms with ingested ortholog tables."""
+        with self.connect() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT organism FROM orthologs ORDER BY organism")]
+
+    def get_orthologs(
+        self,
+        organism: str,
+        gene_ids: list[str] | None = None,
+        reference_organisms: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """
+        Ortholog rows (GID, ORTHOLOGS_GID, ORTHOLOGS_ORGANISM, ORTHOLOGS_PRODUCT) for organism.
+
+        Pairs come from ingested tables for organism, plus co-members of the organism's genes
+        in ingested OrthoMCL groups. reference_organisms may be keys or display names.
+        """
+        from fungidb_orthologs.client import TABLE_COLUMNS, _organism_for_api
+
+        names = {organism, _organism_for_api(organism)}
+        allowed = None
+        if reference_organisms is not None:
+            allowed = set(reference_organisms) | {_organism_for_api(r) for r in reference_organisms}
+        frames = []
+        with metrics.timer("store_query"), self.connect() as conn:
+            for ids in self._id_chunks(gene_ids):
+                frames.append(self._query_pairs(conn, names, ids, allowed))
+                frames.append(self._query_groups(conn, names, ids, allowed))
+        if not frames:
+            # gene_ids was empty: nothing to look up
+            return pd.DataFrame(columns=list(TABLE_COLUMNS))
+        df = pd.concat(frames, ignore_index=True).drop_duplicates(subset=["GID", "ORTHOLOGS_GID"])
+        return df.reset_index(drop=True)
+
+    @staticmethod
+    def _id_chunks(gene_ids: list[str] | None) -> Iterator[list[str] | None]:
+        if gene_ids is None:
+            yield None
+            return
+        ids = list(dict.fromkeys(str(g) for g in gene_ids))
+        for start in range(0, len(ids), QUERY_CHUNK):
+            yield ids[start : start + QUERY_CHUNK]
+
+    @staticmethod
+    def _in(column: str, values) -> tuple[str, list]:
+        values = list(values)
+        return f"{column} IN ({', '.join('?' * len(values))})", values
+
+    def _query_pairs(self, conn, names: set[str], ids: list[str] | None, allowed: set[str] | None) -> pd.DataFrame:
+        clause, params = self._in("organism", names)
+        where = [clause]
+        if ids is not None:
+            c, p = self._in("gid", ids)
+            where.append(c)
+            params += p
+        if allowed is not None:
+            c, p = self._in("ortholog_organism", allowed)
+            where.append(c)
+            params += p
+        sql = (
+            "SELECT gid AS GID, ortholog_gid AS ORTHOLOGS_GID, ortholog_organism AS ORTHOLOGS_ORGANISM, "
+            f"product AS ORTHOLOGS_PRODUCT FROM orthologs WHERE {' AND '.join(where)}"
+        )
+        return pd.read_sql_query(sql, conn, params=params)
+
+    def _query_groups(self, conn, names: set[str], ids: list[str] | None, allowed: set[str] | None) -> pd.DataFrame:
+        clause, params = self._in("a.organism", names)
+        where = [clause, "b.gid != a.gid", "(b.organism IS NULL OR b.organism != a.organism)"]
+        if ids is not None:
+            c, p = self._in("a.gid", ids)
+            where.append(c)
+            params += p
+        if allowed is not None:
+            c, p = self._in("b.organism", allowed)
+            where.append(c)
+            params += p
+        sql = (
+            "SELECT a.gid AS GID, b.gid AS ORTHOLOGS_GID, b.organism AS ORTHOLOGS_ORGANISM, "
+            "NULL AS ORTHOLOGS_PRODUCT FROM group_members a "
+            "JOIN group_members b ON a.group_id = b.group_id "
+            f"WHERE {' AND '.join(where)}"
+        )
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def default_store() -> OrthologStore | None:
+    """Store to serve from when FUNGIDB_ORTHOLOGS_STORE is set, else None (use FungiDB)."""
+    return OrthologStore() if config.USE_STORE else None
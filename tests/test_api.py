@@ -0,0 +1,307 @@
+"""Test the REST API against a stubbed ortholog table (no network)."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("fastapi")
+
+import httpx  # noqa: E402
+
+from fungidb_orthologs import api  # noqa: E402
+
+TABLE = pd.DataFrame(
+    {
+        "GID": ["AFUB_000010", "AFUB_000010", "AFUB_000020", "AFUB_000030"],
+        "ORTHOLOGS_GID": ["C1_00010W_A", "YAL001C", "SPAC1002.01", "AN0001"],
+        "ORTHOLOGS_ORGANISM": [
+            "Candida albicans SC5314",
+            "Saccharomyces cerevisiae S288C",
+            "Schizosaccharomyces pombe 972h",
+            "Aspergillus nidulans FGSC A4",
+        ],
+        "ORTHOLOGS_PRODUCT": ["kinase", "TFC3", "mrx", "other"],
+    }
+)
+
+
+@pytest.fixture
+def fasta(tmp_path):
+    path = tmp_path / "query.fna"
+    path.write_text(">x [locus_tag=AFUB_000010]\nATG\n>y [locus_tag=AFUB_000020]\nATG\n")
+    return path
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    calls = []
+
+    def fake_fetch(organism, use_cache=True):
+        calls.append(organism)
+        time.sleep(0.2)
+        return TABLE
+
+    monkeypatch.setattr(api, "fetch_ortholog_table", fake_fetch)
+    api._tables.clear()
+    return calls
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://test")
+
+
+def test_concurrent_requests_share_one_download(fasta, downloads):
+    async def run():
+        async with _client() as c:
+            return await asyncio.gather(
+                *(c.get("/orthologs", params={"fasta_path": str(fasta)}) for _ in range(10))
+            )
+
+    responses = asyncio.run(run())
+    assert downloads == ["AfumigatusA1163"]
+    body = responses[0].json()
+    assert all(r.status_code == 200 for r in responses)
+    assert body["organism"] == "AfumigatusA1163"
+    assert [r["ORTHOLOGS_GID"] for r in body["rows"]] == ["C1_00010W_A", "YAL001C", "SPAC1002.01"]
+
+    async def again():
+        async with _client() as c:
+            return await c.post("/orthologs", json={"fasta_path": str(fasta), "references": ["Spombe972h"]})
+
+    r = asyncio.run(again())
+    assert r.json()["count"] == 1
+    assert downloads == ["AfumigatusA1163"]
+
+
+def test_missing_fasta_is_404(downloads):
+    async def run():
+        async with _client() as c:
+            return await c.get("/orthologs/tsv", params={"fasta_path": "/nonexistent.fna"})
+
+    assert asyncio.run(run()).status_code == 404
+
+
+def test_pagination_columns_and_streaming(fasta, downloads):
+    async def run():
+        async with _client() as c:
+            pages, cursor = [], None
+            while True:
+                params = {"fasta_path": str(fasta), "limit": 2, "columns": "GID,ORTHOLOGS_GID"}
+                if cursor:
+                    params["cursor"] = cursor
+                body = (await c.get("/orthologs", params=params)).json()
+                pages.append(body["rows"])
+                cursor = body["next_cursor"]
+                if cursor is None:
+                    break
+            tsv = await c.get("/orthologs/tsv", params={"fasta_path": str(fasta)})
+            ndjson = await c.get("/orthologs/ndjson", params={"fasta_path": str(fasta), "columns": "GID"})
+            bad = await c.get("/orthologs", params={"fasta_path": str(fasta), "cursor": "!!"})
+            return pages, tsv, ndjson, bad
+
+    pages, tsv, ndjson, bad = asyncio.run(run())
+    assert [len(p) for p in pages] == [2, 1]
+    assert set(pages[0][0]) == {"GID", "ORTHOLOGS_GID"}
+    lines = tsv.text.splitlines()
+    assert lines[0].split("\t") == list(TABLE.columns) and len(lines) == 4
+    assert ndjson.text.splitlines() == ['{"GID":"AFUB_000010"}', '{"GID":"AFUB_000010"}', '{"GID":"AFUB_000020"}']
+    assert bad.status_code == 400
+
+
+def test_default_page_size(fasta, downloads, monkeypatch):
+    monkeypatch.setattr(api.config, "API_PAGE_ROWS", 2)
+
+    async def run():
+        async with _client() as c:
+            first = (await c.get("/orthologs", params={"fasta_path": str(fasta)})).json()
+            rest = await c.get("/orthologs", params={"fasta_path": str(fasta), "cursor": first["next_cursor"]})
+            return first, rest.json()
+
+    first, rest = asyncio.run(run())
+    assert len(first["rows"]) == 2 and first["count"] == 3
+    assert len(rest["rows"]) == 1 and rest["next_cursor"] is None
+
+
+def test_metrics_endpoint(fasta, downloads):
+    from fungidb_orthologs.metrics import default_metrics
+
+    default_metrics().reset()
+
+    async def run():
+        async with _client() as c:
+            await c.get("/orthologs", params={"fasta_path": str(fasta)})
+            await c.get("/orthologs", params={"fasta_path": str(fasta)})
+            return await c.get("/metrics")
+
+    r = asyncio.run(run())
+    assert r.headers["content-type"].startswith("text/plain")
+    text = r.text
+    assert "# TYPE fungidb_orthologs_stage_seconds summary" in text
+    assert 'fungidb_orthologs_stage_seconds_count{stage="fasta_scan"} 2' in text
+    assert 'fungidb_orthologs_cache_requests_total{cache="memory",result="hit"} 1' in text
+    assert 'fungidb_orthologs_cache_requests_total{cache="memory",result="miss"} 1' in text
+    assert 'fungidb_orthologs_http_requests_total{method="GET",route="/orthologs",status="200"} 2' in text
+    assert "fungidb_orthologs_filter_rows_out_total 6" in text
+
+
+def test_background_job_lifecycle(fasta, monkeypatch):
+    import threading
+
+    from fungidb_orthologs import client
+    from fungidb_orthologs.jobs import JobManager
+
+    release_event = threading.Event()
+
+    def slow_cached_table(organism, release=None):
+        release_event.wait(5)
+        return TABLE
+
+    monkeypatch.setattr(client.default_cache(), "get", slow_cached_table)
+    monkeypatch.setattr(api, "_jobs", JobManager(max_workers=1))
+
+    async def submit(c):
+        return (await c.post("/jobs", json={"fasta_path": str(fasta), "references": ["Spombe972h"]})).json()
+
+    async def run():
+        async with _client() as c:
+            first, second = await submit(c), await submit(c)
+            cancelled = (await c.delete(f"/jobs/{second['job_id']}")).json()
+            release_event.set()
+            for _ in range(100):
+                body = (await c.get(f"/jobs/{first['job_id']}")).json()
+                if body["status"] == "done":
+                    break
+                await asyncio.sleep(0.05)
+            missing = await c.get("/jobs/nope")
+            return first, cancelled, body, missing
+
+    first, cancelled, body, missing = asyncio.run(run())
+    assert first["status"] in ("queued", "running")
+    assert cancelled["status"] == "cancelled"
+    assert body["status"] == "done" and body["progress"] == 1.0
+    assert [r["ORTHOLOGS_GID"] for r in body["rows"]] == ["SPAC1002.01"]
+    assert missing.status_code == 404
+
+
+def test_single_gene_orthologs_from_gene_index(tmp_path, monkeypatch):
+    from fungidb_orthologs import config, gene_index
+
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(gene_index, "_open", {})
+    monkeypatch.setattr(gene_index, "_checked", {})
+    monkeypatch.setattr(gene_index, "fetch_ortholog_table", lambda organism: TABLE)
+
+    async def run():
+        async with _client() as c:
+            found = await c.get(
+                "/genes/AFUB_000010/orthologs",
+                params={"organism": "AfumigatusA1163", "references": ["CalbicansSC5314"]},
+            )
+            missing = await c.get("/genes/AFUB_999999/orthologs", params={"organism": "AfumigatusA1163"})
+            return found, missing
+
+    found, missing = asyncio.run(run())
+    assert found.status_code == 200
+    body = found.json()
+    assert body["organism"] == "AfumigatusA1163" and body["count"] == 1
+    assert body["orthologs"][0]["ORTHOLOGS_GID"] == "C1_00010W_A"
+    assert missing.status_code == 404
+
+
+def test_upload_streams_raw_gzip_and_multipart_bodies(downloads):
+    import gzip
+
+    fasta = b">x [locus_tag=AFUB_000010]\n" + b"ACGT" * 5000 + b"\n>AFUB_000020 kinase\nATG\n"
+    boundary = "fungidbBoundary"
+    form = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="note"\r\n\r\nignored\r\n'
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="A1163.faa.gz"\r\n'
+        "Content-Type: application/gzip\r\n\r\n"
+    ).encode() + gzip.compress(fasta) + f"\r\n--{boundary}--\r\n".encode()
+
+    def chunked(data: bytes, size: int = 1000):
+        async def body():
+            for start in range(0, len(data), size):
+                yield data[start : start + size]
+
+        return body()
+
+    async def run():
+        async with _client() as c:
+            params = {"organism": "AfumigatusA1163", "references": ["CalbicansSC5314", "Spombe972h"]}
+            raw = await c.post("/orthologs/upload", params=params, content=chunked(fasta))
+            gz = await c.post("/orthologs/upload", params=params, content=gzip.compress(fasta))
+            multipart = await c.post(
+                "/orthologs/upload",
+                content=chunked(form, 7),
+                headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            )
+            truncated = await c.post("/orthologs/upload", content=gzip.compress(fasta)[:-10])
+            return raw, gz, multipart, truncated
+
+    raw, gz, multipart, truncated = asyncio.run(run())
+    assert raw.status_code == 200
+    assert [r["ORTHOLOGS_GID"] for r in raw.json()["rows"]] == ["C1_00010W_A", "SPAC1002.01"]
+    assert gz.json()["rows"] == raw.json()["rows"]
+    assert multipart.status_code == 200
+    assert multipart.json()["organism"] == "AfumigatusA1163"
+    assert multipart.json()["fasta_path"] == "A1163.faa.gz"
+    assert truncated.status_code == 400
+
+
+def test_shared_tables_serve_the_same_rows(fasta, downloads, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from fungidb_orthologs import shared_tables
+
+    async def run():
+        async with _client() as c:
+            return await asyncio.gather(*[c.get("/orthologs", params={"fasta_path": str(fasta)}) for _ in range(3)])
+
+    expected = [r.json()["rows"] for r in asyncio.run(run())]
+    downloads.clear()
+    monkeypatch.setattr(shared_tables.config, "USE_SHARED_TABLES", True)
+    monkeypatch.setattr(shared_tables, "_default_shared", shared_tables.SharedTables(tmp_path))
+    got = [r.json()["rows"] for r in asyncio.run(run())]
+    assert got == expected
+    assert downloads == ["AfumigatusA1163"]
+    assert list(tmp_path.glob("AfumigatusA1163__*.arrow"))
+
+
+def test_job_cancelled_before_it_starts_is_finished(fasta):
+    from fungidb_orthologs.jobs import CANCELLED, Job, JobManager
+
+    manager = JobManager(max_workers=1, result_ttl=0)
+    job = Job(id="j", fasta_path=fasta)
+    # A worker has taken the job (future.cancel() fails) but _run has not started yet
+    job._cancel.set()
+    manager._run(job)
+    assert job.status == CANCELLED and job.finished is not None
+    manager.shutdown()
+
+
+def test_upload_is_parsed_off_the_event_loop(downloads, monkeypatch):
+    import threading
+
+    threads = set()
+
+    class RecordingParser(api.FastaHeaderParser):
+        def feed(self, data):
+            threads.add(threading.get_ident())
+            return super().feed(data)
+
+    monkeypatch.setattr(api, "FastaHeaderParser", RecordingParser)
+
+    async def run():
+        async with _client() as c:
+            response = await c.post(
+                "/orthologs/upload", params={"organism": "AfumigatusA1163"}, content=b">AFUB_000010\nATG\n"
+            )
+            return response, threading.get_ident()
+
+    response, loop_thread = asyncio.run(run())
+    assert response.status_code == 200
+    assert threads and loop_thread not in threads
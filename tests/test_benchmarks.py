@@ -0,0 +1,18 @@
+"""Smoke-test the offline benchmark suite at a tiny scale (no network)."""
+
+from __future__ import annotations
+
+from benchmarks import run
+
+
+def test_benchmarks_run_and_compare():
+    results = run.run(rows=2000, organisms=20, genes=100, repeat=1)
+    benches = results["benchmarks"]
+    assert {"fetch_table", "parse_table", "filter_table", "fasta_scan"} <= set(benches)
+    assert benches["fetch_table"]["items"] == 2000
+    assert benches["fasta_scan"]["items"] == 100
+    assert all(b["peak_mb"] > 0 for b in benches.values())
+
+    slower = {**results, "benchmarks": {k: {**b, "seconds": b["seconds"] * 10} for k, b in benches.items()}}
+    assert run.compare(results, results) == []
+    assert set(run.compare(results, slower)) == set(benches)
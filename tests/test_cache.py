@@ -0,0 +1,174 @@
+"""Test the on-disk ortholog table cache (no network)."""
+
+from __future__ import annotations
+
+import time
+
+import pandas as pd
+
+from fungidb_orthologs import client
+from fungidb_orthologs.cache import OrthologCache
+
+
+def _table(n: int = 3) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "GID": [f"AFUB_{i:06d}" for i in range(n)],
+            "ORTHOLOGS_GID": [f"C1_{i:05d}W_A" for i in range(n)],
+            "ORTHOLOGS_ORGANISM": ["Candida albicans SC5314"] * n,
+            "ORTHOLOGS_PRODUCT": ["hypothetical protein"] * n,
+        }
+    )
+
+
+def test_cache_roundtrip_and_release_key(tmp_path):
+    cache = OrthologCache(tmp_path, max_bytes=0, ttl=0)
+    assert cache.get("AfumigatusA1163", release="68") is None
+    cache.put("AfumigatusA1163", _table(), release="68")
+    got = cache.get("AfumigatusA1163", release="68")
+    pd.testing.assert_frame_equal(got, _table())
+    assert cache.get("AfumigatusA1163", release="69") is None
+    assert [e["organism"] for e in cache.entries()] == ["AfumigatusA1163"]
+
+
+def test_current_entries_move_to_the_catalog_build_number(tmp_path, monkeypatch):
+    from fungidb_orthologs import cache as cache_module
+    from fungidb_orthologs import config
+
+    monkeypatch.setattr(config, "FUNGIDB_RELEASE", "current")
+    release = "current"
+    monkeypatch.setattr(cache_module, "_default_release", lambda: release)
+    cache = OrthologCache(tmp_path, max_bytes=0, ttl=0)
+    cache.put("AfumigatusA1163", _table())
+    created = cache.entries()[0]["created"]
+
+    release = "69"  # the first catalog was saved
+    assert cache.entry("AfumigatusA1163")["release"] == "69"
+    pd.testing.assert_frame_equal(cache.get("AfumigatusA1163"), _table())
+    [entry] = cache.entries()
+    assert (entry["release"], entry["created"]) == ("69", created)
+    assert cache.get("AfumigatusA1163", release="current") is None
+
+
+def test_cache_ttl_and_lru_eviction(tmp_path):
+    cache = OrthologCache(tmp_path, max_bytes=0, ttl=0.01)
+    cache.put("A", _table())
+    time.sleep(0.02)
+    assert cache.get("A") is None
+    assert cache.entries() == []
+
+    cache = OrthologCache(tmp_path, max_bytes=0, ttl=0)
+    cache.put("A", _table(50))
+    cache.put("B", _table(50))
+    cache.get("A")  # A is now more recently used than B
+    size = sum(e["size"] for e in cache.entries())
+    cache.max_bytes = size
+    cache.put("C", _table(50))
+    assert {e["organism"] for e in cache.entries()} == {"A", "C"}
+    assert cache.clear() == 2
+
+
+def test_fetch_ortholog_table_uses_cache(tmp_path, monkeypatch):
+    cache = OrthologCache(tmp_path, max_bytes=0, ttl=0)
+    monkeypatch.setattr(client, "default_cache", lambda: cache)
+    calls = []
+
+    def fake_download(organism):
+        calls.append(organism)
+        return _table()
+
+    monkeypatch.setattr(client, "download_ortholog_table", fake_download)
+    client.fetch_ortholog_table("AfumigatusA1163")
+    client.fetch_ortholog_table("AfumigatusA1163")
+    assert calls == ["AfumigatusA1163"]
+    client.fetch_ortholog_table("AfumigatusA1163", use_cache=False)
+    assert len(calls) == 2
+
+
+def test_refresh_downloads_only_changed_organisms(tmp_path, monkeypatch):
+    import httpx
+
+    from fungidb_orthologs import config, genomes, refresh
+
+    monkeypatch.setattr(config, "FUNGIDB_RELEASE", "current")
+    listing = (
+        '<a href="AfumigatusA1163/">AfumigatusA1163/</a> 2024-06-01 10:00 -\n'
+        '<a href="AnidulansFGSCA4/">AnidulansFGSCA4/</a> 2024-01-01 10:00 -\n'
+    )
+    new_csv = (
+        '"Gene ID","Ortholog","Organism","Product"\n'
+        '"AFUB_000000","C1_00000W_A","Candida albicans SC5314","hypothetical protein"\n'
+        '"AFUB_000001","C1_00001W_A","Candida albicans SC5314","hypothetical protein"\n'
+        '"AFUB_000009","C1_00009W_A","Candida albicans SC5314","hypothetical protein"\n'
+    )
+    downloads = []
+
+    def catalog_handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("Build_number"):
+            return httpx.Response(200, text="69\n")
+        if request.method == "POST":
+            return httpx.Response(200, json={"records": []})
+        return httpx.Response(200, text=listing)
+
+    def table_handler(request: httpx.Request) -> httpx.Response:
+        downloads.append(request.content)
+        return httpx.Response(200, content=new_csv.encode())
+
+    monkeypatch.setattr(
+        genomes, "_http_client", lambda: httpx.Client(transport=httpx.MockTransport(catalog_handler))
+    )
+    monkeypatch.setattr(
+        refresh, "_async_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(table_handler))
+    )
+    cache = OrthologCache(tmp_path / "cache", max_bytes=0, ttl=3600)
+    cache.put("AfumigatusA1163", _table(3), release="68", modified="2024-01-01 10:00")
+    cache.put("AnidulansFGSCA4", _table(5), release="68", modified="2024-01-01 10:00")
+    # An expired table is still the baseline of the diff
+    index = cache._read_index()
+    index[cache._key("AfumigatusA1163", "68")]["created"] -= 7200
+    cache._write_index(index)
+    catalog = genomes.GenomeCatalog(tmp_path / "genomes.json", max_age=0)
+
+    results = {r.organism: r for r in refresh.refresh_cache(cache=cache, catalog=catalog, diff_dir=tmp_path / "diffs")}
+    assert len(downloads) == 1 and b"Aspergillus fumigatus A1163" in downloads[0]
+    changed, unchanged = results["AfumigatusA1163"], results["AnidulansFGSCA4"]
+    assert (changed.status, changed.old_release, changed.new_release) == (refresh.UPDATED, "68", "69")
+    assert (changed.added, changed.removed) == (1, 1)
+    diff = pd.read_csv(changed.diff, sep="\t")
+    assert diff[["CHANGE", "GID"]].values.tolist() == [["-", "AFUB_000002"], ["+", "AFUB_000009"]]
+    assert unchanged.status == refresh.UNCHANGED
+    assert len(cache.get("AnidulansFGSCA4", release="69")) == 5
+    assert {(e["organism"], e["release"]) for e in cache.entries()} == {
+        ("AfumigatusA1163", "69"),
+        ("AnidulansFGSCA4", "69"),
+    }
+
+    again = refresh.refresh_cache(cache=cache, catalog=catalog)
+    assert {r.status for r in again} == {refresh.CURRENT} and len(downloads) == 1
+
+
+def _put_in_process(directory, organism):
+    OrthologCache(directory, max_bytes=0, ttl=0).put(organism, _table(20), release="68")
+
+
+def test_concurrent_writers_keep_every_entry(tmp_path):
+    import multiprocessing
+    from concurrent.futures import ThreadPoolExecutor
+
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_put_in_process, args=(tmp_path, f"P{i}")) for i in range(4)]
+    for p in procs:
+        p.start()
+    cache = OrthologCache(tmp_path, max_bytes=0, ttl=0)
+    with ThreadPoolExecutor(4) as pool:
+        list(pool.map(lambda i: cache.put(f"T{i % 2}", _table(20), release="68"), range(8)))
+    for p in procs:
+        p.join(30)
+    assert {e["organism"] for e in cache.entries()} == {"P0", "P1", "P2", "P3", "T0", "T1"}
+    assert sorted(f.name for f in tmp_path.iterdir() if f.suffix == ".tmp") == []
+
+    # Hits do not rewrite the shared index
+    index = tmp_path / "index.json"
+    before = index.stat().st_mtime_ns
+    assert cache.get("P0", release="68") is not None
+    assert index.stat().st_mtime_ns == before
@@ -0,0 +1,245 @@
+"""Test ortholog table download, parsing and filtering against a mock FungiDB (no network)."""
+
+from __future__ import annotations
+
+import inspect
+import io
+import json
+
+import httpx
+import pytest
+
+from fungidb_orthologs import client
+
+CSV = (
+    '"Gene ID","Ortholog","Organism","Product"\n'
+    '"AFUB_000010","C1_00010W_A","Candida albicans SC5314","kinase, putative"\n'
+    '"AFUB_000010","YAL001C","Saccharomyces cerevisiae S288C","TFC3"\n'
+    '"AFUB_000020","SPAC1002.01","Schizosaccharomyces pombe 972h","mrx"\n'
+    '"AFUB_000030","AN0001","Aspergillus nidulans FGSC A4","other"\n'
+)
+
+
+@pytest.fixture
+def mock_fungidb(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if b"Unknown" in request.content:
+            return httpx.Response(422)
+        return httpx.Response(200, content=CSV.encode())
+
+    monkeypatch.setattr(
+        client, "_http_client", lambda: httpx.Client(transport=httpx.MockTransport(handler))
+    )
+    return requests
+
+
+def test_download_normalizes_columns(mock_fungidb):
+    df = client.download_ortholog_table("AfumigatusA1163")
+    assert list(df.columns) == ["GID", "ORTHOLOGS_GID", "ORTHOLOGS_ORGANISM", "ORTHOLOGS_PRODUCT"]
+    assert len(df) == 4
+    assert df.loc[0, "ORTHOLOGS_PRODUCT"] == "kinase, putative"
+    assert b"Aspergillus fumigatus A1163" in mock_fungidb[0].content
+
+
+def test_download_422_raises_value_error(mock_fungidb):
+    with pytest.raises(ValueError, match="422"):
+        client.download_ortholog_table("Unknown")
+
+
+def test_stream_matches_full_download(mock_fungidb):
+    refs = ["CalbicansSC5314", "Spombe972h"]
+    genes = ["AFUB_000010", "AFUB_000020", "AFUB_000030"]
+    full = client.select_orthologs(
+        client.download_ortholog_table("AfumigatusA1163"), gene_ids=genes, reference_organisms=refs
+    ).reset_index(drop=True)
+    streamed = client.stream_ortholog_table(
+        "AfumigatusA1163", gene_ids=genes, reference_organisms=refs, chunksize=1
+    )
+    assert streamed["GID"].tolist() == full["GID"].tolist() == ["AFUB_000010", "AFUB_000020"]
+    assert streamed["ORTHOLOGS_GID"].tolist() == full["ORTHOLOGS_GID"].tolist()
+
+
+def test_extract_batch_reports_per_target_failures(monkeypatch, tmp_path):
+    from fungidb_orthologs import batch
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if b"Unknown" in request.content:
+            return httpx.Response(422)
+        return httpx.Response(200, content=CSV.encode())
+
+    monkeypatch.setattr(
+        batch, "_async_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    manifest = tmp_path / "targets.tsv"
+    manifest.write_text("target\treferences\nAfumigatusA1163\tCalbicansSC5314\nUnknown\t\n")
+    targets = batch.read_manifest(manifest)
+    results = batch.extract_batch(targets, output_dir=tmp_path, concurrency=2, use_cache=False)
+    assert [r.ok for r in results] == [True, False]
+    assert results[0].rows == 1
+    assert (tmp_path / "AfumigatusA1163_orthologs.tsv").exists()
+    assert "422" in results[1].error
+
+
+def test_extract_fastas_fetches_each_organism_once(mock_fungidb, tmp_path):
+    from fungidb_orthologs import batch
+
+    fastas = tmp_path / "fastas"
+    fastas.mkdir()
+    (fastas / "a.fna").write_text(">x [locus_tag=AFUB_000010]\nATG\n>y [locus_tag=AFUB_000030]\nATG\n")
+    (fastas / "b.faa.gz").write_bytes(__import__("gzip").compress(b">AFUB_000020 kinase\nMK\n"))
+    (fastas / "unknown.fasta").write_text(">XYZ_1\nATG\n")
+    (fastas / "notes.txt").write_text("not a FASTA")
+    out = tmp_path / "out"
+    results = batch.extract_fastas(
+        fastas,
+        output_dir=out,
+        reference_species=["CalbicansSC5314", "Spombe972h"],
+        workers=2,
+        use_cache=False,
+        strategy="table",
+    )
+    assert [r.fasta.name for r in results] == ["a.fna", "b.faa.gz", "unknown.fasta"]
+    assert [r.ok for r in results] == [True, True, False]
+    assert "Could not determine FungiDB organism" in results[2].error
+    assert len(mock_fungidb) == 1  # a.fna and b.faa.gz share one AfumigatusA1163 download
+    assert results[0].rows == 1 and results[1].rows == 1
+    assert (out / "a_orthologs.tsv").read_text().count("C1_00010W_A") == 1
+    assert "SPAC1002.01" in (out / "b_orthologs.tsv").read_text()
+    assert batch.find_fastas(str(fastas / "*.fna")) == [results[0].fasta]
+
+
+def test_extract_fastas_empty_fasta_selects_nothing(mock_fungidb, tmp_path):
+    from fungidb_orthologs import batch
+
+    (tmp_path / "empty.fna").write_text("")
+    results = batch.extract_fastas(tmp_path / "empty.fna", output_dir=tmp_path, organism="AfumigatusA1163")
+    assert results[0].ok and results[0].rows == 0
+    assert mock_fungidb == []
+
+
+@pytest.fixture
+def mock_gene_lists(monkeypatch, tmp_path):
+    """Mock FungiDB ID-list datasets and GeneByLocusTag reports; AFUB_ genes belong to A. fumigatus A1163."""
+    from fungidb_orthologs.cache import OrthologCache
+
+    paths = []
+    datasets = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        paths.append(request.url.path)
+        if request.url.path.endswith("/datasets"):
+            if "BAD" in json.loads(request.content)["sourceContent"]["ids"]:
+                return httpx.Response(422)
+            datasets.append(json.loads(request.content)["sourceContent"]["ids"])
+            return httpx.Response(200, json={"id": len(datasets) - 1})
+        if "GenesByTaxonGene" in request.url.path:
+            return httpx.Response(200, content=CSV.encode())
+        ids = datasets[int(json.loads(request.content)["searchConfig"]["parameters"]["ds_gene_ids"])]
+        header, *rows = CSV.splitlines(keepends=True)
+        rows = [row for row in rows if row.split(",")[0].strip('"') in ids]
+        if request.url.path.endswith("/attributesTabular"):
+            genes = dict.fromkeys(row.split(",")[0] for row in rows)
+            lines = [f'{g},"Aspergillus fumigatus A1163"\n' for g in genes]
+            return httpx.Response(200, content="".join(['"Gene ID","Organism"\n', *lines]))
+        return httpx.Response(200, content="".join([header, *rows]))
+
+    monkeypatch.setattr(
+        client, "_http_client", lambda: httpx.Client(transport=httpx.MockTransport(handler))
+    )
+    monkeypatch.setattr(client, "default_cache", lambda: OrthologCache(tmp_path))
+    return paths
+
+
+def test_gene_list_pushdown_is_chunked(mock_gene_lists, monkeypatch):
+    monkeypatch.setattr(client, "PUSHDOWN_CHUNK_SIZE", 2)
+    df = client.get_orthologs_for_genes(
+        "AfumigatusA1163",
+        gene_ids=["AFUB_000010", "AFUB_000020", "AFUB_000099"],
+        reference_organisms=["CalbicansSC5314", "Spombe972h"],
+        strategy="auto",
+    )
+    assert df["GID"].tolist() == ["AFUB_000010", "AFUB_000020"]
+    assert sum(p.endswith("/datasets") for p in mock_gene_lists) == 2
+    assert not any("GenesByTaxonGene" in p for p in mock_gene_lists)
+
+
+def test_compact_table_filters_match_object_table(mock_fungidb):
+    import pandas as pd
+
+    raw = client._normalize_columns(client._read_ortholog_csv(io.BytesIO(CSV.encode())))
+    raw["ORTHOLOGS_ORGANISM"] = " " + raw["ORTHOLOGS_ORGANISM"] + " "
+    compact = client.download_ortholog_table("AfumigatusA1163")
+    assert client.is_compact(compact)
+    assert all(isinstance(compact[c].dtype, pd.CategoricalDtype) for c in client.TABLE_COLUMNS)
+    for refs in (["CalbicansSC5314"], ["ScerevisiaeS288C", "Spombe972h"], ["Nope"]):
+        for genes in (None, ["AFUB_000010"], ["AFUB_000020", "AFUB_000030"]):
+            expected = client.select_orthologs(raw, gene_ids=genes, reference_organisms=refs)
+            got = client.select_orthologs(compact, gene_ids=genes, reference_organisms=refs)
+            assert got["ORTHOLOGS_GID"].astype(str).tolist() == expected["ORTHOLOGS_GID"].tolist()
+
+
+def test_reciprocal_keep_and_flag(tmp_path):
+    from fungidb_orthologs.store import OrthologStore
+
+    data = tmp_path / "downloads"
+    data.mkdir()
+    (data / "AfumigatusA1163_orthologs.tsv").write_text(
+        "Gene ID\tOrtholog\tOrganism\n"
+        "AFUB_000010\tC1_00010W_A\tCandida albicans SC5314\n"
+        "AFUB_000010\tC1_00011W_A\tCandida albicans SC5314\n"
+        "AFUB_000020\tYAL001C\tSaccharomyces cerevisiae S288C\n"
+    )
+    (data / "CalbicansSC5314_orthologs.tsv").write_text(
+        "Gene ID\tOrtholog\tOrganism\n"
+        "C1_00010W_A\tAFUB_000010\tAspergillus fumigatus A1163\n"
+        "C1_00011W_A\tAFUB_000099\tAspergillus fumigatus A1163\n"
+    )
+    store = OrthologStore(tmp_path / "orthologs.sqlite")
+    store.ingest(data)
+    refs = ["CalbicansSC5314", "ScerevisiaeS288C"]
+
+    kept = client.get_orthologs_for_genes("AfumigatusA1163", reference_organisms=refs, store=store, reciprocal="keep")
+    assert list(zip(kept["GID"], kept["ORTHOLOGS_GID"])) == [("AFUB_000010", "C1_00010W_A")]
+
+    flagged = client.get_orthologs_for_genes(
+        "AfumigatusA1163", reference_organisms=refs, store=store, reciprocal="flag"
+    )
+    assert dict(zip(flagged["ORTHOLOGS_GID"], flagged["RECIPROCAL"])) == {
+        "C1_00010W_A": True,
+        "C1_00011W_A": False,
+        "YAL001C": False,  # no S. cerevisiae table to confirm it
+    }
+    with pytest.raises(ValueError, match="reciprocal"):
+        client.get_orthologs_for_genes("AfumigatusA1163", store=store, reciprocal="both")
+
+
+def test_reciprocal_mask_across_category_vocabularies():
+    import pandas as pd
+
+    forward = client.compact_ortholog_table(
+        pd.DataFrame({"GID": ["a1", "a1", "a2", None], "ORTHOLOGS_GID": ["b1", "b2", "c1", "b1"]})
+    )
+    reverse = [
+        client.compact_ortholog_table(pd.DataFrame({"GID": ["b2", "b1", "b9"], "ORTHOLOGS_GID": ["a9", "a1", "a1"]})),
+        pd.DataFrame({"GID": ["c1"], "ORTHOLOGS_GID": ["a2"]}),
+    ]
+    assert client.reciprocal_mask(forward, reverse).tolist() == [True, False, True, False]
+
+
+def test_gene_list_pushdown_is_scoped_to_the_organism(mock_gene_lists):
+    genes = ["AFUB_000010", "AFUB_000020"]
+    with pytest.raises(ValueError, match="belong to Aspergillus fumigatus A1163, not organism 'CalbicansSC5314'"):
+        client.get_orthologs_for_genes("CalbicansSC5314", gene_ids=genes, strategy="genes")
+    with pytest.raises(ValueError, match=r"422 for a gene-ID list query \(2 IDs\)"):
+        client.get_orthologs_for_genes("AfumigatusA1163", gene_ids=["AFUB_000010", "BAD"], strategy="genes")
+    assert inspect.signature(client.get_orthologs_for_genes).parameters["strategy"].default == "auto"
+
+    # "auto" falls back to the table download when the gene-ID list query fails
+    df = client.get_orthologs_for_genes(
+        "AfumigatusA1163", gene_ids=["AFUB_000010", "BAD"], reference_organisms=["CalbicansSC5314"]
+    )
+    assert df["ORTHOLOGS_GID"].tolist() == ["C1_00010W_A"]
+    assert any("GenesByTaxonGene" in p for p in mock_gene_lists)
@@ -0,0 +1,82 @@
+"""Test the warm local daemon and the import-light CLI front-end (no network)."""
+
+from __future__ import annotations
+
+import io
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from fungidb_orthologs import cache, config, daemon
+from fungidb_orthologs.store import OrthologStore
+
+TABLE = (
+    "Gene ID\tOrtholog\tOrganism\tProduct\n"
+    "AFUB_000010\tC1_00010W_A\tCandida albicans SC5314\tkinase\n"
+    "AFUB_000020\tSPAC1002.01\tSchizosaccharomyces pombe 972h\tpermease\n"
+)
+
+
+def test_cli_front_end_does_not_import_pandas():
+    code = "import sys, fungidb_orthologs.cli, fungidb_orthologs.daemon; print('pandas' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
+    # Parsing a command that writes no tables does not load the writers either
+    code = (
+        "import sys\nfrom fungidb_orthologs import cli\n"
+        "try:\n    cli.run(['daemon', '--help'])\nexcept SystemExit:\n    pass\n"
+        "print('pandas' in sys.modules, file=sys.stderr)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stderr.strip() == "False"
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    socket_path = tmp_path / "d.sock"
+    monkeypatch.setattr(config, "DAEMON_SOCKET", socket_path)
+    monkeypatch.setattr(cache, "_default_cache", cache.OrthologCache(tmp_path / "cache"))
+    thread = threading.Thread(target=daemon.serve, args=(socket_path,), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while daemon.status(socket_path) is None:
+        assert thread.is_alive() and time.monotonic() < deadline
+        time.sleep(0.05)
+    yield socket_path
+    daemon.stop(socket_path)
+    thread.join(10)
+    assert not socket_path.exists()
+
+
+def test_forwarded_command_runs_in_daemon(running_daemon, tmp_path, monkeypatch):
+    assert running_daemon.stat().st_mode & 0o077 == 0
+    data = tmp_path / "downloads"
+    data.mkdir()
+    (data / "AfumigatusA1163.tsv").write_text(TABLE)
+    OrthologStore(tmp_path / "s.sqlite").ingest(data)
+    monkeypatch.chdir(tmp_path)
+
+    out, err = io.BytesIO(), io.BytesIO()
+    argv = ["extract", "--store", "s.sqlite", "-t", "AfumigatusA1163", "-r", "CalbicansSC5314"]
+    code = daemon._request(running_daemon, "run", out, err, argv=argv, cwd=str(tmp_path))
+    assert code == 0
+    assert out.getvalue().decode().splitlines()[1].startswith("AFUB_000010\tC1_00010W_A")
+    assert b"Ortholog rows: 1" in err.getvalue()
+
+    code = daemon._request(running_daemon, "run", out, err, argv=["extract", "--bogus"], cwd=str(tmp_path))
+    assert code == 2
+    assert daemon.status(running_daemon)["requests"] == 2
+
+    # Different FUNGIDB_* settings: the daemon declines and the CLI runs the command itself
+    monkeypatch.setenv("FUNGIDB_RELEASE", "68")
+    assert daemon._request(running_daemon, "run", out, err, argv=argv, cwd=str(tmp_path)) is None
+
+
+def test_forward_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "DAEMON_SOCKET", tmp_path / "missing.sock")
+    assert daemon.forward(["extract", "-t", "AfumigatusA1163"]) is None
+    assert daemon.forward(["ingest", "dir"]) is None
+    assert daemon.status(tmp_path / "missing.sock") is None
@@ -0,0 +1,101 @@
+"""Test the memory-mapped per-gene ortholog index (no network)."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from fungidb_orthologs import cache, client, config, gene_index
+from fungidb_orthologs.cache import OrthologCache
+from fungidb_orthologs.gene_index import GeneIndex, get_gene_orthologs, write_gene_index
+
+TABLE = pd.DataFrame(
+    {
+        "GID": ["AFUB_000020", "AFUB_000010", "AFUB_000010", "AFUB_000030", None],
+        "ORTHOLOGS_GID": ["SPAC1002.01", "C1_00010W_A", "YAL001C", "AN0001", "X"],
+        "ORTHOLOGS_ORGANISM": [
+            "Schizosaccharomyces pombe 972h",
+            "Candida albicans SC5314",
+            "Saccharomyces cerevisiae S288C",
+            "Aspergillus nidulans FGSC A4",
+            "Nowhere",
+        ],
+        "ORTHOLOGS_PRODUCT": ["mrx", "kinase", None, "other", "x"],
+    }
+)
+
+
+def test_lookup_matches_table(tmp_path):
+    path = write_gene_index(TABLE, tmp_path / "a.gidx", source="test")
+    index = GeneIndex(path)
+    assert index.source == "test" and len(index) == 3
+    assert [tuple(r.values()) for r in index.lookup("AFUB_000010")] == [
+        ("C1_00010W_A", "Candida albicans SC5314", "kinase"),
+        ("YAL001C", "Saccharomyces cerevisiae S288C", None),
+    ]
+    assert [r["ORTHOLOGS_GID"] for r in index.lookup(" AFUB_000010 ", ["ScerevisiaeS288C"])] == ["YAL001C"]
+    assert index.lookup("AFUB_000020", ["CalbicansSC5314"]) == []
+    assert index.lookup("AFUB_0000") is None and index.lookup("AFUB_0000100") is None
+    assert "AFUB_000030" in index and "" not in index
+    index.close()
+
+    compact = client.compact_ortholog_table(TABLE.dropna(subset=["GID"]))
+    index = GeneIndex(write_gene_index(compact, tmp_path / "b.gidx"))
+    for gid in ("AFUB_000010", "AFUB_000020", "AFUB_000030"):
+        expected = compact[compact["GID"] == gid]["ORTHOLOGS_GID"].astype(str).tolist()
+        assert [r["ORTHOLOGS_GID"] for r in index.lookup(gid)] == expected
+
+
+def test_index_is_built_from_cache_and_rebuilt_when_table_changes(tmp_path, monkeypatch):
+    table_cache = OrthologCache(tmp_path / "cache", max_bytes=0, ttl=0)
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(cache, "_default_cache", table_cache)
+    monkeypatch.setattr(gene_index, "_open", {})
+    monkeypatch.setattr(gene_index, "_checked", {})
+    monkeypatch.setattr(gene_index, "RECHECK_SECONDS", 0)
+    table_cache.put("AfumigatusA1163", TABLE)
+
+    rows, organism = get_gene_orthologs("AFUB_000020", organism="AfumigatusA1163")
+    assert organism == "AfumigatusA1163"
+    assert [r["ORTHOLOGS_GID"] for r in rows] == ["SPAC1002.01"]
+    assert (tmp_path / "genes" / "AfumigatusA1163.gidx").exists()
+    assert get_gene_orthologs("AFUB_999999", organism="AfumigatusA1163")[0] is None
+
+    table_cache.put("AfumigatusA1163", TABLE.assign(ORTHOLOGS_GID=TABLE["ORTHOLOGS_GID"] + "_v2"))
+    rows, _ = get_gene_orthologs("AFUB_000020", organism="AfumigatusA1163")
+    assert [r["ORTHOLOGS_GID"] for r in rows] == ["SPAC1002.01_v2"]
+
+
+def test_slow_build_blocks_only_its_own_organism(tmp_path, monkeypatch):
+    import threading
+
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(cache, "_default_cache", OrthologCache(tmp_path / "cache", max_bytes=0, ttl=0))
+    monkeypatch.setattr(gene_index, "_open", {})
+    monkeypatch.setattr(gene_index, "_checked", {})
+    release = threading.Event()
+
+    def fetch(organism):
+        if organism == "Slow":
+            release.wait(10)
+        return TABLE
+
+    monkeypatch.setattr(gene_index, "fetch_ortholog_table", fetch)
+    slow = threading.Thread(target=get_gene_orthologs, args=("AFUB_000010",), kwargs={"organism": "Slow"})
+    slow.start()
+    try:
+        rows, _ = get_gene_orthologs("AFUB_000020", organism="AfumigatusA1163")
+        assert [r["ORTHOLOGS_GID"] for r in rows] == ["SPAC1002.01"]
+        assert slow.is_alive()
+    finally:
+        release.set()
+        slow.join(10)
+
+
+def test_inferred_organism_must_be_confident(monkeypatch):
+    from fungidb_orthologs import service
+    from fungidb_orthologs.organism_index import Inference
+
+    monkeypatch.setattr(service, "infer_organism", lambda ids: Inference("AfumigatusA1163", 0.4, 1, 1))
+    with pytest.raises(ValueError, match=r"Best guess from gene IDs: AfumigatusA1163 \(confidence 0.40\)"):
+        get_gene_orthologs("AFUB_000010")
@@ -31,3 +31,100 @@ def test_parse_a1163_fasta():
     assert any("AFUB_" in i for i in ids[:20])
     org = infer_fungidb_organism_from_fasta(fasta)
     assert org == "AfumigatusA1163"
+
+
+FASTA = (
+    ">lcl|CM000169.1_cds_EDP56123.1_1 [locus_tag=AFUB_000010] [protein=kinase]\n"
+    "ATGAAA\nCCCGGG\n"
+    ">lcl|CM000169.1_cds_EDP56124.1_2 [locus_tag=AFUB_000020]\r\n"
+    "ATG\r\n"
+    ">AFUB_000030 no locus tag\n"
+    ">\n"
+    "ATG\n"
+)
+
+
+@pytest.mark.parametrize("compressed", [False, True])
+def test_scan_fasta_headers(tmp_path, compressed):
+    """Header-only scan of plain and gzip FASTA returns gene IDs and organism in one pass."""
+    import gzip
+
+    from fungidb_orthologs.genome_parser import scan_fasta
+
+    path = tmp_path / ("query.fna.gz" if compressed else "query.fna")
+    if compressed:
+        with gzip.open(path, "wt") as f:
+            f.write(FASTA)
+    else:
+        path.write_text(FASTA)
+    ids, org = scan_fasta(path)
+    assert ids == ["AFUB_000010", "AFUB_000020", "AFUB_000030"]
+    assert org == "AfumigatusA1163"
+    assert get_gene_ids_from_fasta(path) == ids
+    assert infer_fungidb_organism_from_fasta(path) == "AfumigatusA1163"
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 64, 1 << 20])
+def test_scan_fasta_chunks_matches_file_scan(tmp_path, chunk_size):
+    """Incremental parsing gives the same IDs however the bytes are split, plain or (multi-member) gzip."""
+    import gzip
+
+    from fungidb_orthologs.genome_parser import scan_fasta, scan_fasta_chunks
+
+    path = tmp_path / "query.fna"
+    path.write_text(FASTA)
+    expected = scan_fasta(path)
+    data = FASTA.encode()
+    half = len(data) // 2
+    for body in (data, gzip.compress(data), gzip.compress(data[:half]) + gzip.compress(data[half:])):
+        chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+        assert scan_fasta_chunks(chunks, name="query.fna") == expected
+    assert scan_fasta_chunks([b">A1 x\nMK\n>A2"])[0] == ["A1", "A2"]
+    with pytest.raises(ValueError, match="Truncated"):
+        scan_fasta_chunks([gzip.compress(data)[:-12]])
+
+
+def test_scan_fasta_empty_file(tmp_path):
+    from fungidb_orthologs.genome_parser import scan_fasta
+
+    path = tmp_path / "empty.fa"
+    path.write_text("")
+    assert scan_fasta(path) == ([], None)
+
+
+def test_genome_catalog_revalidates_and_resolves(tmp_path, monkeypatch):
+    """Catalog uses conditional requests; resolver handles names, abbreviations, prefixes and typos."""
+    import httpx
+
+    from fungidb_orthologs import genomes
+
+    listing = '<a href="AfumigatusA1163/">x</a><a href="AnidulansFGSCA4/">x</a><a href="Build_number/">x</a>'
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.url.path, request.headers.get("If-None-Match")))
+        if request.url.path.endswith("Build_number"):
+            return httpx.Response(200, text="68\n")
+        if request.method == "POST":
+            attrs = {"name_for_filenames": "AnidulansFGSCA4", "organism_name": "Aspergillus nidulans FGSC A4"}
+            return httpx.Response(200, json={"records": [{"attributes": attrs}]})
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=listing, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(genomes, "_http_client", lambda: httpx.Client(transport=httpx.MockTransport(handler)))
+    catalog = genomes.GenomeCatalog(tmp_path / "genomes.json", max_age=0)
+    assert [g["key"] for g in catalog.genomes()] == ["AfumigatusA1163", "AnidulansFGSCA4"]
+    assert catalog.release == "68"
+    assert catalog.genomes() and seen[-1] == ("/common/downloads/Current_Release/", '"v1"')
+
+    offline = genomes.GenomeCatalog(tmp_path / "genomes.json")
+    assert len(offline.genomes(offline=True)) == 2
+    resolver = offline.resolver()
+    assert resolver.resolve("Aspergillus nidulans FGSC A4") == "AnidulansFGSCA4"
+    assert resolver.resolve("A. fumigatus A1163") == "AfumigatusA1163"
+    assert resolver.resolve("anidulans") == "AnidulansFGSCA4"
+    assert resolver.resolve("AnidulansFGSCA5") == "AnidulansFGSCA4"
+    assert resolver.resolve("Spombe972h") == "Spombe972h"  # built-in organisms are always known
+    assert resolver.resolve("Afumigatus") is None  # ambiguous prefix
+    assert "AfumigatusA1163" in resolver.candidates("Afumigatus")
@@ -0,0 +1,84 @@
+"""Test the sparse gene x genome ortholog matrix (no network)."""
+
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+import pytest
+
+from fungidb_orthologs.matrix import MatrixBuilder, OrthologMatrix
+
+CALBICANS = "Candida albicans SC5314"
+SCEREVISIAE = "Saccharomyces cerevisiae S288C"
+
+
+def _pairs(rows: list[tuple[str, str, str]]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["GID", "ORTHOLOGS_GID", "ORTHOLOGS_ORGANISM"])
+
+
+TABLES = {
+    "AfumigatusA1163": _pairs(
+        [
+            ("AFUB_1", "C1_1", CALBICANS),
+            ("AFUB_1", "C1_2", CALBICANS),
+            ("AFUB_1", "C1_1", CALBICANS),  # duplicate pair counts once
+            ("AFUB_2", "YAL2", SCEREVISIAE),
+        ]
+    ),
+    "AfumigatusAf293": _pairs([("Afu1g1", "YAL2", SCEREVISIAE), ("Afu1g1", "C1_1", CALBICANS)]),
+}
+
+
+def test_copy_numbers_across_targets():
+    m = OrthologMatrix.from_tables(TABLES)
+    assert m.shape == (3, 2)
+    assert m.nnz == 4
+    dense = m.to_dense().set_index("GID")
+    assert list(dense.columns) == ["ORGANISM", CALBICANS, SCEREVISIAE]
+    assert dense.loc["AFUB_1", CALBICANS] == 2
+    assert dense.loc["AFUB_2", CALBICANS] == 0
+    assert dense.loc["Afu1g1", "ORGANISM"] == "AfumigatusAf293"
+    assert m.presence().row("AFUB_1")[CALBICANS] == 1
+    triplets = m.to_triplets()
+    assert triplets["COPIES"].sum() == 5
+
+
+def test_fixed_reference_columns_accept_keys():
+    m = OrthologMatrix.from_tables(TABLES, references=["ScerevisiaeS288C", "Spombe972h"])
+    assert list(m.genomes) == ["ScerevisiaeS288C", "Spombe972h"]
+    assert m.row("AFUB_2").tolist() == [1, 0]
+    assert m.row("AFUB_1").tolist() == [0, 0]
+    with pytest.raises(KeyError):
+        m.row("missing")
+
+
+def test_chunked_build_matches_single_pass():
+    rows = [(f"G{i % 50}", f"P{i}", f"Genome {i % 7}") for i in range(2000)]
+    table = _pairs(rows)
+    whole = OrthologMatrix.from_tables({"X": table})
+    builder = MatrixBuilder(chunk_rows=97)
+    builder.add_table("X", table)
+    chunked = builder.build()
+    pd.testing.assert_frame_equal(whole.to_dense(), chunked.to_dense())
+    assert chunked.to_dense().iloc[:, 2:].to_numpy().sum() == 2000
+
+
+def test_write_mtx_and_dense(tmp_path):
+    m = OrthologMatrix.from_tables(TABLES)
+    m.write(tmp_path / "m.mtx")
+    lines = (tmp_path / "m.mtx").read_text().splitlines()
+    assert lines[0].startswith("%%MatrixMarket matrix coordinate integer")
+    assert lines[1] == "3 2 4"
+    assert "1 1 2" in lines
+    genes = pd.read_csv(tmp_path / "m.genes.tsv", sep="\t")
+    assert list(genes["GID"]) == list(m.genes)
+    assert pd.read_csv(tmp_path / "m.genomes.tsv", sep="\t")["GENOME"].tolist() == [CALBICANS, SCEREVISIAE]
+
+    m.write(tmp_path / "m.tsv.gz")
+    dense = pd.read_csv(tmp_path / "m.tsv.gz", sep="\t")
+    pd.testing.assert_frame_equal(dense, m.to_dense(), check_dtype=False, check_column_type=False)
+    out = io.StringIO()
+    m.write_dense(out, chunk_rows=1)
+    assert out.getvalue().count("GID") == 1
+    assert len(out.getvalue().splitlines()) == 4
@@ -0,0 +1,101 @@
+"""Test the in-process metrics registry."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from fungidb_orthologs.metrics import Metrics
+
+
+def test_metrics_snapshot_and_prometheus_format():
+    m = Metrics()
+    with m.timer("parse"):
+        pass
+    with m.timer("parse"):
+        pass
+    m.observe("stage_seconds", 5.0, stage="download")
+    m.inc("download_bytes_total", 100, source="table")
+    m.inc("download_bytes_total", 20, source="table")
+    m.inc("cache_requests_total", cache="disk", result='mi"ss')
+
+    snap = m.snapshot()
+    assert list(snap["stages"]) == ["download", "parse"]  # slowest first
+    assert snap["stages"]["parse"]["count"] == 2
+    assert snap["counters"]['download_bytes_total{source="table"}'] == 120
+
+    text = m.to_prometheus()
+    assert "# TYPE fungidb_orthologs_download_bytes_total counter" in text
+    assert 'fungidb_orthologs_download_bytes_total{source="table"} 120' in text
+    assert 'fungidb_orthologs_stage_seconds_sum{stage="download"} 5.000000' in text
+    assert 'result="mi\\"ss"' in text
+    assert text.count("# TYPE fungidb_orthologs_stage_seconds summary") == 1
+
+    m.reset()
+    assert m.snapshot() == {"stages": {}, "counters": {}, "summaries": {}}
+
+
+def test_collect_gives_concurrent_runs_their_own_registry():
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    from fungidb_orthologs import metrics
+
+    before = metrics.default_metrics().snapshot()["counters"].get("rows_parsed_total", 0)
+    barrier = threading.Barrier(2)
+    reports = {}
+
+    def command(name: str, rows: int) -> None:
+        with metrics.collect() as registry:
+            barrier.wait()
+            metrics.inc("rows_parsed_total", rows)
+            with ThreadPoolExecutor(2) as pool:
+                list(pool.map(metrics.in_context(lambda n: metrics.inc("rows_parsed_total", n)), [1, 1]))
+            barrier.wait()
+            reports[name] = registry.snapshot()["counters"]["rows_parsed_total"]
+
+    threads = [threading.Thread(target=command, args=(n, r)) for n, r in (("a", 10), ("b", 100))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert reports == {"a": 12, "b": 102}
+    assert metrics.default_metrics().snapshot()["counters"]["rows_parsed_total"] == before + 114
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--profile", "infer", "genome.fna"],
+        ["infer", "--profile", "genome.fna"],
+        ["infer", "genome.fna", "--profile"],
+        ["--profile", "cache", "list"],
+        ["cache", "--profile", "list"],
+        ["cache", "list", "--profile"],
+    ],
+)
+def test_profile_flag_in_any_position(argv, monkeypatch, capsys):
+    from fungidb_orthologs import cli
+
+    seen = []
+    monkeypatch.setattr(cli, "cmd_infer", lambda args: seen.append(args.fastas) or 0)
+    monkeypatch.setattr(cli, "cmd_cache", lambda args: seen.append(args.cache_command) or 0)
+
+    assert cli.run(argv) == 0
+    assert seen in ([["genome.fna"]], ["list"])
+    assert json.loads(capsys.readouterr().err)["command"] in ("infer", "cache")
+
+
+def test_profile_file(tmp_path, monkeypatch, capsys):
+    from fungidb_orthologs import cli
+
+    monkeypatch.setattr(cli, "cmd_cache", lambda args: 0)
+    for argv in (["--profile-file", "before.json", "cache", "list"], ["cache", "list", "--profile-file", "after.json"]):
+        assert cli.run(argv, cwd=str(tmp_path)) == 0
+    assert json.loads((tmp_path / "before.json").read_text())["command"] == "cache"
+    assert json.loads((tmp_path / "after.json").read_text())["command"] == "cache"
+    assert "Wrote profile" in capsys.readouterr().err
+
+    assert cli.run(["cache", "list"]) == 0
+    assert capsys.readouterr().err == ""
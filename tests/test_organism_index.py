@@ -0,0 +1,99 @@
+"""Test organism inference from the locus-tag prefix index (no network)."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from fungidb_orthologs import organism_index
+from fungidb_orthologs.cache import OrthologCache
+from fungidb_orthologs.organism_index import OrganismIndex
+from fungidb_orthologs.service import resolve_target_organism
+from fungidb_orthologs.store import OrthologStore
+
+
+def _table(target_prefix: str, partners: dict[str, str], n: int = 20) -> pd.DataFrame:
+    rows = []
+    for i in range(n):
+        for organism, prefix in partners.items():
+            rows.append((f"{target_prefix}{i:06d}", f"{prefix}{i:05d}", organism))
+    return pd.DataFrame(rows, columns=["GID", "ORTHOLOGS_GID", "ORTHOLOGS_ORGANISM"])
+
+
+def test_infer_votes_by_deepest_prefix(tmp_path):
+    index = OrganismIndex(tmp_path / "index.json")
+    index.add_table(
+        "AfumigatusA1163",
+        _table("AFUB_", {"Aspergillus fumigatus Af293": "Afu1g", "Candida albicans SC5314": "C1_"}),
+    )
+    assert index.organisms == ["AfumigatusA1163", "AfumigatusAf293", "CalbicansSC5314"]
+
+    guess = index.infer([f"AFUB_{i:06d}" for i in range(50)])
+    assert guess.organism == "AfumigatusA1163"
+    assert guess.confident and guess.confidence == 1.0
+    assert guess.matched == guess.sampled == 50
+
+    # "Afu" is shared by both A. fumigatus strains; the deeper "Afu1g" decides
+    assert index.infer(["Afu1g00042", "Afu1g00043"]).organism == "AfumigatusAf293"
+
+    unknown = index.infer(["ZZZ_1", "YYY_2"])
+    assert unknown.organism is None and not unknown.confident
+
+
+def test_update_is_incremental_and_persisted(tmp_path):
+    cache = OrthologCache(tmp_path / "cache", max_bytes=0, ttl=0)
+    cache.put("AfumigatusA1163", _table("AFUB_", {"Candida albicans SC5314": "C1_"}))
+    data = tmp_path / "downloads"
+    data.mkdir()
+    (data / "CneoformansH99_orthologs.tsv").write_text(
+        "Gene ID\tOrtholog\tOrganism\nCNAG_00001\tYAL001C\tSaccharomyces cerevisiae S288C\n"
+    )
+    store = OrthologStore(tmp_path / "orthologs.sqlite")
+    store.ingest(data)
+
+    index = OrganismIndex(tmp_path / "index.json")
+    assert index.update(cache=cache, store=store) == 2
+    assert index.update(cache=cache, store=store) == 0
+    cache.put("CalbicansSC5314", _table("C1_", {"AfumigatusA1163": "AFUB_"}))
+    assert index.update(cache=cache) == 1
+
+    reloaded = OrganismIndex(tmp_path / "index.json")
+    assert reloaded.update(cache=cache, store=store) == 0
+    assert reloaded.infer(["CNAG_00001", "CNAG_00002"]).organism == "CneoformansH99"
+    assert reloaded.infer(["YAL001C"]).organism == "ScerevisiaeS288C"
+
+
+def test_resolve_target_organism_prefers_confident_index(tmp_path, monkeypatch):
+    from fungidb_orthologs import cache as cache_module
+
+    index = OrganismIndex(tmp_path / "index.json")
+    index.add_table("CneoformansH99", _table("CNAG_", {"AfumigatusA1163": "AFUB_"}))
+    monkeypatch.setattr(organism_index, "_default_index", index)
+    monkeypatch.setattr(cache_module, "_default_cache", OrthologCache(tmp_path / "cache", max_bytes=0, ttl=0))
+
+    gene_ids = [f"CNAG_{i:06d}" for i in range(10)]
+    assert resolve_target_organism(None, "AfumigatusA1163", gene_ids) == "CneoformansH99"
+    assert resolve_target_organism("AfumigatusA1163", None, gene_ids) == "AfumigatusA1163"
+    assert resolve_target_organism(None, "AfumigatusA1163", ["XYZ_1"]) == "AfumigatusA1163"
+
+    mixed = gene_ids[:3] + [f"XYZ_{i}" for i in range(7)]
+    with pytest.raises(ValueError, match=r"Best guess from gene IDs: CneoformansH99 \(confidence 0.30\)"):
+        resolve_target_organism(None, None, mixed)
+
+
+def test_update_does_not_touch_cache_access_times(tmp_path, monkeypatch):
+    from fungidb_orthologs import cache as cache_module
+
+    cache = OrthologCache(tmp_path / "cache", max_bytes=0, ttl=0)
+    cache.put("AfumigatusA1163", _table("AFUB_", {"Candida albicans SC5314": "C1_"}), release="68")
+    accessed = [e["accessed"] for e in cache.entries()]
+    monkeypatch.setattr(cache_module, "_default_cache", cache)
+    monkeypatch.setattr(organism_index, "_default_index", OrganismIndex(tmp_path / "index.json"))
+    monkeypatch.setattr(organism_index, "_default_sources", None)
+
+    assert organism_index.default_organism_index().organisms == ["AfumigatusA1163", "CalbicansSC5314"]
+    assert [e["accessed"] for e in cache.entries()] == accessed
+
+    # Tables cached after the index was first used are picked up on the next use
+    cache.put("CneoformansH99", _table("CNAG_", {"AfumigatusA1163": "AFUB_"}), release="68")
+    assert "CneoformansH99" in organism_index.default_organism_index().organisms
@@ -0,0 +1,63 @@
+"""Test the orthogroup graph index (no network)."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from fungidb_orthologs.orthogroups import OrthogroupIndex
+
+
+def _pairs(rows: list[tuple[str, str, str]]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["GID", "ORTHOLOGS_GID", "ORTHOLOGS_ORGANISM"])
+
+
+def test_transitive_orthogroups_across_tables():
+    tables = {
+        "AfumigatusA1163": _pairs(
+            [
+                ("AFUB_1", "C1_1", "Candida albicans SC5314"),
+                ("AFUB_2", "YAL2", "Saccharomyces cerevisiae S288C"),
+            ]
+        ),
+        "CalbicansSC5314": _pairs(
+            [
+                ("C1_1", "SPAC1", "Schizosaccharomyces pombe 972h"),
+                ("C1_3", "YAL3", "Saccharomyces cerevisiae S288C"),
+            ]
+        ),
+    }
+    index = OrthogroupIndex.from_tables(tables)
+    assert index.n_genes == 7
+    assert index.n_groups == 3
+    members = index.members("SPAC1")
+    assert sorted(members["GID"]) == ["AFUB_1", "C1_1", "SPAC1"]
+    assert dict(zip(members["GID"], members["ORGANISM"]))["C1_1"] == "Candida albicans SC5314"
+    assert index.same_group("AFUB_1", "SPAC1")
+    assert not index.same_group("AFUB_1", "AFUB_2")
+    assert index.group_of("missing") is None
+    assert index.members("missing").empty
+    assert len(index.groups(min_size=3)) == 3
+    assert len(index.groups(min_size=2)) == 7
+
+
+def test_long_chain_collapses_to_one_group():
+    n = 1000
+    chain = _pairs([(f"G{i}", f"G{i + 1}", "x") for i in range(n)])
+    index = OrthogroupIndex.from_tables({"X": chain.sample(frac=1, random_state=0)})
+    assert index.n_groups == 1
+    assert len(index.members("G500")) == n + 1
+
+
+def test_from_cache_reads_expired_tables_without_touching_them(tmp_path):
+    import time
+
+    from fungidb_orthologs.cache import OrthologCache
+
+    cache = OrthologCache(tmp_path, max_bytes=0, ttl=0.01)
+    cache.put("AfumigatusA1163", _pairs([("AFUB_1", "C1_1", "Candida albicans SC5314")]), release="68")
+    time.sleep(0.02)
+    before = cache.entries()[0]["accessed"]
+
+    index = OrthogroupIndex.from_cache(cache=cache)
+    assert index.same_group("AFUB_1", "C1_1")
+    assert cache.entries()[0]["accessed"] == before
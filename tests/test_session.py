@@ -0,0 +1,76 @@
+"""Test retry/backoff behavior of the shared HTTP transport (no network)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from fungidb_orthologs import session
+
+
+def _flaky(statuses: list[int], calls: list[httpx.Request]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        return httpx.Response(status, headers={"Retry-After": "0"} if status == 503 else {})
+
+    return handler
+
+
+def test_retries_transient_errors_but_not_422(monkeypatch):
+    monkeypatch.setattr(session.time, "sleep", lambda s: None)
+    calls = []
+    transport = session.RetryTransport(httpx.MockTransport(_flaky([503, 502, 200], calls)), retries=3, backoff=0)
+    with httpx.Client(transport=transport) as c:
+        assert c.post("https://fungidb.org/x", content=b"{}").status_code == 200
+    assert len(calls) == 3 and all(r.content == b"{}" for r in calls)
+
+    calls.clear()
+    transport = session.RetryTransport(httpx.MockTransport(_flaky([422], calls)), retries=3, backoff=0)
+    with httpx.Client(transport=transport) as c:
+        assert c.get("https://fungidb.org/x").status_code == 422
+    assert len(calls) == 1
+
+    calls.clear()
+    transport = session.RetryTransport(httpx.MockTransport(_flaky([500], calls)), retries=2, backoff=0)
+    with httpx.Client(transport=transport) as c:
+        assert c.get("https://fungidb.org/x").status_code == 500
+    assert len(calls) == 3
+
+
+def test_async_retries_connection_errors():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) < 3:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, text="ok")
+
+    async def run():
+        transport = session.AsyncRetryTransport(httpx.MockTransport(handler), retries=2, backoff=0)
+        async with httpx.AsyncClient(transport=transport) as c:
+            return await c.get("https://fungidb.org/x")
+
+    assert asyncio.run(run()).text == "ok"
+    attempts.clear()
+
+    async def exhausted():
+        transport = session.AsyncRetryTransport(httpx.MockTransport(handler), retries=1, backoff=0)
+        async with httpx.AsyncClient(transport=transport) as c:
+            return await c.get("https://fungidb.org/x")
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(exhausted())
+
+
+def test_shared_client_is_reused_and_requests_compression():
+    session.close()
+    try:
+        c = session.shared_client()
+        assert session.shared_client() is c
+        assert "gzip" in c.headers["Accept-Encoding"]
+    finally:
+        session.close()
@@ -0,0 +1,90 @@
+"""Test ortholog tables shared between processes as memory-mapped Arrow files (no network)."""
+
+from __future__ import annotations
+
+import multiprocessing
+import time
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from fungidb_orthologs import client  # noqa: E402
+from fungidb_orthologs.shared_tables import SharedTables, select  # noqa: E402
+
+TABLE = client.compact_ortholog_table(
+    pd.DataFrame(
+        {
+            "GID": ["AFUB_000010", "AFUB_000010", "AFUB_000020", "AFUB_000030", None],
+            "ORTHOLOGS_GID": ["C1_00010W_A", "YAL001C", "SPAC1002.01", "AN0001", "X1"],
+            "ORTHOLOGS_ORGANISM": [
+                "Candida albicans SC5314",
+                "Saccharomyces cerevisiae S288C",
+                "Schizosaccharomyces pombe 972h",
+                "Aspergillus nidulans FGSC A4",
+                None,
+            ],
+            "ORTHOLOGS_PRODUCT": ["kinase", "TFC3", "mrx", "other", None],
+        }
+    )
+)
+
+
+def test_select_matches_select_orthologs(tmp_path):
+    shared = SharedTables(tmp_path)
+    table = shared.get("AfumigatusA1163", lambda: TABLE, release="68")
+    assert table.num_rows == len(TABLE)
+    for refs in (None, ["CalbicansSC5314"], ["ScerevisiaeS288C", "Spombe972h"], ["Nope"]):
+        for genes in (None, ["AFUB_000010"], ["AFUB_000020", "AFUB_000030", "AFUB_999999"]):
+            expected = client.select_orthologs(TABLE, gene_ids=genes, reference_organisms=refs)
+            got = select(table, gene_ids=genes, reference_organisms=refs)
+            assert client.is_compact(got)
+            assert got["ORTHOLOGS_GID"].astype(str).tolist() == expected["ORTHOLOGS_GID"].astype(str).tolist()
+            assert got["GID"].astype(str).tolist() == expected["GID"].astype(str).tolist()
+
+
+def _fetch_in_process(directory, log, results):
+    def load():
+        with open(log, "a") as f:
+            f.write("fetch\n")
+        time.sleep(0.3)
+        return TABLE
+
+    table = SharedTables(directory).get("AfumigatusA1163", load, release="68")
+    results.put(table.num_rows)
+
+
+def test_only_one_process_fetches_a_table(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    log = tmp_path / "fetches.log"
+    procs = [ctx.Process(target=_fetch_in_process, args=(tmp_path / "shared", log, results)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    assert [p.exitcode for p in procs] == [0, 0, 0]
+    assert sorted(results.get(timeout=5) for _ in procs) == [len(TABLE)] * 3
+    assert log.read_text() == "fetch\n"
+
+    shared = SharedTables(tmp_path / "shared")
+    assert shared.get("AfumigatusA1163", lambda: pytest.fail("table should be shared"), release="68").num_rows == 5
+    assert shared.remove("AfumigatusA1163") == 1
+
+
+def test_mappings_are_bounded_and_replaced(tmp_path):
+    shared = SharedTables(tmp_path, max_mapped=2)
+    first = shared.get("A", lambda: TABLE, release="68")
+    assert shared.get("A", lambda: pytest.fail("already written"), release="68") is first
+
+    # A replaced file is mapped afresh and its old mapping dropped
+    path = shared.path("A", "68")
+    shared.write(path, TABLE.iloc[:2])
+    replaced = shared.get("A", lambda: TABLE, release="68")
+    assert replaced.num_rows == 2 and len(shared._mapped) == 1
+
+    shared.get("B", lambda: TABLE, release="68")
+    shared.get("C", lambda: TABLE, release="68")
+    assert len(shared._mapped) == 2
+    assert shared._mapped.get(path) is None
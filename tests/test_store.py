@@ -0,0 +1,81 @@
+"""Test the offline SQLite ortholog store (no network)."""
+
+from __future__ import annotations
+
+import gzip
+
+from fungidb_orthologs.store import OrthologStore
+
+TABLE = (
+    "Gene ID\tOrtholog\tOrganism\tProduct\n"
+    "AFUB_000010\tC1_00010W_A\tCandida albicans SC5314\tkinase\n"
+    "AFUB_000010\tYAL001C\tSaccharomyces cerevisiae S288C\tkinase\n"
+    "AFUB_000020\tSPAC1002.01\tSchizosaccharomyces pombe 972h-\tpermease\n"
+)
+
+GROUPS = (
+    "OG6_100000: afum|AFUB_000030 calb|C1_00030W_A scer|YAL003W\n"
+    "OG6_100001: afum|AFUB_000040 afum|AFUB_000041\n"
+)
+
+TAXON_MAP = (
+    "afum\tAfumigatusA1163\n"
+    "calb\tCandida albicans SC5314\n"
+    "scer\tSaccharomyces cerevisiae S288C\n"
+)
+
+
+def _ingest(tmp_path) -> OrthologStore:
+    data = tmp_path / "downloads"
+    data.mkdir()
+    (data / "AfumigatusA1163_orthologs.tsv").write_text(TABLE)
+    with gzip.open(data / "groups_OrthoMCL-6.txt.gz", "wt") as f:
+        f.write(GROUPS)
+    (data / "taxon_map.tsv").write_text(TAXON_MAP)
+    store = OrthologStore(tmp_path / "orthologs.sqlite")
+    loaded = store.ingest(data)
+    assert sorted(loaded.values()) == [3, 5]
+    return store
+
+
+def test_store_pairs_and_groups(tmp_path):
+    store = _ingest(tmp_path)
+    assert store.organisms() == ["AfumigatusA1163"]
+
+    df = store.get_orthologs("AfumigatusA1163")
+    pairs = set(zip(df["GID"], df["ORTHOLOGS_GID"]))
+    assert pairs == {
+        ("AFUB_000010", "C1_00010W_A"),
+        ("AFUB_000010", "YAL001C"),
+        ("AFUB_000020", "SPAC1002.01"),
+        ("AFUB_000030", "C1_00030W_A"),
+        ("AFUB_000030", "YAL003W"),
+    }
+
+    df = store.get_orthologs(
+        "AfumigatusA1163",
+        gene_ids=["AFUB_000010", "AFUB_000030"],
+        reference_organisms=["Candida albicans SC5314"],
+    )
+    assert sorted(df["ORTHOLOGS_GID"]) == ["C1_00010W_A", "C1_00030W_A"]
+
+    empty = store.get_orthologs("AfumigatusA1163", gene_ids=[])
+    assert empty.empty and list(empty.columns) == ["GID", "ORTHOLOGS_GID", "ORTHOLOGS_ORGANISM", "ORTHOLOGS_PRODUCT"]
+
+
+def test_store_reingest_replaces_rows(tmp_path):
+    store = _ingest(tmp_path)
+    store.ingest(tmp_path / "downloads")
+    assert len(store.get_orthologs("AfumigatusA1163")) == 5
+
+
+def test_reingest_keeps_rows_from_other_files_of_the_organism(tmp_path):
+    store = OrthologStore(tmp_path / "orthologs.sqlite")
+    for name, ortholog in (("a", "C1_00010W_A"), ("b", "YAL001C")):
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "AfumigatusA1163_orthologs.tsv").write_text(
+            f"Gene ID\tOrtholog\tOrganism\nAFUB_000010\t{ortholog}\tSomewhere\n"
+        )
+        store.ingest(tmp_path / name)
+    store.ingest(tmp_path / "a")
+    assert sorted(store.get_orthologs("AfumigatusA1163")["ORTHOLOGS_GID"]) == ["C1_00010W_A", "YAL001C"]
@@ -0,0 +1,87 @@
+"""Test the chunked output writers."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from fungidb_orthologs.client import compact_ortholog_table
+from fungidb_orthologs.writers import format_for_path, write_orthologs
+
+TABLE = compact_ortholog_table(
+    pd.DataFrame(
+        {
+            "GID": ["AFUB_000010", "AFUB_000010", "AFUB_000020"],
+            "ORTHOLOGS_GID": ["C1_00010W_A", "YAL001C", "SPAC1002.01"],
+            "ORTHOLOGS_ORGANISM": [
+                "Candida albicans SC5314",
+                "Saccharomyces cerevisiae S288C",
+                "Schizosaccharomyces pombe 972h",
+            ],
+            "ORTHOLOGS_PRODUCT": ["kinase, putative", None, "mrx"],
+        }
+    )
+)
+
+
+def test_format_for_path():
+    assert format_for_path("out.tsv") == "tsv"
+    assert format_for_path("out.TSV.GZ") == "tsv.gz"
+    assert format_for_path("out.parquet") == "parquet"
+    assert format_for_path("out.arrow") == "feather"
+    assert format_for_path("out.ndjson") == "jsonl"
+    assert format_for_path("out") == "tsv"
+
+
+@pytest.mark.parametrize("name", ["out.tsv", "out.tsv.gz", "out.jsonl", "out.parquet", "out.feather"])
+def test_writers_roundtrip_in_chunks(tmp_path, name):
+    if name.endswith((".parquet", ".feather")):
+        pytest.importorskip("pyarrow")
+    path = tmp_path / "nested" / name
+    write_orthologs(TABLE, path, chunk_rows=1)
+    if name.endswith((".parquet", ".feather")):
+        got = pd.read_parquet(path) if name.endswith(".parquet") else pd.read_feather(path)
+        assert isinstance(got["ORTHOLOGS_ORGANISM"].dtype, pd.CategoricalDtype)
+    elif name.endswith(".jsonl"):
+        got = pd.DataFrame([json.loads(line) for line in path.read_text().splitlines()])
+    else:
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(path, "rt") as f:
+            got = pd.read_csv(f, sep="\t")
+    assert got["GID"].astype(str).tolist() == TABLE["GID"].astype(str).tolist()
+    assert got["ORTHOLOGS_PRODUCT"].iloc[0] == "kinase, putative"
+    assert pd.isna(got["ORTHOLOGS_PRODUCT"].iloc[1])
+
+
+def test_write_to_text_stream():
+    buf = io.StringIO()
+    write_orthologs(TABLE, buf, fmt="tsv", chunk_rows=2)
+    assert buf.getvalue().splitlines()[0].split("\t") == list(TABLE.columns)
+    assert len(buf.getvalue().splitlines()) == 4
+    with pytest.raises(ValueError, match="file path"):
+        write_orthologs(TABLE, io.StringIO(), fmt="parquet")
+
+
+@pytest.mark.parametrize("name", ["out.parquet", "out.feather"])
+def test_columnar_output_drops_unused_categories(tmp_path, name):
+    pytest.importorskip("pyarrow")
+    n = 50_000
+    big = compact_ortholog_table(
+        pd.DataFrame(
+            {
+                "GID": [f"AFUB_{i:06d}" for i in range(n)],
+                "ORTHOLOGS_GID": [f"C1_{i:05d}W_A" for i in range(n)],
+                "ORTHOLOGS_ORGANISM": ["Candida albicans SC5314"] * n,
+                "ORTHOLOGS_PRODUCT": [f"product {i}" for i in range(n)],
+            }
+        )
+    )
+    path = tmp_path / name
+    write_orthologs(big.iloc[[7]], path)
+    assert path.stat().st_size < 10_000
+    back = pd.read_parquet(path) if name.endswith("parquet") else pd.read_feather(path)
+    assert back["GID"].astype(str).tolist() == ["AFUB_000007"]